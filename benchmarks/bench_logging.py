@@ -0,0 +1,77 @@
+# benchmarks/bench_logging.py - 提示词日志的格式化开销：直接 f-string 与惰性 TraceChannel 对比
+#
+# 用法（在项目根目录执行，不需要模型）：
+#   python -m benchmarks.bench_logging [--calls 20000] [--sizes 4000,16000]
+#
+# 模拟 llm_helper 中每次模型调用后记录提示词与译文的写法，分别测量：
+#   eager_off    通道关闭时直接 logger.info(f"...")，仍会拼接整段提示词
+#   lazy_off     通道关闭时 TraceChannel.info(lambda: ...)，应与提示词大小无关，且不生成任何消息
+#   lazy_sampled 通道开启、抽样 10%
+#   lazy_on      通道开启、每次都记录（只挂 NullHandler，不计文件写入）
+# 使用独立的日志器，不会写入 logs/ 目录。
+
+import argparse
+import logging
+import sys
+import time
+from typing import Callable
+
+from service.log import Sampler, TraceChannel
+
+
+def _make_logger(name: str, enabled: bool) -> logging.Logger:
+    logger = logging.getLogger(f"bench_logging.{name}")
+    logger.propagate = False
+    logger.handlers[:] = [logging.NullHandler()]
+    logger.setLevel(logging.DEBUG if enabled else logging.CRITICAL + 1)
+    return logger
+
+
+def _time(fn: Callable[[], None], calls: int) -> float:
+    """返回每次调用的平均耗时（纳秒）"""
+    start = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return (time.perf_counter() - start) / calls * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser(description="提示词日志的格式化开销")
+    parser.add_argument("--calls", type=int, default=20000, help="每种写法的调用次数")
+    parser.add_argument("--sizes", default="4000,16000", help="提示词字符数，逗号分隔")
+    args = parser.parse_args()
+
+    builds = 0
+    failures = 0
+    print(f"{'写法':<16}{'提示词字符数':>12}{'ns/调用':>12}{'生成消息次数':>14}")
+    for size in (int(size) for size in args.sizes.split(",")):
+        user_prompt = "字" * size
+        translated_text = "译" * (size // 2)
+
+        def build() -> str:
+            nonlocal builds
+            builds += 1
+            return f"翻译提示词:\n{user_prompt}\n翻译结果：\n{translated_text}"
+
+        eager_logger = _make_logger("eager", enabled=False)
+        cases = {
+            "eager_off": lambda: eager_logger.info(f"翻译提示词:\n{user_prompt}\n翻译结果：\n{translated_text}"),
+            "lazy_off": TraceChannel(_make_logger("off", enabled=False)).info,
+            "lazy_sampled": TraceChannel(_make_logger("sampled", enabled=True), Sampler(0.1)).info,
+            "lazy_on": TraceChannel(_make_logger("on", enabled=True)).info,
+        }
+        for name, log_fn in cases.items():
+            builds = 0
+            if name == "eager_off":
+                cost = _time(log_fn, args.calls)
+            else:
+                cost = _time(lambda: log_fn(build), args.calls)
+            print(f"{name:<16}{size:>12}{cost:>12.0f}{builds if name != 'eager_off' else '-':>14}")
+            if name == "lazy_off" and builds:
+                failures += 1
+                print("  通道关闭时仍生成了消息")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+# benchmarks/bench_pipeline.py - 翻译流水线中纯 Python 部分的吞吐量（不需要模型与 GPU）
+#
+# 用法（在项目根目录执行）：
+#   python -m benchmarks.bench_pipeline [--sizes 100,1000,5000] [--repeat 5]
+#       [--json 结果.json] [--baseline 基准.json --tolerance 0.25]
+#
+# 以 benchmarks.corpus 生成的合成字幕与纯文本为输入，测量：
+#   parse          解析 SRT（formats.parse_document）
+#   chunk          分块（chunk_subtitles_with_context）
+#   prompt_build   逐块生成翻译提示词（含术语表匹配）
+#   glossary_prep  术语表生成中调用模型之前的步骤：清理、切片、候选词预筛选
+#   glossary_apply 将术语表应用到纯文本（apply_glossary_to_text）
+#   format         生成输出文件内容（formats.render_document）
+#   e2e / e2e_reflect  以 StubLlm 代替模型的 translate_srt_text（块间不等待），扣除假模型内部耗时，
+#                  即推理以外的全部开销（语言识别、去重、分类、提示词、流式解析、review 判断、输出）
+#   text_e2e       以 StubLlm 代替模型的 translate_plain_text_file
+# 每项取 --repeat 次中最快的一次。--json 保存结果；--baseline 与之前保存的结果比较，
+# 任一项的单位耗时变慢超过 --tolerance 时以退出码 1 结束，可用于发现热点路径的性能回退。
+# 提示词日志在测试期间关闭，不写入 logs/ 目录。
+
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Tuple
+
+from benchmarks import corpus
+from benchmarks.stub_llm import StubLlm
+from service import glossary, localization, log
+from service.glossary import ai_generator
+from service.subtitle import formats
+from service.translator import prompt
+import service.translator as translator
+
+SOURCE_LANG = "English"
+TARGET_LANG = "Chinese (Simplified)"
+
+
+def _best_of(fn: Callable[[], float], repeat: int) -> float:
+    """fn 返回本次应计入的耗时（秒），取最小值"""
+    return min(fn() for _ in range(repeat))
+
+
+def _timed(fn: Callable[[], object]) -> Callable[[], float]:
+    def run() -> float:
+        start = time.perf_counter()
+        fn()
+        return time.perf_counter() - start
+    return run
+
+
+def _stub_run(run: Callable[[StubLlm], bool], **stub_options) -> Callable[[], float]:
+    """以新的 StubLlm 执行 run，返回扣除假模型内部耗时后的秒数"""
+    def measure() -> float:
+        stub = StubLlm(**stub_options)
+        start = time.perf_counter()
+        if not run(stub):
+            raise RuntimeError("翻译失败")
+        return time.perf_counter() - start - stub.seconds
+    return measure
+
+
+def bench_size(count: int, repeat: int, tmp_dir: str) -> List[Tuple[str, int, str, float]]:
+    """返回 (测试项, 规模, 单位, 总耗时秒) 列表"""
+    srt_text = corpus.synthetic_srt(count)
+    plain_text = corpus.synthetic_text(count)
+    subtitles = formats.parse_document(srt_text).subtitles
+    chunks = translator.chunk_subtitles_with_context(subtitles, 10, 2)
+    document = formats.parse_document(srt_text)
+    config = ai_generator.ExtractionConfig(chunk_size=1000, min_term_length=3)
+    glossary.glossary = dict(corpus.GLOSSARY)
+    text_path = os.path.join(tmp_dir, "input.txt")
+    with open(text_path, "w", encoding="utf-8") as f:
+        f.write(plain_text)
+
+    def glossary_prep():
+        cleaned = ai_generator.clean_subtitle_text(srt_text)
+        ai_generator.prefilter_chunks(ai_generator.split_text_into_chunks(cleaned, config), cleaned, config)
+
+    def translate_srt(reflection: bool) -> Callable[[StubLlm], bool]:
+        return lambda stub: translator.translate_srt_text(
+            srt_text, os.path.join(tmp_dir, "output.srt"), "stub.gguf", SOURCE_LANG, TARGET_LANG,
+            reflection_enabled=reflection, reflection_mode="full", log_fn=lambda message: None,
+            llm=stub, generate_glossary=False, chunk_pause=0)
+
+    cases = [
+        ("parse", "subtitle", _timed(lambda: formats.parse_document(srt_text))),
+        ("chunk", "subtitle", _timed(lambda: translator.chunk_subtitles_with_context(subtitles, 10, 2))),
+        ("prompt_build", "subtitle", _timed(lambda: [
+            prompt.subtitle.generate_translation_prompt(chunk["context"], chunk["main_indices"])
+            for chunk in chunks])),
+        ("glossary_prep", "subtitle", _timed(glossary_prep)),
+        ("glossary_apply", "sentence", _timed(lambda: glossary.apply_glossary_to_text(plain_text))),
+        ("format", "subtitle", _timed(lambda: formats.render_document(document, subtitles, "output.srt"))),
+        # 每 5 次数组调用少一条，约 1/5 的块触发 review
+        ("e2e", "subtitle", _stub_run(translate_srt(False), mismatch_every=5)),
+        ("e2e_reflect", "subtitle", _stub_run(translate_srt(True), mismatch_every=5, issue_every=3)),
+        ("text_e2e", "sentence", _stub_run(lambda stub: translator.translate_plain_text_file(
+            text_path, os.path.join(tmp_dir, "output.txt"), "stub.gguf", SOURCE_LANG, TARGET_LANG,
+            log_fn=lambda message: None, llm=stub, generate_glossary=False))),
+    ]
+    return [(name, count, unit, _best_of(fn, repeat)) for name, unit, fn in cases]
+
+
+def _compare(results: Dict[str, float], baseline_path: str, tolerance: float) -> int:
+    """与基准结果比较，返回变慢超过容差的项数"""
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)["results"]
+    regressions = 0
+    print(f"\n与基准比较（{baseline_path}，容差 {tolerance:.0%}）：")
+    for key, seconds in results.items():
+        if key not in baseline:
+            continue
+        change = seconds / baseline[key] - 1 if baseline[key] else 0.0
+        regressed = change > tolerance
+        regressions += regressed
+        print(f"{key:<28}{change:>+9.1%}{'  变慢' if regressed else ''}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="翻译流水线中纯 Python 部分的吞吐量")
+    parser.add_argument("--sizes", default=",".join(str(size) for size in corpus.SIZES.values()),
+                        help="字幕条数（纯文本为句数），逗号分隔")
+    parser.add_argument("--repeat", type=int, default=5, help="每项重复次数，取最快一次")
+    parser.add_argument("--json", help="保存结果的 JSON 文件")
+    parser.add_argument("--baseline", help="之前以 --json 保存的基准结果")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="允许的变慢比例")
+    args = parser.parse_args()
+
+    localization.init("en")
+    log.get_logger("LightVT").setLevel(logging.WARNING)
+    for name in ("Glossary", "AIGlossaryGenerator"):
+        log.get_logger(name).setLevel(logging.WARNING)
+    log.set_prompt_logging(False)
+
+    results: Dict[str, float] = {}
+    print(f"{'测试项':<16}{'规模':>8}{'总耗时(ms)':>12}{'µs/单位':>10}{'单位/s':>12}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for count in (int(size) for size in args.sizes.split(",")):
+            for name, size, unit, seconds in bench_size(count, args.repeat, tmp_dir):
+                results[f"{name}@{size}"] = seconds / size
+                print(f"{name:<16}{size:>8}{seconds * 1000:>12.2f}{seconds / size * 1e6:>10.1f}"
+                      f"{size / seconds if seconds else 0.0:>12.0f}  {unit}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"python": sys.version.split()[0], "repeat": args.repeat,
+                       "unit": "seconds per item", "results": results}, f, indent=1)
+    if args.baseline and _compare(results, args.baseline, args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
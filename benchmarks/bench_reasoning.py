@@ -0,0 +1,122 @@
+# benchmarks/bench_reasoning.py - 关闭思考过程前后的生成 token 数对比
+#
+# 用法（在项目根目录执行，需要 GGUF 模型）：
+#   python -m benchmarks.bench_reasoning 模型.gguf 字幕.srt [--n-gpu-layers -1] [--chunks 5]
+#       [--target-lang "Chinese (Simplified)"]
+#
+# 对前 N 个字幕块依次调用 字幕翻译 / 改进建议 / 纯文本翻译，分别在不应用与应用模型配置
+# （utils.model_profile.suppress_reasoning）时统计每块生成的 token 数、耗时以及输出中含思考标签的次数。
+
+import argparse
+import logging
+import re
+import time
+from typing import Dict
+
+from service import localization, log
+from service.subtitle.srt_format import parse_srt
+from service.translator import chunk_subtitles_with_context, llm_helper, prompt
+from utils import model_profile
+
+_THINK_TAG = re.compile(r'<(?:think|thinking|reasoning)>', re.IGNORECASE)
+
+
+class TokenCounter:
+    """替换模型实例的 create_chat_completion，记录生成 token 数与含思考标签的输出次数
+
+    直接挂在原模型实例上（而非包装对象），使 model_profile 应用的配置照常生效
+    """
+
+    def __init__(self, llm):
+        self._llm = llm
+        self._create_chat_completion = llm.create_chat_completion
+        self.completion_tokens = 0
+        self.thinking_outputs = 0
+        llm.create_chat_completion = self._call
+
+    def _call(self, *args, **kwargs):
+        response = self._create_chat_completion(*args, **kwargs)
+        if kwargs.get("stream"):
+            return self._count_stream(response)
+        self.completion_tokens += response.get("usage", {}).get("completion_tokens", 0)
+        if _THINK_TAG.search(response["choices"][0]["message"]["content"] or ""):
+            self.thinking_outputs += 1
+        return response
+
+    def _count_stream(self, stream):
+        # 流式响应不含 usage，每个带内容的分片计为一个 token
+        content = []
+        try:
+            for chunk in stream:
+                text = chunk["choices"][0].get("delta", {}).get("content")
+                if text:
+                    self.completion_tokens += 1
+                    content.append(text)
+                yield chunk
+        finally:
+            stream.close()
+            if _THINK_TAG.search("".join(content)):
+                self.thinking_outputs += 1
+
+    def close(self):
+        del self._llm.create_chat_completion
+
+
+def _run(llm, chunks, source_lang: str, target_lang: str) -> Dict[str, float]:
+    subtitle_prompt = prompt.subtitle.generate_system_prompt(source_lang, target_lang)
+    plain_prompt = prompt.plain_text.generate_system_prompt(source_lang, target_lang)
+    results = {}
+    start = time.perf_counter()
+    for name, call in (
+        ("translate", lambda llm, chunk: llm_helper.subtitle.translate_text(
+            llm, chunk, subtitle_prompt, log_fn=lambda message: None)),
+        ("recommend", lambda llm, chunk: llm_helper.subtitle.ask_for_recommendation(
+            llm, chunk, "\n".join(s.text for s in chunk["main"]), target_lang, log_fn=lambda message: None)),
+        ("plain_text", lambda llm, chunk: llm_helper.plain_text.translate_text(
+            llm, "\n".join(s.text for s in chunk["main"]), plain_prompt, log_fn=lambda message: None)),
+    ):
+        counter = TokenCounter(llm)
+        try:
+            for chunk in chunks:
+                call(llm, chunk)
+        finally:
+            counter.close()
+        results[f"{name}_tokens"] = counter.completion_tokens / len(chunks)
+        results[f"{name}_thinking"] = counter.thinking_outputs
+    results["seconds"] = (time.perf_counter() - start) / len(chunks)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="关闭思考过程前后的生成 token 数对比")
+    parser.add_argument("model_path")
+    parser.add_argument("input_path")
+    parser.add_argument("--source-lang", default="Auto Detect")
+    parser.add_argument("--target-lang", default="Chinese (Simplified)")
+    parser.add_argument("--n-gpu-layers", type=int, default=-1)
+    parser.add_argument("--chunks", type=int, default=5, help="参与测试的字幕块数")
+    args = parser.parse_args()
+
+    localization.init("en")
+    log.get_logger("LightVT").setLevel(logging.WARNING)
+    with open(args.input_path, "r", encoding="utf-8") as f:
+        chunks = chunk_subtitles_with_context(parse_srt(f.read()))[:args.chunks]
+
+    llm = llm_helper.create_llm(args.model_path, args.n_gpu_layers)
+    results = {}
+    for name, enabled in (("off", False), ("profile", True)):
+        profile = model_profile.suppress_reasoning(llm, enabled)
+        print(f"[{name}] 模型配置: {profile}")
+        results[name] = _run(llm, chunks, args.source_lang, args.target_lang)
+
+    print(f"字幕块数: {len(chunks)}（以下 tokens 为每块平均生成数，thinking 为含思考标签的输出次数）")
+    keys = list(results["off"].keys())
+    print(f"{'指标':<20}{'off':>12}{'profile':>12}{'节省':>12}")
+    for key in keys:
+        off, on = results["off"][key], results["profile"][key]
+        saved = f"{(off - on) / off:.0%}" if key.endswith("tokens") and off else ""
+        print(f"{key:<20}{off:>12.1f}{on:>12.1f}{saved:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+# benchmarks/bench_reflection.py - 反思模式耗时与质量对比
+#
+# 用法（在项目根目录执行，需要 GGUF 模型）：
+#   python -m benchmarks.bench_reflection 模型.gguf 字幕.srt [--reference 参考译文.srt]
+#       [--target-lang "Chinese (Simplified)"] [--n-gpu-layers -1] [--limit 100]
+#       [--threshold 0.8] [--logprobs]
+#
+# 依次以 关闭反思 / full（改进建议 + 改进翻译）/ single（一次调用自我修正）/
+# gated（只对置信度低于 --threshold 的块做 single 反思）四种模式翻译同一字幕，
+# 统计耗时、模型调用次数与生成 token 数。--logprobs 以 logits_all=True 加载模型，置信度中加入 token 概率。
+# 提供参考译文时以 chrF 评估质量；否则以 full 模式的输出为基准计算 chrF，衡量 single 与其的接近程度。
+
+import argparse
+import logging
+import os
+import tempfile
+import time
+from collections import Counter
+from typing import Dict, List
+
+from service import localization, log
+from service.subtitle.srt_format import format_srt, parse_srt
+from service.translator import llm_helper
+import service.translator as translator
+
+MODES = {
+    "off": dict(reflection_enabled=False),
+    "full": dict(reflection_enabled=True, reflection_mode="full"),
+    "single": dict(reflection_enabled=True, reflection_mode="single"),
+    "gated": dict(reflection_enabled=True, reflection_mode="single"),
+}
+
+
+class CountingLlm:
+    """记录调用次数与 token 用量的模型包装"""
+
+    def __init__(self, llm):
+        self._llm = llm
+        self.calls = 0
+        self.completion_tokens = 0
+
+    def create_chat_completion(self, *args, **kwargs):
+        response = self._llm.create_chat_completion(*args, **kwargs)
+        self.calls += 1
+        if kwargs.get("stream"):
+            return self._count_stream(response)
+        self.completion_tokens += response.get("usage", {}).get("completion_tokens", 0)
+        return response
+
+    def _count_stream(self, stream):
+        # 流式响应不含 usage，每个带内容的分片计为一个 token
+        try:
+            for chunk in stream:
+                if chunk["choices"][0].get("delta", {}).get("content"):
+                    self.completion_tokens += 1
+                yield chunk
+        finally:
+            stream.close()
+
+    def __getattr__(self, name):
+        # 其余属性（如 logits_all 设置）转发给原模型
+        return getattr(self._llm, name)
+
+
+def chrf(hypothesis: str, reference: str, max_n: int = 6, beta: float = 2.0) -> float:
+    """字符 n-gram F 值（chrF），忽略空白"""
+    hypothesis = "".join(hypothesis.split())
+    reference = "".join(reference.split())
+    scores = []
+    for n in range(1, max_n + 1):
+        hyp = Counter(hypothesis[i:i + n] for i in range(len(hypothesis) - n + 1))
+        ref = Counter(reference[i:i + n] for i in range(len(reference) - n + 1))
+        if not hyp or not ref:
+            continue
+        overlap = sum((hyp & ref).values())
+        precision = overlap / sum(hyp.values())
+        recall = overlap / sum(ref.values())
+        if precision + recall == 0:
+            scores.append(0.0)
+            continue
+        scores.append((1 + beta ** 2) * precision * recall / (beta ** 2 * precision + recall))
+    return 100 * sum(scores) / len(scores) if scores else 0.0
+
+
+def _texts(path: str) -> List[str]:
+    with open(path, "r", encoding="utf-8") as f:
+        return [s.text for s in parse_srt(f.read())]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="反思模式耗时与质量对比")
+    parser.add_argument("model_path")
+    parser.add_argument("input_path")
+    parser.add_argument("--reference", help="参考译文 SRT，条目与输入一一对应")
+    parser.add_argument("--source-lang", default="Auto Detect")
+    parser.add_argument("--target-lang", default="Chinese (Simplified)")
+    parser.add_argument("--n-gpu-layers", type=int, default=-1)
+    parser.add_argument("--limit", type=int, default=0, help="只取前 N 条字幕")
+    parser.add_argument("--threshold", type=float, default=0.8, help="gated 模式的置信度阈值")
+    parser.add_argument("--logprobs", action="store_true", help="置信度中加入 token 对数概率（占用更多内存）")
+    args = parser.parse_args()
+
+    localization.init("en")
+    # 提示词与译文的 INFO 日志量很大，会干扰计时输出
+    log.get_logger("LightVT").setLevel(logging.WARNING)
+    with open(args.input_path, "r", encoding="utf-8") as f:
+        subtitles = parse_srt(f.read())
+    if args.limit:
+        subtitles = subtitles[:args.limit]
+    input_text = format_srt(subtitles)
+
+    # 只加载一次模型；跳过术语表生成与块间等待，使各模式只差在反思步骤
+    llm = llm_helper.create_llm(args.model_path, args.n_gpu_layers, logits_all=args.logprobs)
+    MODES["gated"]["reflection_threshold"] = args.threshold
+
+    results: Dict[str, dict] = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for mode, options in MODES.items():
+            counting_llm = CountingLlm(llm)
+            output_path = os.path.join(tmp_dir, f"{mode}.srt")
+            start = time.perf_counter()
+            translator.translate_srt_text(
+                input_text, output_path, args.model_path, args.source_lang, args.target_lang,
+                n_gpu_layers=args.n_gpu_layers, log_fn=lambda message: None,
+                llm=counting_llm, generate_glossary=False, chunk_pause=0, **options)
+            elapsed = time.perf_counter() - start
+            results[mode] = {
+                "seconds": elapsed,
+                "calls": counting_llm.calls,
+                "completion_tokens": counting_llm.completion_tokens,
+                "texts": _texts(output_path) if os.path.exists(output_path) else [],
+            }
+
+    reference = _texts(args.reference)[:len(subtitles)] if args.reference else results["full"]["texts"]
+    reference_name = "参考译文" if args.reference else "full 输出"
+
+    print(f"字幕条数: {len(subtitles)}")
+    print(f"{'模式':<8}{'耗时(s)':>10}{'调用次数':>10}{'生成tokens':>12}{'chrF':>8}   (chrF 基准: {reference_name})")
+    for mode, result in results.items():
+        score = chrf("\n".join(result["texts"]), "\n".join(reference))
+        print(f"{mode:<8}{result['seconds']:>10.1f}{result['calls']:>10}{result['completion_tokens']:>12}{score:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
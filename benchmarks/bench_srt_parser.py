@@ -0,0 +1,95 @@
+# benchmarks/bench_srt_parser.py - SRT 解析器性能与健壮性对比
+#
+# 用法（在项目根目录执行）：
+#   python -m benchmarks.bench_srt_parser [字幕条数]
+#
+# 对比旧版按 "\n\n" 切分的解析器、单遍逐行解析器 iter_srt，
+# 以及第三方 srt 包（已安装时）的解析吞吐量，
+# 并统计各解析器在 CRLF、空白行分隔、多空行等不规范输入上解析出的字幕条数。
+
+import sys
+import time
+from typing import Callable, Dict, List
+
+from service.subtitle import Subtitle, parse_time_code
+from service.subtitle.srt_format import parse_srt
+
+try:
+    import srt as srt_package
+except ImportError:
+    srt_package = None
+
+
+def legacy_parse_srt(content: str) -> List[Subtitle]:
+    """旧版解析器（按空行切块），仅用于对比"""
+    subtitles = []
+    blocks = content.strip().split("\n\n")
+    for block in blocks:
+        lines = block.split("\n")
+        if len(lines) >= 3:
+            start_ms, end_ms = parse_time_code(lines[1])
+            subtitles.append(Subtitle(lines[0], lines[1], "\n".join(lines[2:]), start_ms, end_ms))
+    return subtitles
+
+
+def _time_code(i: int) -> str:
+    s, e = i * 2, i * 2 + 1
+    return f"00:{s // 60 % 60:02d}:{s % 60:02d},000 --> 00:{e // 60 % 60:02d}:{e % 60:02d},500"
+
+
+def build_corpus(count: int, separator: str = "\n\n", newline: str = "\n") -> str:
+    blocks = [
+        newline.join([str(i + 1), _time_code(i), f"This is line number {i}.", "- And a second line!"])
+        for i in range(count)
+    ]
+    return separator.join(blocks).replace("\n", newline) + newline
+
+
+PARSERS: Dict[str, Callable[[str], list]] = {
+    "legacy": legacy_parse_srt,
+    "iter_srt": parse_srt,
+}
+if srt_package is not None:
+    PARSERS["srt"] = lambda content: list(srt_package.parse(content))
+
+
+def _safe_count(parse: Callable[[str], list], content: str) -> str:
+    try:
+        return str(len(parse(content)))
+    except Exception as e:
+        return f"错误({type(e).__name__})"
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    corpus = build_corpus(count)
+
+    print(f"字幕条数: {count}，文本大小: {len(corpus) / 1024 / 1024:.1f} MB")
+    print("\n吞吐量（取 3 次最快）:")
+    for name, parse in PARSERS.items():
+        best = min(_time_parse(parse, corpus) for _ in range(3))
+        print(f"  {name:<10} {best * 1000:8.1f} ms  {count / best:10.0f} 条/秒")
+    if srt_package is None:
+        print("  (未安装 srt 包，跳过对比)")
+
+    cases = {
+        "标准": build_corpus(100),
+        "CRLF": build_corpus(100, newline="\r\n"),
+        "空白行分隔": build_corpus(100, separator="\n \t\n"),
+        "多空行": build_corpus(100, separator="\n\n\n\n"),
+        "缺少空行": build_corpus(100, separator="\n"),
+    }
+    print("\n健壮性（每个用例 100 条字幕，显示解析出的条数）:")
+    print("  " + "用例".ljust(10) + "".join(name.ljust(12) for name in PARSERS))
+    for case, content in cases.items():
+        print("  " + case.ljust(10) + "".join(_safe_count(parse, content).ljust(12) for parse in PARSERS.values()))
+
+
+def _time_parse(parse: Callable[[str], list], content: str) -> float:
+    start = time.perf_counter()
+    parse(content)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    main()
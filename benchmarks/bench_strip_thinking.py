@@ -0,0 +1,94 @@
+# benchmarks/bench_strip_thinking.py - strip_thinking 差分模糊测试与病态输入基准
+#
+# 用法（在项目根目录执行，不需要模型）：
+#   python -m benchmarks.bench_strip_thinking [--fuzz 20000] [--seed 0] [--sizes 1000,4000]
+#
+# 1. 模糊测试：由思考标签、终止标记、附注、空白、JSON 标记等片段随机拼接输入，
+#    断言 strip_thinking 与参考实现 strip_thinking_reference 输出一致
+# 2. 基准：未闭合标签、无终止标记的思考段落、大量空行等病态输入下两者的耗时
+
+import argparse
+import random
+import sys
+import time
+from typing import Callable, Dict
+
+from benchmarks.strip_thinking_reference import strip_thinking_reference
+from utils.llm_utils import strip_thinking
+
+_FRAGMENTS = [
+    "<think>", "</think>", "<THINK>", "</Think>", "<thinking>", "</thinking>", "<reasoning>", "</reasoning>",
+    "<thought>", "</thought>", "<think", "think>",
+    "Reasoning:", "reasoning：", "Thinking Process:", "Thinking  Process：", "**Thinking Process**",
+    "思考过程：", "分析过程:", "Output:", "Final Answer:", "final  answer：", "答案：", "请开始提取：",
+    "请输出", "JSON 输出", "输出格式：",
+    "Note:", "注意：", "Reminder:", "提醒:", "NOTE：",
+    "1. **Analyze the text**", "2. Analyze", "1. Task", "3. Output", "Step 1:", "step 2.", "Task:",
+    "Categories:", "**", "1.", "Analyze",
+    "[", "]", "{", "}", '"term"', '["a", "b"]', '{"k": "v"}',
+    "\n", "\n", "\n\n", " ", "  ", "\t", "\r\n", "\x0b", " ", "　",
+    "hello", "翻译", "the answer is", "-", ":",
+]
+
+_PATHOLOGICAL: Dict[str, Callable[[int], str]] = {
+    "unclosed_tags": lambda n: "<think>" * (n // 7),
+    "unterminated_process": lambda n: "Reasoning: x " * (n // 13),
+    "blank_lines": lambda n: "\n" * n + "x",
+    "indented_blank_lines": lambda n: " \n" * (n // 2) + "1. Analysis",
+    "note_without_colon": lambda n: "\n \n Note" * (n // 8),
+    "long_analyze_line": lambda n: "1. **Analyze " + "a" * n,
+    "typical": lambda n: "<think>" + "reasoning " * (n // 10) + "</think>\n" + '["译文1", "译文2"]',
+}
+
+
+def fuzz(iterations: int, seed: int) -> int:
+    rng = random.Random(seed)
+    failures = 0
+    for i in range(iterations):
+        text = "".join(rng.choice(_FRAGMENTS) for _ in range(rng.randint(0, 40)))
+        expected = strip_thinking_reference(text)
+        actual = strip_thinking(text)
+        if actual != expected:
+            failures += 1
+            if failures <= 5:
+                print(f"不一致 #{i}: 输入={text!r}\n  参考={expected!r}\n  实际={actual!r}")
+    return failures
+
+
+def _time(fn: Callable[[str], str], text: str, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="strip_thinking 差分模糊测试与病态输入基准")
+    parser.add_argument("--fuzz", type=int, default=20000, help="模糊测试次数")
+    parser.add_argument("--seed", type=int, default=0)
+    # 参考实现在大量空行的输入上是平方复杂度，16000 字符时需要数十秒
+    parser.add_argument("--sizes", default="1000,4000", help="病态输入的字符数，逗号分隔")
+    args = parser.parse_args()
+
+    failures = fuzz(args.fuzz, args.seed)
+    print(f"模糊测试: {args.fuzz} 次，不一致 {failures} 次")
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    print(f"{'输入':<24}{'字符数':>8}{'参考(ms)':>12}{'新实现(ms)':>12}{'加速':>10}")
+    for name, make in _PATHOLOGICAL.items():
+        for size in sizes:
+            text = make(size)
+            if strip_thinking(text) != strip_thinking_reference(text):
+                failures += 1
+                print(f"{name}/{size}: 输出不一致")
+            reference = _time(strip_thinking_reference, text)
+            current = _time(strip_thinking, text)
+            print(f"{name:<24}{len(text):>8}{reference * 1000:>12.2f}{current * 1000:>12.2f}"
+                  f"{reference / current if current else float('inf'):>9.1f}x")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+# benchmarks/bench_subtitle_memory.py - 字幕记录内存占用对比
+#
+# 用法（在项目根目录执行）：
+#   python -m benchmarks.bench_subtitle_memory [字幕条数]
+#
+# 对比旧版每条字幕一个 dict 与 __slots__ 记录 Subtitle 的内存占用，
+# 包括解析结果本身以及翻译后逐条重建（apply_translation_to_chunk）的开销。
+
+import sys
+import tracemalloc
+from typing import Callable, List
+
+from service.subtitle import Subtitle
+
+
+def _measure(build: Callable[[], List]) -> int:
+    """返回 build() 结果存活时占用的内存字节数"""
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return after - before
+
+
+def _time_code(i: int) -> str:
+    return f"00:{i // 60 % 60:02d}:{i % 60:02d},000 --> 00:{i // 60 % 60:02d}:{i % 60:02d},900"
+
+
+def build_dicts(count: int) -> List[dict]:
+    subtitles = [{"id": str(i), "time_code": _time_code(i), "text": f"line {i}"} for i in range(count)]
+    # 旧版翻译结果：每条字幕复制一个新 dict
+    return [{**s, "text": s["text"] + " (translated)"} for s in subtitles]
+
+
+def build_records(count: int) -> List[Subtitle]:
+    subtitles = [Subtitle(str(i), _time_code(i), f"line {i}", i * 1000, i * 1000 + 900) for i in range(count)]
+    return [s.with_text(s.text + " (translated)") for s in subtitles]
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    dict_bytes = _measure(lambda: build_dicts(count))
+    record_bytes = _measure(lambda: build_records(count))
+    print(f"字幕条数: {count}")
+    print(f"dict 记录:     {dict_bytes / 1024 / 1024:8.1f} MB ({dict_bytes / count:6.0f} B/条)")
+    print(f"Subtitle 记录: {record_bytes / 1024 / 1024:8.1f} MB ({record_bytes / count:6.0f} B/条)")
+    print(f"节省: {1 - record_bytes / dict_bytes:.1%}")
+
+
+if __name__ == "__main__":
+    main()
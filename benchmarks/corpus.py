@@ -0,0 +1,90 @@
+# benchmarks/corpus.py - 基准测试用的合成语料：可复现的 SRT 字幕与纯文本
+#
+# 同一 (条数, seed) 总是生成相同的内容。字幕中混有反复出现的专有名词（术语表预筛选、术语提示词）、
+# 重复短句（去重）、歌词与声音标注（分类跳过）、多行与 <i> 标签，接近真实字幕的分布。
+
+import random
+from typing import Dict, List
+
+from service.subtitle import Subtitle, format_timestamp
+from service.subtitle.srt_format import format_srt
+
+# 默认的语料规模（字幕条数）
+SIZES = {"small": 100, "medium": 1000, "large": 5000}
+
+NAMES = ["Captain Reyes", "Marcus", "Elena Voss", "Port Aurelia", "the Nightingale",
+         "Doctor Okafor", "Halden Station", "Kestrel", "Admiral Thorne", "Sable Reach"]
+
+# 与 NAMES 对应的术语表，用于提示词构建与端到端测试
+GLOSSARY: Dict[str, str] = {
+    "captain reyes": "雷耶斯船长", "marcus": "马库斯", "elena voss": "埃琳娜·沃斯",
+    "port aurelia": "奥蕾莉亚港", "nightingale": "夜莺号", "doctor okafor": "奥卡福医生",
+    "halden station": "哈尔登空间站", "kestrel": "红隼", "admiral thorne": "索恩上将",
+    "sable reach": "黑貂星域",
+}
+
+_SUBJECTS = ["we", "you", "they", "I", "nobody", "the crew", "the engine", "this ship"]
+_VERBS = ["need", "can't leave", "have to find", "never trusted", "should warn", "lost track of",
+          "are heading to", "will meet"]
+_OBJECTS = ["the signal", "the cargo", "a way out", "the old map", "the second shift",
+            "the last transmission", "our supplies", "the docking bay"]
+_ENDINGS = [".", "?", "!", "...", " before dawn.", " right now.", ", I swear.", " again?"]
+_SHORT = ["Yes.", "No.", "What?", "Let's go.", "Hurry!", "Okay.", "Come on.", "I know."]
+_SOUNDS = ["[door slams]", "[alarm blaring]", "(engine humming)", "[static]"]
+_LYRICS = ["♪ Sail away into the night ♪", "♪ Stars are burning bright ♪"]
+
+
+def _sentence(rng: random.Random) -> str:
+    sentence = f"{rng.choice(_SUBJECTS)} {rng.choice(_VERBS)} {rng.choice(_OBJECTS)}"
+    if rng.random() < 0.3:
+        sentence = f"{sentence} with {rng.choice(NAMES)}"
+    if rng.random() < 0.4:
+        sentence = f"{rng.choice(NAMES)}, {sentence}"
+    sentence += rng.choice(_ENDINGS)
+    return sentence[0].upper() + sentence[1:]
+
+
+def _subtitle_text(rng: random.Random, index: int) -> str:
+    roll = rng.random()
+    if roll < 0.08:
+        return rng.choice(_SHORT)
+    if roll < 0.11:
+        return rng.choice(_SOUNDS)
+    if roll < 0.13:
+        return rng.choice(_LYRICS)
+    if roll < 0.14:
+        return str(index * 7 % 1000)
+    text = _sentence(rng)
+    if rng.random() < 0.25:
+        text = f"{text}\n{_sentence(rng)}"
+    if rng.random() < 0.05:
+        text = f"<i>{text}</i>"
+    return text
+
+
+def synthetic_subtitles(count: int, seed: int = 0) -> List[Subtitle]:
+    """生成 count 条字幕，每条约 1~3 秒，间隔 0.2~1.5 秒"""
+    rng = random.Random(seed)
+    subtitles = []
+    start_ms = 1000
+    for i in range(count):
+        end_ms = start_ms + rng.randint(1000, 3000)
+        time_code = f"{format_timestamp(start_ms)} --> {format_timestamp(end_ms)}"
+        subtitles.append(Subtitle(str(i + 1), time_code, _subtitle_text(rng, i), start_ms, end_ms))
+        start_ms = end_ms + rng.randint(200, 1500)
+    return subtitles
+
+
+def synthetic_srt(count: int, seed: int = 0) -> str:
+    return format_srt(synthetic_subtitles(count, seed)) + "\n"
+
+
+def synthetic_text(sentences: int, seed: int = 0) -> str:
+    """生成纯文本，每段 3~8 句"""
+    rng = random.Random(seed)
+    paragraphs = []
+    while sentences > 0:
+        size = min(sentences, rng.randint(3, 8))
+        paragraphs.append(" ".join(_sentence(rng) for _ in range(size)))
+        sentences -= size
+    return "\n\n".join(paragraphs) + "\n"
@@ -0,0 +1,69 @@
+# benchmarks/stub_llm.py - 确定性的假模型，代替 llama_cpp.Llama 测量推理以外的开销
+#
+# 实现 create_chat_completion（含 stream=True），按提示词判断调用类型并立即返回格式正确的结果：
+#   翻译 / review / 改进翻译   JSON 字符串数组，元素数取自提示词中的条数
+#   自我修正                   {"critique": "OK", "translation": [...]}
+#   改进建议                   "OK"，issue_every > 0 时每 issue_every 次给出一条问题
+#   纯文本翻译                 与原文长度相当的译文
+# mismatch_every > 0 时每 mismatch_every 次数组调用少输出一条，用于触发条数不匹配后的 review 调用。
+# 流式输出按 chars_per_token 个字符一个分片。seconds 为在假模型内部花费的时间，从总耗时中扣除即为流水线开销。
+
+import json
+import re
+import time
+from typing import Any, Dict, Iterator, List
+
+_EXPECTED_COUNT = re.compile(r"(?:共|必须输出|必须包含)\s*(\d+)\s*条")
+
+
+class StubLlm:
+    def __init__(self, chars_per_token: int = 4, mismatch_every: int = 0, issue_every: int = 0):
+        self.chars_per_token = chars_per_token
+        self.mismatch_every = mismatch_every
+        self.issue_every = issue_every
+        self.calls = 0
+        self.array_calls = 0
+        self.recommend_calls = 0
+        self.seconds = 0.0
+        self.n_tokens = 0
+
+    def create_chat_completion(self, messages: List[Dict[str, str]], stream: bool = False, **kwargs) -> Any:
+        start = time.perf_counter()
+        self.calls += 1
+        prompt = "\n".join(message["content"] for message in messages)
+        user_prompt = messages[-1]["content"]
+        if "只输出 OK" in user_prompt:
+            self.recommend_calls += 1
+            has_issue = self.issue_every and self.recommend_calls % self.issue_every == 0
+            content = "- 语气过于生硬，建议更口语化" if has_issue else "OK"
+        elif match := _EXPECTED_COUNT.search(user_prompt):
+            self.array_calls += 1
+            count = int(match.group(1))
+            if self.mismatch_every and self.array_calls % self.mismatch_every == 0:
+                count = max(0, count - 1)
+            translations = [f"译文{i + 1}" for i in range(count)]
+            if "critique" in user_prompt:
+                content = json.dumps({"critique": "OK", "translation": translations}, ensure_ascii=False)
+            else:
+                content = json.dumps(translations, ensure_ascii=False)
+        else:
+            content = "译" * max(1, len(user_prompt) // 4)
+        prompt_tokens = len(prompt) // self.chars_per_token
+        completion_tokens = -(-len(content) // self.chars_per_token)
+        self.n_tokens = prompt_tokens + completion_tokens
+        self.seconds += time.perf_counter() - start
+        if stream:
+            return self._stream(content)
+        return {
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens},
+        }
+
+    def _stream(self, content: str) -> Iterator[Dict[str, Any]]:
+        step = self.chars_per_token
+        for i in range(0, len(content), step):
+            start = time.perf_counter()
+            chunk = {"choices": [{"index": 0, "delta": {"content": content[i:i + step]}, "finish_reason": None}]}
+            self.seconds += time.perf_counter() - start
+            yield chunk
+        yield {"choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]}
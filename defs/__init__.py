@@ -14,7 +14,7 @@ def get_supported_subtitle_types():
     """
     获取支持的字幕文件扩展名列表
     """
-    return (".srt",)
+    return (".srt", ".ass", ".ssa", ".vtt", ".sub")
 
 def get_supported_video_types():
     """
@@ -1,3 +1,4 @@
+import logging
 import os
 import queue
 import threading
@@ -7,12 +8,14 @@ import traceback
 import customtkinter as ctk
 from customtkinter import filedialog
 from main import process_file,get_logger,utils
-from service import localization
+from service import localization, log
+from service.translator.progress import ProgressEvent, format_progress
 from defs import FileType, get_supported_subtitle_types, get_supported_text_types, get_supported_video_types
 from gui.options_dialog import OptionsDialog
 import utils
 import sys
 from gui.glossary_dialog import GlossaryDialog
+from gui.log_view import LogView, QueueLogHandler, LOG_BATCH_SIZE, GUI_MESSAGE_ATTR
 from toolz import pipe
 import info
 
@@ -38,6 +41,13 @@ class LightVTGUI:
         
         # 创建队列用于线程间通信
         self.message_queue = queue.Queue()
+        self.processing_active = False
+
+        # 翻译过程中的警告与错误也显示在界面日志中
+        self.log_handler = QueueLogHandler(self.message_queue)
+        self.logger.addHandler(self.log_handler)
+        log.set_prompt_logging(utils.settings.get_prompt_log_enabled(),
+                               utils.settings.get_prompt_log_sample_rate())
         
         localization.init(lang="zh-CN")
         
@@ -308,7 +318,18 @@ class LightVTGUI:
             width=120,
             height=32
         )
-        self.clear_button.grid(row=0, column=2)
+        self.clear_button.grid(row=0, column=2, padx=(0, 10))
+
+        ctk.CTkLabel(button_frame, text=localization.get("log_level")).grid(row=0, column=3, padx=(0, 5))
+        self.log_level_var = ctk.StringVar(value=utils.settings.get_log_display_level())
+        self.log_level_menu = ctk.CTkOptionMenu(
+            button_frame,
+            values=list(utils.settings.LOG_DISPLAY_LEVELS),
+            variable=self.log_level_var,
+            command=self.set_log_level,
+            width=100
+        )
+        self.log_level_menu.grid(row=0, column=4)
         
         # ===== 日志区域 =====
         log_frame = ctk.CTkFrame(self.root)  # 添加一个框架使文本框更明显
@@ -324,6 +345,7 @@ class LightVTGUI:
             border_width=1  # 添加边框使文本框更明显
         )
         self.log_text.grid(row=0, column=0, padx=1, pady=1, sticky="nsew")
+        self.log_view = LogView(self.log_text, self.log_level_var.get())
         
         # 添加初始文本使文本框可见
         self.log_text.insert("1.0", localization.get("log_ready"))
@@ -501,30 +523,56 @@ class LightVTGUI:
             self.output_var.set(filename)
             utils.settings.set_output_path(filename)
     
-    def log_message(self, message, progress_var=None):
-        """添加消息到日志"""
+    def log_message(self, message, progress_var=None, level=logging.INFO):
+        """添加消息到日志（可在任意线程调用，界面在下次刷新时批量显示）"""
         if message is None or message.strip() == "":
             return
-        self.message_queue.put(message)
+        self.logger.log(level, message, extra={GUI_MESSAGE_ATTR: True})
+        self.message_queue.put((level, message))
+
+    def set_log_level(self, level: str):
+        """设置界面日志的显示级别"""
+        self.log_view.set_level(level)
+        utils.settings.set_log_display_level(level)
+
+    def report_progress(self, event: ProgressEvent):
+        """翻译进度事件，经消息队列交给界面线程"""
+        self.message_queue.put(event)
+
+    def update_progress(self, event: ProgressEvent):
+        """收到第一个进度事件后进度条切换为确定进度"""
+        if not self.processing_active:
+            # 处理已结束，不再覆盖最终状态
+            return
+        if self.progress_bar.cget("mode") != "determinate":
+            self.progress_bar.stop()
+            self.progress_bar.configure(mode="determinate")
+        self.progress_bar.set(event.fraction)
+        self.progress_var.set(format_progress(event))
     
     def process_queue(self):
-        """处理消息队列"""
+        """处理消息队列：每次刷新合并插入日志，进度只取最新的一个事件"""
+        messages = []
+        progress = None
+        drained = False
         try:
-            while True:
+            for _ in range(LOG_BATCH_SIZE):
                 message = self.message_queue.get_nowait()
-
-                self.logger.info(message)
-                
-                # 插入到文本框
-                self.log_text.insert("end", f"{message}\n")
-                self.log_text.see("end")
+                if isinstance(message, ProgressEvent):
+                    progress = message
+                else:
+                    messages.append(message)
         except queue.Empty:
-            pass
+            drained = True
         finally:
-            self.root.after(100, self.process_queue)
+            if progress:
+                self.update_progress(progress)
+            self.log_view.append(messages)
+            # 队列中还有积压时尽快再次刷新
+            self.root.after(100 if drained else 10, self.process_queue)
     
     def clear_log(self):
-        self.log_text.delete("0.0", "end")
+        self.log_view.clear()
     
     def start_processing(self):
         # 验证输入
@@ -554,6 +602,7 @@ class LightVTGUI:
         self.stop_button.configure(state="normal")
         
         # 启动进度条
+        self.processing_active = True
         self.progress_bar.configure(mode="indeterminate")
         self.progress_bar.start()
         self.progress_var.set(localization.get("processing"))
@@ -592,7 +641,8 @@ class LightVTGUI:
                 'gpu_layers': int(self.gpu_layers_var.get()),
                 'reflection_enabled': self.reflection_enabled_var.get(),  # 添加反思参数
                 'stop_event': self.stop_event,
-                'log_callback': self.log_message
+                'log_callback': self.log_message,
+                'progress_callback': self.report_progress
             }
             
             msg_start_processing = localization.get("msg_start_processing")
@@ -600,6 +650,7 @@ class LightVTGUI:
             
             # 调用处理函数
             process_file(args)
+            self.processing_active = False
             
             if self.stop_event.is_set():
                 self.log_message(localization.get("msg_processing_stopped"))
@@ -610,8 +661,9 @@ class LightVTGUI:
                 messagebox.showinfo(localization.get("completed"), f"{localization.get('msg_processing_complete_detail')} {args['output']}")
                 
         except Exception as e:
+            self.processing_active = False
             error_details = traceback.format_exc()
-            self.log_message(f"{localization.get('error')}: {str(error_details)}")
+            self.log_message(f"{localization.get('error')}: {str(error_details)}", level=logging.ERROR)
             self.progress_var.set(localization.get("error"))
             messagebox.showerror(localization.get("error"), f"{localization.get('error_processing_failed')} {str(e)}")
         
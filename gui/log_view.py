@@ -0,0 +1,84 @@
+# lightVT/gui/log_view.py - 界面日志：按级别过滤、批量插入、限制行数
+
+import logging
+import queue
+from typing import List, Tuple
+
+import customtkinter as ctk
+
+from service import localization
+
+# 日志区域最多保留的行数，超出时删除最早的行
+LOG_MAX_LINES = 5000
+# 单条消息最多显示的字符数（完整内容仍写入日志文件）
+LOG_MAX_MESSAGE_LENGTH = 2000
+# 每次刷新最多处理的消息数，剩余的在下次刷新时继续
+LOG_BATCH_SIZE = 500
+
+LOG_LEVELS = {
+    "INFO": logging.INFO,
+    "WARNING": logging.WARNING,
+    "ERROR": logging.ERROR,
+}
+
+# 由界面 log_message 写入的记录带有此属性，转发处理器据此跳过，避免重复显示
+GUI_MESSAGE_ATTR = "gui_message"
+
+
+class QueueLogHandler(logging.Handler):
+    """将 WARNING 及以上的日志记录以 (级别, 文本) 形式转发到界面消息队列"""
+
+    def __init__(self, message_queue: queue.Queue):
+        super().__init__(logging.WARNING)
+        self.message_queue = message_queue
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if getattr(record, GUI_MESSAGE_ATTR, False):
+            return
+        try:
+            self.message_queue.put((record.levelno, f"[{record.levelname}] {record.getMessage()}"))
+        except Exception:
+            self.handleError(record)
+
+
+class LogView:
+    """在 CTkTextbox 上维护有上限的日志：一次插入一批消息，超出 LOG_MAX_LINES 时删除最早的行"""
+
+    def __init__(self, textbox: ctk.CTkTextbox, level: str = "INFO", max_lines: int = LOG_MAX_LINES):
+        self.textbox = textbox
+        self.max_lines = max_lines
+        self.set_level(level)
+
+    def set_level(self, level: str) -> None:
+        """设置显示级别，只影响之后收到的消息"""
+        self.level = LOG_LEVELS.get(level, logging.INFO)
+
+    def accepts(self, level: int) -> bool:
+        return level >= self.level
+
+    def append(self, messages: List[Tuple[int, str]]) -> None:
+        """批量追加消息：一次 insert、一次 see"""
+        lines = [_clip(message) for level, message in messages if self.accepts(level)]
+        if not lines:
+            return
+        self.textbox.insert("end", "".join(f"{line}\n" for line in lines))
+        self._trim()
+        self.textbox.see("end")
+
+    def clear(self) -> None:
+        self.textbox.delete("0.0", "end")
+
+    def _trim(self) -> None:
+        line_count = int(self.textbox.index("end-1c").split(".")[0])
+        if line_count <= self.max_lines:
+            return
+        # 多删除 10% 的行，避免每次刷新都触发删除
+        excess = line_count - self.max_lines + self.max_lines // 10
+        self.textbox.delete("1.0", f"{excess + 1}.0")
+        self.textbox.insert("1.0", localization.get("log_trimmed") + "\n")
+
+
+def _clip(message: str) -> str:
+    if len(message) <= LOG_MAX_MESSAGE_LENGTH:
+        return message
+    return f"{message[:LOG_MAX_MESSAGE_LENGTH]}… (+{len(message) - LOG_MAX_MESSAGE_LENGTH})"
@@ -1,7 +1,10 @@
 from .generate_glossary import generate_glossary
 from .process_file import process_file
+from .benchmark import run_benchmark, write_report
 
 __all__ = [
     "generate_glossary",
-    "process_file"
+    "process_file",
+    "run_benchmark",
+    "write_report"
 ]
\ No newline at end of file
@@ -0,0 +1,184 @@
+# lightVT/interface/benchmark.py - 真实模型的推理基准：在参数网格上翻译同一字幕文件并生成可比较的报告
+
+import csv
+import itertools
+from collections import deque
+import json
+import os
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, List
+
+import service.translator as translator
+from service import glossary
+from service import localization
+from service.subtitle import formats
+from service.subtitle.srt_format import format_srt
+from service.translator import confidence, llm_helper
+import utils
+from utils import timing, usage
+
+# 反思设置：名称 -> translate_srt_text 参数；gated 只对置信度低于阈值的块做 single 反思
+REFLECTION_MODES: Dict[str, Dict[str, Any]] = {
+    "off": dict(reflection_enabled=False),
+    "single": dict(reflection_enabled=True, reflection_mode="single"),
+    "full": dict(reflection_enabled=True, reflection_mode="full"),
+    "gated": dict(reflection_enabled=True, reflection_mode="single"),
+}
+
+@dataclass
+class BenchResult:
+    """一组参数的测量结果"""
+    chunk_size: int
+    context_size: int
+    n_gpu_layers: int
+    reflection: str
+    success: bool
+    subtitles: int
+    chunks: int
+    seconds: float
+    seconds_per_subtitle: float
+    model_calls: int
+    prompt_tokens: int
+    completion_tokens: int
+    prompt_tokens_per_second: float
+    generation_tokens_per_second: float
+    review_rate: float      # 触发 review（译文条数与原文不一致）的块占比
+    mismatch_rate: float    # review 之后仍缺译文的字幕占比
+    error: str = ""         # 失败时的最后一条日志
+
+
+def parse_grid_values(text: str, cast: Callable[[str], Any] = int) -> List[Any]:
+    """解析逗号分隔的参数列表，如 "10,20,40" """
+    return [cast(value.strip()) for value in text.split(",") if value.strip()]
+
+
+def _measure(llm: Any, input_text: str, subtitle_format: str, subtitle_count: int, output_path: str,
+             model_path: str, source_lang: str, target_lang: str, chunk_size: int, context_size: int,
+             n_gpu_layers: int, reflection: str, reflection_threshold: float) -> BenchResult:
+    options = dict(REFLECTION_MODES[reflection])
+    if reflection == "gated":
+        options["reflection_threshold"] = reflection_threshold
+    last_message = deque(maxlen=1)
+    usage.reset_stats()
+    timeline = timing.start_timeline()
+    try:
+        success = translator.translate_srt_text(
+            input_text, output_path, model_path, source_lang, target_lang,
+            n_gpu_layers=n_gpu_layers, chunk_size=chunk_size, context_size=context_size,
+            log_fn=last_message.append, subtitle_format=subtitle_format,
+            llm=llm, generate_glossary=False, chunk_pause=0, **options)
+    finally:
+        timing.finish_timeline()
+
+    stats = usage.get_stats()
+    total = stats.total()
+    chunks = timeline.stages["translate"].calls if "translate" in timeline.stages else 0
+    seconds = timeline.total_seconds
+    reviews = stats.calls[usage.REVIEW].calls if usage.REVIEW in stats.calls else 0
+    missing = 0
+    if success:
+        with open(output_path, "r", encoding="utf-8") as f:
+            output = formats.parse_document(f.read(), subtitle_format).subtitles
+        missing_text = localization.get("msg_translation_missing")
+        missing = sum(1 for subtitle in output if subtitle.text == missing_text)
+    return BenchResult(
+        chunk_size=chunk_size,
+        context_size=context_size,
+        n_gpu_layers=n_gpu_layers,
+        reflection=reflection,
+        success=bool(success),
+        subtitles=subtitle_count,
+        chunks=chunks,
+        seconds=seconds,
+        seconds_per_subtitle=seconds / subtitle_count if subtitle_count else 0.0,
+        model_calls=total.calls,
+        prompt_tokens=total.prompt_tokens,
+        completion_tokens=total.completion_tokens,
+        prompt_tokens_per_second=total.prompt_tokens_per_second,
+        generation_tokens_per_second=total.generation_tokens_per_second,
+        review_rate=reviews / chunks if chunks else 0.0,
+        mismatch_rate=missing / subtitle_count if subtitle_count else 0.0,
+        error="" if success or not last_message else last_message[0],
+    )
+
+
+def run_benchmark(args: Dict[str, Any]) -> Dict[str, Any]:
+    """在参数网格上翻译同一字幕文件，返回报告（含每组参数的 BenchResult）
+
+    args: input、model_path 必填；chunk_sizes、context_sizes、gpu_layers、reflection 为取值列表；
+    可选 limit（只取前 N 条字幕）、source_lang、target_lang、reflection_threshold、
+    on_result（每组参数完成后以 BenchResult 调用）。
+    同一 n_gpu_layers 的模型只加载一次，加载耗时单独记录；术语表使用该文件已缓存的术语表，
+    没有时不生成，各组参数只差在翻译本身。
+    """
+    input_file = args['input']
+    model_path = args['model_path']
+    source_lang = args.get('source_lang', '自动检测')
+    target_lang = args.get('target_lang', '中文（简体）')
+    reflection_threshold = args.get('reflection_threshold', utils.settings.get_reflection_threshold())
+    if reflection_threshold is None:
+        reflection_threshold = confidence.DEFAULT_REFLECTION_THRESHOLD
+    on_result = args.get('on_result')
+    started_at = time.strftime("%Y-%m-%d %H:%M:%S")
+
+    subtitle_format = formats.format_of(input_file)
+    input_text = utils.safe_read_file(input_file)
+    subtitles = formats.parse_document(input_text, subtitle_format).subtitles
+    if args.get('limit'):
+        # 截取部分字幕时按 SRT 翻译
+        subtitles = subtitles[:args['limit']]
+        input_text, subtitle_format = format_srt(subtitles), ".srt"
+
+    glossary.load_glossary(glossary.to_glossary_filename(input_file))
+    models: Dict[int, Any] = {}
+    load_seconds: Dict[int, float] = {}
+
+    results: List[BenchResult] = []
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            # n_gpu_layers 放在最外层，切换时释放上一个模型
+            grid = itertools.product(args['gpu_layers'], args['chunk_sizes'],
+                                     args['context_sizes'], args['reflection'])
+            for n_gpu_layers, chunk_size, context_size, reflection in grid:
+                if n_gpu_layers not in models:
+                    models.clear()
+                    start = time.perf_counter()
+                    models[n_gpu_layers] = llm_helper.create_llm(model_path, n_gpu_layers)
+                    load_seconds[n_gpu_layers] = time.perf_counter() - start
+                result = _measure(models[n_gpu_layers], input_text, subtitle_format, len(subtitles),
+                                  os.path.join(tmp_dir, f"output{subtitle_format}"),
+                                  model_path, source_lang, target_lang, chunk_size, context_size,
+                                  n_gpu_layers, reflection, reflection_threshold)
+                results.append(result)
+                if on_result:
+                    on_result(result)
+    finally:
+        models.clear()
+
+    return {
+        "model_path": model_path,
+        "input": input_file,
+        "subtitles": len(subtitles),
+        "source_lang": source_lang,
+        "target_lang": target_lang,
+        "started_at": started_at,
+        "python": sys.version.split()[0],
+        "model_load_seconds": load_seconds,
+        "results": [asdict(result) for result in results],
+    }
+
+
+def write_report(report: Dict[str, Any], path_prefix: str) -> List[str]:
+    """将报告写入 <path_prefix>.json 与 <path_prefix>.csv（每组参数一行），返回写入的文件路径"""
+    os.makedirs(os.path.dirname(os.path.abspath(path_prefix)), exist_ok=True)
+    json_path, csv_path = f"{path_prefix}.json", f"{path_prefix}.csv"
+    with open(json_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=1)
+    with open(csv_path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(BenchResult.__dataclass_fields__))
+        writer.writeheader()
+        writer.writerows(report["results"])
+    return [json_path, csv_path]
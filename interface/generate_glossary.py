@@ -5,6 +5,8 @@ from service.translator import translate_srt_text
 from defs import FileType, get_supported_subtitle_types, get_supported_video_types
 from service import localization
 from service import glossary
+from service.subtitle import formats
+from service.subtitle.srt_format import format_srt
 import utils
     
 def generate_glossary(args):
@@ -40,9 +42,12 @@ def generate_glossary(args):
                                                     stop_event=stop_event, 
                                                     update_progress=update_progress)
     
-    if input_file.endswith('.srt'):
-        # 如果是SRT文件，直接使用现有的生成逻辑
+    if utils.get_file_type(input_file) == FileType.SUBTITLE:
+        # 如果是字幕文件，直接使用现有的生成逻辑；其它字幕格式先转换为SRT文本
         subtitles_text = utils.safe_read_file(input_file)
+        subtitle_format = formats.format_of(input_file)
+        if subtitle_format != ".srt":
+            subtitles_text = format_srt(formats.parse_document(subtitles_text, subtitle_format).subtitles)
 
         return glossary.generate_from_subtitle_text(subtitles_text, 
                                                     target_lang, 
@@ -1,16 +1,48 @@
 from service.extractor import extract_subtitles_to_file
-from service.extractor import extract_subtitles
+from service.extractor import extract_subtitle_stream
 from service.translator import translate_srt_file,translate_plain_text_file,translate_srt_text
 from defs import FileType, get_supported_subtitle_types, get_supported_video_types
 from service import localization
 from service import glossary
+from service import log
 import utils
+from utils import timing, usage
+import os
+import time
 
 def process_file(args):
     """
     处理文件的主函数
     args: 包含所有参数的字典
+
+    记录各阶段的耗时与 token 数，结束时输出汇总表（含按调用类型的 token 用量与 tokens/s），
+    并在 logs 目录写入 JSON 轨迹
     """
+    log_callback = args.get('log_callback', print)
+    usage.reset_stats()
+    timing.start_timeline()
+    try:
+        with timing.span("job", mode=args.get('processing_mode', 'translate')):
+            return _process_file(args)
+    finally:
+        _report_timing(timing.finish_timeline(), log_callback)
+
+def _report_timing(timeline, log_callback):
+    """输出阶段汇总表并保存 JSON 轨迹"""
+    if timeline is None or not timeline.spans:
+        return
+    log_callback(f"{localization.get('log_timing_summary')}\n{timeline.format_summary()}")
+    stats = usage.get_stats()
+    if stats.calls:
+        log_callback(f"{localization.get('log_usage_summary')}\n{stats.format_table()}")
+    trace_path = os.path.join(os.getcwd(), "logs", f"trace-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    try:
+        timeline.write_json(trace_path, usage=stats.to_dict())
+        log_callback(localization.get("log_timing_trace_saved").format(path=trace_path))
+    except OSError as e:
+        log_callback(localization.get("log_timing_trace_failed").format(error=e))
+
+def _process_file(args):
     # 您的原始处理逻辑
     input_file = args['input']
     output_file = args['output']
@@ -23,7 +55,14 @@ def process_file(args):
     gpu_layers = args.get('gpu_layers', 0)
     stop_event = args.get('stop_event')
     log_callback = args.get('log_callback', print)
+    progress_callback = args.get('progress_callback')
     reflection_enabled = args.get('reflection_enabled', False)
+    reflection_mode = args.get('reflection_mode', utils.settings.get_reflection_mode())
+    reflection_threshold = args.get('reflection_threshold', utils.settings.get_reflection_threshold())
+    reflection_logprobs = args.get('reflection_logprobs', utils.settings.get_reflection_logprobs())
+    log.set_prompt_logging(
+        args.get('prompt_log_enabled', utils.settings.get_prompt_log_enabled()),
+        args.get('prompt_log_sample_rate', utils.settings.get_prompt_log_sample_rate()))
     
     try:
         # 检查停止事件
@@ -70,13 +109,17 @@ def process_file(args):
                     n_gpu_layers=gpu_layers,
                     reflection_enabled=reflection_enabled,
                     log_fn=log_callback,
-                    stop_event=stop_event
+                    stop_event=stop_event,
+                    reflection_mode=reflection_mode,
+                    reflection_threshold=reflection_threshold,
+                    reflection_logprobs=reflection_logprobs,
+                    progress_fn=progress_callback
                 )
                 # translate_subtitles(input_file, output_file, model_path)
             else:
                 log_extracting_and_translating_subtitles = localization.get("log_extracting_and_translating_subtitles")
                 log_callback(log_extracting_and_translating_subtitles)
-                subtitles_text=extract_subtitles(input_file)
+                subtitles_text, subtitle_format = extract_subtitle_stream(input_file)
                 translate_srt_text(
                     input_text=subtitles_text,
                     output_path=output_file,
@@ -86,7 +129,12 @@ def process_file(args):
                     n_gpu_layers=gpu_layers,
                     reflection_enabled=reflection_enabled,
                     log_fn=log_callback,
-                    stop_event=stop_event
+                    stop_event=stop_event,
+                    subtitle_format=subtitle_format,
+                    reflection_mode=reflection_mode,
+                    reflection_threshold=reflection_threshold,
+                    reflection_logprobs=reflection_logprobs,
+                    progress_fn=progress_callback
                 )
         
         return True
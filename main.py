@@ -1,12 +1,96 @@
 import argparse
+import json
+import logging
 import sys
+import time
 from pathlib import Path
-from interface import process_file
+from interface import process_file, run_benchmark, write_report
+from interface.benchmark import REFLECTION_MODES, BenchResult, parse_grid_values
+from service import localization
+from service import log
 from service.log import get_logger
+from service.translator.progress import ProgressEvent, format_progress
 import utils
 
+
+class ConsoleProgress:
+    """命令行进度：在同一行刷新进度，输出日志前先换行"""
+
+    def __init__(self):
+        self._active = False
+
+    def log(self, message: str) -> None:
+        self.finish()
+        print(message)
+
+    def finish(self) -> None:
+        if self._active:
+            print()
+            self._active = False
+
+    def progress(self, event: ProgressEvent) -> None:
+        print("\r" + format_progress(event), end="", flush=True)
+        self._active = True
+
+
+def bench(argv):
+    """main.py bench：在参数网格上用真实模型翻译同一字幕文件，输出 CSV/JSON 报告"""
+    parser = argparse.ArgumentParser(prog='main.py bench', description='LightVT - 翻译参数基准测试')
+    parser.add_argument('--input', '-i', required=True, help='样例字幕文件')
+    parser.add_argument('--model-path', '-m', required=True, help='GGUF 模型路径')
+    parser.add_argument('--source-lang', default='自动检测', help='源语言')
+    parser.add_argument('--target-lang', default='中文（简体）', help='目标语言')
+    parser.add_argument('--chunk-sizes', default='10', help='每块字幕条数，逗号分隔')
+    parser.add_argument('--context-sizes', default='2', help='前后上下文条数，逗号分隔')
+    parser.add_argument('--gpu-layers', default='-1', help='GPU层数，逗号分隔')
+    parser.add_argument('--reflection', default='off,single',
+                        help=f'反思设置，逗号分隔，可选 {",".join(REFLECTION_MODES)}')
+    parser.add_argument('--reflection-threshold', type=float, help='gated 的置信度阈值（默认取设置，未设置时为 0.8）')
+    parser.add_argument('--limit', type=int, default=0, help='只取前 N 条字幕')
+    parser.add_argument('--output', '-o', help='报告路径前缀（默认 logs/bench-时间），生成 .csv 与 .json')
+    args = parser.parse_args(argv)
+
+    reflection = parse_grid_values(args.reflection, str)
+    unknown = [mode for mode in reflection if mode not in REFLECTION_MODES]
+    if unknown:
+        parser.error(f"未知的反思设置: {', '.join(unknown)}")
+
+    localization.init(lang="zh-CN")
+    # 逐块日志与提示词日志会干扰计时
+    get_logger("LightVT").setLevel(logging.WARNING)
+    log.set_prompt_logging(False)
+
+    def print_result(result: BenchResult):
+        print(f"chunk={result.chunk_size:<4} context={result.context_size:<3} gpu={result.n_gpu_layers:<4} "
+              f"reflection={result.reflection:<7} {result.seconds_per_subtitle:8.3f} s/条  "
+              f"prompt {result.prompt_tokens_per_second:8.1f} tok/s  gen {result.generation_tokens_per_second:7.1f} tok/s  "
+              f"review {result.review_rate:6.1%}  缺译 {result.mismatch_rate:6.1%}"
+              f"{'' if result.success else '  失败: ' + result.error.splitlines()[0] if result.error else '  失败'}")
+
+    report = run_benchmark({
+        'input': args.input,
+        'model_path': args.model_path,
+        'source_lang': args.source_lang,
+        'target_lang': args.target_lang,
+        'chunk_sizes': parse_grid_values(args.chunk_sizes),
+        'context_sizes': parse_grid_values(args.context_sizes),
+        'gpu_layers': parse_grid_values(args.gpu_layers),
+        'reflection': reflection,
+        'limit': args.limit,
+        **({'reflection_threshold': args.reflection_threshold} if args.reflection_threshold is not None else {}),
+        'on_result': print_result
+    })
+    output = args.output or str(Path("logs") / f"bench-{time.strftime('%Y%m%d-%H%M%S')}")
+    for path in write_report(report, output):
+        print(f"报告已保存: {path}")
+
+
 def main():
     """命令行入口"""
+    if len(sys.argv) > 1 and sys.argv[1] == 'bench':
+        bench(sys.argv[2:])
+        return
+
     parser = argparse.ArgumentParser(description='LightVT - 视频字幕翻译工具')
     parser.add_argument('--gui', action='store_true', help='启动GUI界面')
     parser.add_argument('--input', '-i', help='输入文件路径')
@@ -17,6 +101,7 @@ def main():
     parser.add_argument('--extract-only', action='store_true', help='仅提取字幕')
     parser.add_argument('--translate-only', action='store_true', help='仅翻译字幕')
     parser.add_argument('--gpu-layers', type=int, default=0, help='GPU层数')
+    parser.add_argument('--stats', action='store_true', help='结束后以 JSON 输出按调用类型的 token 用量与 tokens/s')
     
     args = parser.parse_args()
     
@@ -31,7 +116,17 @@ def main():
             parser.print_help()
             return
         
-        result = process_file(vars(args))
+        localization.init(lang="zh-CN")
+        console = ConsoleProgress()
+        result = process_file({
+            **vars(args),
+            'log_callback': console.log,
+            'progress_callback': console.progress
+        })
+        console.finish()
+        if args.stats:
+            stats = utils.usage.get_stats()
+            print(json.dumps({**stats.to_dict(), "total": stats.total().to_dict()}, ensure_ascii=False, indent=2))
         if result:
             print("处理完成!")
         else:
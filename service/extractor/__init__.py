@@ -1,82 +1,126 @@
 import ffmpeg
 import os
 import uuid
+from pathlib import Path
+from service.log import get_logger
+from utils import timing
 
-def extract_subtitles(input_file):
+logger = get_logger("LightVT")
+
+# 可直接复制（不转码）的字幕流编码及对应的文件扩展名
+NATIVE_SUBTITLE_FORMATS = {
+    "subrip": ".srt",
+    "ass": ".ass",
+    "ssa": ".ass",
+    "webvtt": ".vtt",
+    "microdvd": ".sub",
+}
+
+# 按输出扩展名选择的字幕编码器
+_SUBTITLE_ENCODERS = {
+    ".srt": "srt",
+    ".ass": "ass",
+    ".ssa": "ass",
+    ".vtt": "webvtt",
+    ".sub": "microdvd",
+}
+
+
+def _find_subtitle_stream(input_file):
+    with timing.span("ffmpeg.probe"):
+        probe = ffmpeg.probe(input_file)
+    return next(
+        (stream for stream in probe['streams'] if stream['codec_type'] == 'subtitle'),
+        None
+    )
+
+
+def _extract_stream(input_file, subtitle_stream, output_path, output_ext):
+    """将字幕流写入 output_path，输出格式由 output_ext 决定"""
+    stream = ffmpeg.input(input_file)
+    stream = ffmpeg.output(stream, output_path,
+                           map=f"0:{subtitle_stream['index']}",
+                           c=_output_codec(subtitle_stream, output_ext))
+    with timing.span("ffmpeg.extract"):
+        ffmpeg.run(stream, overwrite_output=True)
+
+
+def _ffmpeg_error_message(error):
+    return error.stderr.decode(errors="replace") if error.stderr else str(error)
+
+
+def _output_codec(subtitle_stream, output_ext):
+    """输出格式与字幕流编码一致时直接复制，否则按输出格式转码（默认转为 SRT）"""
+    if NATIVE_SUBTITLE_FORMATS.get(subtitle_stream.get('codec_name')) == output_ext:
+        return 'copy'
+    return _SUBTITLE_ENCODERS.get(output_ext, 'srt')
+
+
+def _extract_to_cache(input_file, output_ext=None):
     """
-    从视频文件中提取字幕流并返回字幕内容作为字符串。
-    在 cache 目录中生成临时文件，使用完后自动删除。
-    
+    提取第一条字幕流到 cache 目录中的临时文件并读取内容，使用完后自动删除临时文件。
+
     :param input_file: 输入视频文件路径
-    :return: 字幕内容字符串，如果没有字幕流则返回空字符串
+    :param output_ext: 输出格式扩展名，为 None 时与字幕流的原格式一致（无法复制的格式转为 SRT）
+    :return: (字幕内容字符串, 字幕格式扩展名)，没有字幕流或提取失败时内容为空字符串
     """
-    # 创建 cache 目录
     cache_dir = os.path.join(os.getcwd(), "cache")
-    os.makedirs(cache_dir, exist_ok=True)  # 确保目录存在
-
-    # 生成唯一的临时文件名
-    temp_file_path = os.path.join(cache_dir, f"{uuid.uuid4()}.srt")
+    os.makedirs(cache_dir, exist_ok=True)
 
+    temp_file_path = None
     try:
-        # 获取视频信息
-        probe = ffmpeg.probe(input_file)
-        
-        # 查找字幕流
-        subtitle_stream = next(
-            (stream for stream in probe['streams'] if stream['codec_type'] == 'subtitle'),
-            None
-        )
-        
-        if subtitle_stream:
-            # 提取字幕到临时文件
-            stream = ffmpeg.input(input_file)
-            stream = ffmpeg.output(stream, temp_file_path, 
-                                map=f"0:{subtitle_stream['index']}", 
-                                c='srt')
-            ffmpeg.run(stream, overwrite_output=True)
-            
-            # 读取临时文件内容
-            with open(temp_file_path, 'r', encoding='utf-8') as f:
-                subtitles = f.read()
-            
-            # 删除临时文件
-            os.remove(temp_file_path)
-            
-            return subtitles
-        else:
-            print("视频不包含字幕流")
-            return ""
-    
+        subtitle_stream = _find_subtitle_stream(input_file)
+        if not subtitle_stream:
+            logger.warning("视频不包含字幕流")
+            return "", output_ext or ".srt"
+
+        subtitle_format = output_ext or NATIVE_SUBTITLE_FORMATS.get(subtitle_stream.get('codec_name'), ".srt")
+        # 生成唯一的临时文件名
+        temp_file_path = os.path.join(cache_dir, f"{uuid.uuid4()}{subtitle_format}")
+        _extract_stream(input_file, subtitle_stream, temp_file_path, subtitle_format)
+
+        with open(temp_file_path, 'r', encoding='utf-8') as f:
+            return f.read(), subtitle_format
+
     except ffmpeg.Error as e:
-        print(f"错误: {e.stderr.decode()}")
-        # 删除临时文件（如果存在）
-        if os.path.exists(temp_file_path):
+        logger.error(f"提取字幕失败: {_ffmpeg_error_message(e)}")
+        return "", output_ext or ".srt"
+    finally:
+        if temp_file_path and os.path.exists(temp_file_path):
             os.remove(temp_file_path)
-        return ""
+
+
+def extract_subtitle_stream(input_file):
+    """
+    从视频文件中提取字幕流，ASS/SSA、WebVTT 等文本字幕直接复制，不转码为 SRT。
+
+    :param input_file: 输入视频文件路径
+    :return: (字幕内容字符串, 字幕格式扩展名)，如果没有字幕流则返回 ("", ".srt")
+    """
+    return _extract_to_cache(input_file)
+
+
+def extract_subtitles(input_file):
+    """
+    从视频文件中提取字幕流并返回 SRT 格式的字幕内容字符串。
+
+    :param input_file: 输入视频文件路径
+    :return: 字幕内容字符串，如果没有字幕流则返回空字符串
+    """
+    return _extract_to_cache(input_file, ".srt")[0]
+
 
 def extract_subtitles_to_file(input_file, output_file):
     try:
-        # 获取视频信息
-        probe = ffmpeg.probe(input_file)
-        
-        # 查找字幕流
-        subtitle_stream = next(
-            (stream for stream in probe['streams'] if stream['codec_type'] == 'subtitle'),
-            None
-        )
-        
-        if subtitle_stream:
-            # 提取字幕
-            stream = ffmpeg.input(input_file)
-            stream = ffmpeg.output(stream, output_file, 
-                                  map=f"0:{subtitle_stream['index']}", 
-                                  c='srt')
-            ffmpeg.run(stream, overwrite_output=True)
-            return True
-        else:
-            print("视频不包含字幕流")
+        subtitle_stream = _find_subtitle_stream(input_file)
+        if not subtitle_stream:
+            logger.warning("视频不包含字幕流")
             return False
-            
+
+        # 输出格式与字幕流一致时直接复制
+        _extract_stream(input_file, subtitle_stream, output_file, Path(output_file).suffix.lower())
+        return True
+
     except ffmpeg.Error as e:
-        print(f"错误: {e.stderr.decode()}")
-        return False
\ No newline at end of file
+        logger.error(f"提取字幕失败: {_ffmpeg_error_message(e)}")
+        return False
@@ -12,15 +12,31 @@ from toolz import keyfilter, pipe
 import utils
 import threading
 from service.glossary.ai_generator import generate_glossary_from_subtitle, ExtractionConfig
+from service.glossary import cache as glossary_cache
 
 logger = get_logger("Glossary")
 glossary: Dict[str, str] = {}
 
+# to_glossary_filename 生成的文件名：<base64 文件名>-<16 位内容指纹>
+_FINGERPRINTED_NAME = re.compile(r'^(.+)-[0-9a-f]{16}$')
+
+def _migrate_legacy_glossary(glossary_path: Path):
+    """旧版本的术语表只以文件名为键（没有内容指纹），首次加载时改名为带指纹的文件名"""
+    match = _FINGERPRINTED_NAME.match(glossary_path.name)
+    if not match:
+        return
+    legacy_path = glossary_path.with_name(match.group(1))
+    if legacy_path.is_file():
+        legacy_path.replace(glossary_path)
+        logger.info(f"已迁移旧版术语表: {legacy_path.name} -> {glossary_path.name}")
+
 def load_glossary(filename: str):
     """加载术语表"""
     global glossary
     try:
         glossary_path = Path(f"cache/{filename}")
+        if not glossary_path.exists():
+            _migrate_legacy_glossary(glossary_path)
         if glossary_path.exists():
             with open(glossary_path, 'r', encoding='utf-8') as f:
                 glossary = json.load(f)
@@ -134,7 +150,8 @@ def generate_from_subtitle_text(subtitle_text: str, target_language: str, model_
             min_term_frequency=2,     # 最少出现2次
             max_terms_per_chunk=15,   # 每片段最多15个术语
             min_term_length=3,        # 最小长度3个字符
-            max_term_length=50        # 最大长度50个字符
+            max_term_length=50,       # 最大长度50个字符
+            max_workers=utils.settings.get_glossary_workers()  # 并行提取的模型上下文数量
         )
         
         # 直接调用，内部处理翻译
@@ -156,7 +173,11 @@ def generate_from_subtitle_text(subtitle_text: str, target_language: str, model_
         return {}
     
 def to_glossary_filename(file_path:str) -> str:
-    """将文件路径转换为术语表文件名"""
-    return pipe(file_path,
+    """将文件路径转换为术语表文件名
+
+    文件名后附加文件内容指纹（见 cache.file_fingerprint），同名但内容不同的文件不会共用术语表
+    """
+    name = pipe(file_path,
                 utils.get_filename, 
-                utils.string_to_base64)
\ No newline at end of file
+                utils.string_to_base64)
+    return f"{name}-{glossary_cache.file_fingerprint(file_path)[:16]}"
\ No newline at end of file
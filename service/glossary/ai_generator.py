@@ -1,16 +1,24 @@
 # lightVT/service/glossary/ai_generator.py - 内部实现翻译函数
 
 import json
+import os
 import re
 import math
+import queue
 import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Dict, List, Set, Tuple, Optional, Callable
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from service import log,localization
 from llama_cpp import Llama, LlamaGrammar
-from utils import strip_thinking, extract_quoted_strings, extract_markdown_list_terms, JSON_STRING_ARRAY, JSON_STRING_OBJECT
+from service.glossary import cache as glossary_cache
+from service.glossary.candidates import COMMON_WORDS, CandidateIndex, find_chunk_candidates, is_caseless_text
+from utils import get_gpu_info, model_profile, timing, usage, stream_json_completion, strip_thinking, estimate_tokens, extract_quoted_strings, extract_markdown_list_terms, JSON_STRING_ARRAY, JSON_STRING_OBJECT
 
 logger = log.get_logger("AIGlossaryGenerator")
+# 完整的提示词与模型输出写入提示词通道（惰性生成，可抽样或关闭）
+prompt_trace = log.get_prompt_channel("LightVT")
+trace = log.TraceChannel(logger)
 _progress_var = 0.0
 
 # System prompt 强制约束模型只输出 JSON，禁止思考过程、分析、markdown 代码块等
@@ -25,17 +33,58 @@ JSON_ONLY_SYSTEM_PROMPT = (
 class ExtractionConfig:
     """术语提取配置"""
     chunk_size: int = 200
-    chunk_overlap: int = 50
+    chunk_overlap: int = 0        # 片段按整行切分且上下文取自全文，默认无需重叠
     min_term_frequency: int = 2
     max_terms_per_chunk: int = 15
     min_term_length: int = 2
     max_term_length: int = 50
+    max_workers: int = 1          # 并行提取术语的模型上下文数量（每个都加载一份完整模型，显存按模型大小成倍增长）
+    prefilter_enabled: bool = True  # 跳过没有候选专有名词的片段
+    term_batch_token_budget: int = 1500  # 每批术语翻译的输入 token 预算（术语 + 上下文）
+
+def _config_fingerprint(config: ExtractionConfig) -> str:
+    """影响提取结果的配置标识（并行度不影响结果）"""
+    return repr(replace(config, max_workers=1))
+
+def _create_llm(model_path: str, n_gpu_layers: int) -> Llama:
+    """创建术语表生成使用的模型实例"""
+    with timing.span("model_load"):
+        llm = Llama(
+            model_path=model_path,
+            n_gpu_layers=n_gpu_layers,
+            n_ctx=8192,
+            verbose=False
+        )
+    model_profile.suppress_reasoning(llm)
+    return llm
+
+def _affordable_workers(model_path: str, n_gpu_layers: int, requested: int) -> int:
+    """按剩余显存限制并行 worker 数（在第一个模型加载后调用）
+
+    每个额外 worker 都会再加载一份完整模型，模型放到 GPU 时显存按模型文件大小成倍增长。
+    无法获取显存信息时只保留一个 worker；纯 CPU 推理不受限制。
+    """
+    if requested <= 1 or n_gpu_layers == 0:
+        return requested
+    gpu = get_gpu_info()
+    if gpu is None:
+        logger.warning(f"无法获取显存信息，术语提取并行数由 {requested} 降为 1")
+        return 1
+    # 模型文件大小近似一份权重的显存占用，额外预留 20% 给上下文缓存
+    model_mb = os.path.getsize(model_path) / (1024 ** 2) * 1.2
+    affordable = 1 + int(gpu["memory_free"] // model_mb) if model_mb > 0 else requested
+    if affordable < requested:
+        logger.warning(f"剩余显存 {gpu['memory_free']} MB 不足，术语提取并行数由 {requested} 降为 {affordable}")
+        return affordable
+    return requested
 
 def _create_chat_completion(
     prompt: str,
     llm: Llama,
     system_prompt: Optional[str] = None,
-    grammar: Optional[LlamaGrammar] = None
+    grammar: Optional[LlamaGrammar] = None,
+    max_tokens: int = 4096,
+    call_type: Optional[str] = None
 ) -> str:
     """🔥 内部翻译函数（支持可选 system prompt 和 Grammar）"""
     try:
@@ -46,11 +95,15 @@ def _create_chat_completion(
         kwargs = {
             "messages": messages,
             "temperature": 0.1,
-            "max_tokens": 4096,
+            "max_tokens": max_tokens,
+            "call_type": call_type,
         }
         if grammar:
+            # Grammar 约束的 JSON 输出以流式生成，顶层数组/对象闭合即停止
             kwargs["grammar"] = grammar
-        response = llm.create_chat_completion(**kwargs)
+            response = stream_json_completion(llm, **kwargs)
+        else:
+            response = model_profile.create_chat_completion(llm, **kwargs)
         return response["choices"][0]["message"]["content"].strip()
     except Exception as e:
         logger.error(f"文本生成失败: {e}")
@@ -94,32 +147,58 @@ def generate_glossary_from_subtitle(
 
         # 步骤1: 预处理和切片
         cleaned_text = clean_subtitle_text(subtitle_text)
+
+        # 按清理后文本内容、目标语言、模型和配置命中缓存，与文件名无关
+        cache_key = glossary_cache.content_key(cleaned_text, target_language,
+                                               glossary_cache.model_fingerprint(model_path),
+                                               _config_fingerprint(config))
+        cached_glossary = glossary_cache.load_glossary(cache_key)
+        if cached_glossary is not None:
+            logger.info(f"命中术语表缓存 {cache_key[:16]}，共 {len(cached_glossary)} 个术语")
+            set_progress(localization.get('completed'), 1.0)
+            return cached_glossary
+
         chunks = split_text_into_chunks(cleaned_text, config)
         if not chunks:
             logger.warning("未提取到有效文本片段")
             return {}
-        logger.info(f"文本已切分为 {len(chunks)} 个片段")
+        logger.info(f"文本已切分为 {len(chunks)} 个片段，重叠重复发送比例 {calculate_resent_ratio(chunks, cleaned_text):.1%}")
         add_progress(localization.get("log_glossary_text_split").format(count=len(chunks)), 0.1)
 
+        # 统计预筛选：跳过没有候选专有名词的片段，减少 LLM 调用
+        chunks, chunk_candidates = prefilter_chunks(chunks, cleaned_text, config)
+        if not chunks:
+            logger.warning("预筛选后没有包含候选术语的片段")
+            return {}
+
         if stop_event.is_set():
             logger.info("生成术语表已被取消")
             return {}
         
-        llm = Llama(
-            model_path=model_path,
-            n_gpu_layers=n_gpu_layers,
-            n_ctx=8192,
-            verbose=False
-        )
-        # 步骤2: 从每个切片提取术语（包含上下文）
-        term_contexts = extract_terms_with_context(chunks, llm, config, stop_event, add_progress)
+        # 每个并行 worker 独占一份完整模型，片段数少于 worker 数或显存不足时不额外加载
+        worker_count = max(1, min(config.max_workers, len(chunks)))
+        llm = _create_llm(model_path, n_gpu_layers)
+        worker_count = _affordable_workers(model_path, n_gpu_layers, worker_count)
+        llm_pool = [llm] + [_create_llm(model_path, n_gpu_layers) for _ in range(worker_count - 1)]
+        logger.info(f"术语提取使用 {worker_count} 个并行模型上下文")
+
+        # 步骤2: 从每个切片提取术语（包含上下文），未改动的片段复用缓存结果
+        chunk_cache = glossary_cache.ChunkResultCache(model_path, _config_fingerprint(config))
+        try:
+            term_contexts = extract_terms_with_context(chunks, llm_pool, config, stop_event, add_progress,
+                                                       chunk_candidates, cleaned_text, chunk_cache)
+        finally:
+            chunk_cache.save()
+        logger.info(f"片段提取结果缓存命中 {chunk_cache.hits}/{len(chunks)}")
+        # 释放额外的模型上下文，后续术语翻译只使用第一个
+        del llm_pool[1:]
         logger.info(f"提取到 {len(term_contexts)} 个带上下文的术语")
-        logger.info(f"术语及上下文: {term_contexts}")
+        prompt_trace.info(lambda: f"术语及上下文: {term_contexts}")
         
         # 步骤3: 统计术语频率
         term_frequencies = calculate_term_frequencies(term_contexts, cleaned_text)
         add_progress(localization.get("log_glossary_term_frequency_completed"), 0.05)
-        logger.info(f"术语频率表：{term_frequencies}")
+        prompt_trace.info(lambda: f"术语频率表：{term_frequencies}")
 
         # 步骤4: 过滤高频率术语
         high_freq_terms = filter_high_frequency_terms(term_frequencies, config)
@@ -130,9 +209,16 @@ def generate_glossary_from_subtitle(
             return {}
         
         # 步骤5: 带上下文的术语翻译
-        glossary = translate_terms_with_context(high_freq_terms, term_contexts, target_language, llm, stop_event, add_progress)
+        term_cache = glossary_cache.TermTranslationCache(target_language, model_path)
+        try:
+            glossary = translate_terms_with_context(high_freq_terms, term_contexts, target_language, llm, stop_event,
+                                                    add_progress, config, term_cache)
+        finally:
+            term_cache.save()
 
         logger.info(f"术语表生成完成，共 {len(glossary)} 个术语对")
+        if glossary and not stop_event.is_set():
+            glossary_cache.save_glossary(cache_key, glossary)
         
         set_progress(localization.get('completed'), 1.0)
         
@@ -164,85 +250,178 @@ def clean_subtitle_text(text: str) -> str:
     return text.strip()
 
 def split_text_into_chunks(text: str, config: ExtractionConfig) -> List[str]:
-    """将文本切分为带重叠的片段 - 简化安全版"""
+    """按字幕行边界将文本切分为片段
+
+    每个片段由完整的字幕行组成，不会在句子中间截断；chunk_overlap > 0 时，
+    片段开头重复上一片段末尾不超过 chunk_overlap 个字符的整行。
+    """
     if len(text) <= config.chunk_size:
         return [text]
     
     chunks = []
-    start = 0
-    
-    while start < len(text):
-        # 计算片段结束位置
-        end = min(start + config.chunk_size, len(text))
-        
-        # 在句子边界切分（限制回退范围）
-        if end < len(text):
-            # 只在后25%范围内寻找句子边界
-            search_start = max(start + config.chunk_size * 3 // 4, start)
-            for i in range(end, search_start, -1):
-                if text[i] in '.!?。！？\n':
-                    end = i + 1
-                    break
-        
-        # 提取片段
-        chunk = text[start:end].strip()
-        if chunk:
-            chunks.append(chunk)
-        
-        # 如果到达末尾，退出
-        if end >= len(text):
-            break
+    current: List[str] = []
+    current_length = 0
+    
+    for line in text.split("\n"):
+        if not line.strip():
+            continue
         
-        # 计算下一个起始位置，确保前进
-        start = max(start + 1, end - config.chunk_overlap)
+        # 加入该行会超出片段大小时，先输出当前片段
+        if current and current_length + len(line) + 1 > config.chunk_size:
+            chunks.append("\n".join(current))
+            current = _overlap_tail(current, config.chunk_overlap)
+            current_length = sum(len(l) + 1 for l in current)
+        
+        current.append(line)
+        current_length += len(line) + 1
+    
+    if current:
+        chunks.append("\n".join(current))
     
     return chunks
 
+def _overlap_tail(lines: List[str], overlap: int) -> List[str]:
+    """取片段末尾总长度不超过 overlap 的整行，作为下一片段的重叠部分"""
+    tail: List[str] = []
+    length = 0
+    # 至少保留一行不重叠，保证片段之间向前推进
+    for line in reversed(lines[1:]):
+        length += len(line) + 1
+        if length > overlap:
+            break
+        tail.insert(0, line)
+    return tail
+
+def calculate_resent_ratio(chunks: List[str], text: str) -> float:
+    """计算重叠导致重复发送给 LLM 的文本比例"""
+    sent = sum(len(chunk) for chunk in chunks)
+    if sent == 0:
+        return 0.0
+    unique = sum(len(line) + 1 for line in text.split("\n") if line.strip()) - 1
+    return max(0.0, (sent - unique) / sent)
+
+def prefilter_chunks(
+    chunks: List[str],
+    cleaned_text: str,
+    config: ExtractionConfig
+) -> Tuple[List[str], Optional[List[List[str]]]]:
+    """基于大写连续词、全文词频和常见词表的统计预筛选
+
+    返回保留的片段及每个片段按评分排序的候选词；无大小写区分的文本（如中日韩文字）无法使用该特征，原样返回。
+    """
+    if not config.prefilter_enabled or is_caseless_text(cleaned_text):
+        return chunks, None
+
+    index = CandidateIndex.build(cleaned_text)
+    kept_chunks: List[str] = []
+    kept_candidates: List[List[str]] = []
+    for chunk in chunks:
+        candidates = find_chunk_candidates(chunk, index, config.min_term_length, config.max_term_length)
+        if candidates:
+            kept_chunks.append(chunk)
+            kept_candidates.append(candidates)
+
+    skipped = len(chunks) - len(kept_chunks)
+    logger.info(f"预筛选跳过 {skipped}/{len(chunks)} 个无候选术语的片段（减少 {skipped} 次 LLM 调用）")
+    return kept_chunks, kept_candidates
+
 def extract_terms_with_context(
     chunks: List[str], 
-    llm: Llama,
+    llm_pool: List[Llama],
     config: ExtractionConfig,
     stop_event: threading.Event,
-    add_progress: Callable
+    add_progress: Callable,
+    chunk_candidates: Optional[List[List[str]]] = None,
+    full_text: Optional[str] = None,
+    chunk_cache: Optional[glossary_cache.ChunkResultCache] = None
 ) -> Dict[str, List[str]]:
-    """🔥 从文本片段提取术语及其上下文（移除外部翻译函数参数）"""
+    """🔥 从文本片段提取术语及其上下文
+
+    片段请求分发到 llm_pool 中的多个模型上下文并行执行（每个上下文同一时刻只服务一个请求），
+    结果按片段顺序合并，保证输出与串行处理一致。
+    提供 full_text 时，术语上下文从全文中截取，不受片段边界影响，片段之间因此无需重叠。
+    """
     global _progress_var
     if chunks is None or len(chunks) == 0:
         logger.warning("没有可处理的文本片段")
         return {}
     
-    term_contexts: Dict[str, List[str]] = {}  # 术语 -> 上下文列表
-    
     progress_step = 0.5 / len(chunks)
-    
-    for i, chunk in enumerate(chunks):
+
+    # 空闲模型上下文队列，worker 取用后归还
+    idle_llms: "queue.Queue[Llama]" = queue.Queue()
+    for llm in llm_pool:
+        idle_llms.put(llm)
+
+    def process_chunk(index: int, chunk: str) -> Optional[List[str]]:
         if stop_event.is_set():
-            logger.info("术语提取已被取消")
-            return {}
-        
-        logger.info(f"正在处理第 {i+1}/{len(chunks)} 个片段...")
-        
+            return None
+        candidates = chunk_candidates[index] if chunk_candidates else None
+        if chunk_cache is not None:
+            cached_terms = chunk_cache.get(chunk, candidates)
+            if cached_terms is not None:
+                return cached_terms
+        llm = idle_llms.get()
         try:
-            # 提取术语时保留上下文信息
-            chunk_terms = extract_terms_from_chunk(chunk, config, i+1, llm)
-            
-            # 为每个术语记录上下文
-            for term in chunk_terms:
-                if term not in term_contexts:
-                    term_contexts[term] = []
-                
-                # 提取术语的上下文（前后各50个字符）
-                context = extract_term_context(chunk, term, context_window=80)
-                if context and context not in term_contexts[term]:
-                    term_contexts[term].append(context)
-            
-            logger.debug(f"提取到的术语: {chunk_terms}")
+            logger.info(f"正在处理第 {index+1}/{len(chunks)} 个片段...")
+            with timing.span("glossary.extract", chunk=index+1):
+                terms = extract_terms_from_chunk(chunk, config, index+1, llm, candidates)
+        finally:
+            idle_llms.put(llm)
+        # 空结果可能是提取失败，不缓存
+        if chunk_cache is not None and terms:
+            chunk_cache.put(chunk, candidates, terms)
+        return terms
 
-            add_progress(localization.get("log_glossary_chunk_complete").format(chunk_index=i+1, chunk_count=len(chunks), term_count=len(chunk_terms)), progress_step)
+    chunk_results: List[Optional[List[str]]] = [None] * len(chunks)
+    completed = 0
 
-        except Exception as e:
-            logger.error(f"处理片段 {i+1} 失败: {e}")
-            continue
+    with ThreadPoolExecutor(max_workers=len(llm_pool), thread_name_prefix="GlossaryExtract") as executor:
+        futures = {executor.submit(process_chunk, i, chunk): i for i, chunk in enumerate(chunks)}
+        for future in as_completed(futures):
+            i = futures[future]
+            try:
+                chunk_terms = future.result()
+            except Exception as e:
+                logger.error(f"处理片段 {i+1} 失败: {e}")
+                chunk_terms = []
+
+            if stop_event.is_set():
+                for pending in futures:
+                    pending.cancel()
+                break
+
+            chunk_results[i] = chunk_terms
+            completed += 1
+            trace.debug(lambda: f"片段 {i+1} 提取到的术语: {chunk_terms}")
+
+            # 进度回调只在调用线程中执行，避免 GUI 回调跨线程竞争
+            add_progress(localization.get("log_glossary_chunk_complete").format(chunk_index=completed, chunk_count=len(chunks), term_count=len(chunk_terms)), progress_step)
+
+    if stop_event.is_set():
+        logger.info("术语提取已被取消")
+        return {}
+
+    # 按片段顺序合并，结果与并行度无关
+    term_contexts: Dict[str, List[str]] = {}  # 术语 -> 上下文列表
+    search_from = 0
+    for chunk, chunk_terms in zip(chunks, chunk_results):
+        # 定位片段在全文中的位置（片段按顺序排列）
+        source, start, end = chunk, 0, len(chunk)
+        if full_text is not None:
+            offset = full_text.find(chunk, search_from)
+            if offset != -1:
+                source, start, end = full_text, offset, offset + len(chunk)
+                search_from = offset
+        
+        for term in chunk_terms or []:
+            if term not in term_contexts:
+                term_contexts[term] = []
+            
+            # 提取术语的上下文（前后各80个字符）
+            context = extract_term_context(source, term, context_window=80, search_start=start, search_end=end)
+            if context and context not in term_contexts[term]:
+                term_contexts[term].append(context)
     
     return term_contexts
 
@@ -250,9 +429,19 @@ def extract_terms_from_chunk(
     chunk: str, 
     config: ExtractionConfig, 
     chunk_index: int,
-    llm: Llama
+    llm: Llama,
+    candidates: Optional[List[str]] = None
 ) -> List[str]:
     """🔥 从单个文本片段提取术语（使用内部翻译函数）"""
+
+    # 预筛选得到的候选词，按可能性排序，帮助模型聚焦
+    candidates_prompt = ""
+    if candidates:
+        candidates_text = ", ".join(candidates)
+        candidates_prompt = f"""
+【候选词】（统计预筛选结果，按可能性从高到低排序，仅供参考）
+{candidates_text}
+"""
     
     # 改进的提取提示，包含更多上下文指导
     prompt = f"""
@@ -282,6 +471,7 @@ def extract_terms_from_chunk(
 - 禁止输出任何 JSON 之外的文本
 - 示例：["term1", "term2", "term3"]
 
+{candidates_prompt}
 【文本内容】
 {chunk}
 
@@ -289,7 +479,8 @@ def extract_terms_from_chunk(
 """
     try:
         # 🔥 使用内部翻译函数，传入 Grammar 强制 JSON 数组输出
-        response = _create_chat_completion(prompt, llm, system_prompt=JSON_ONLY_SYSTEM_PROMPT, grammar=LlamaGrammar.from_string(JSON_STRING_ARRAY))
+        response = _create_chat_completion(prompt, llm, system_prompt=JSON_ONLY_SYSTEM_PROMPT, grammar=LlamaGrammar.from_string(JSON_STRING_ARRAY),
+                                           call_type=usage.GLOSSARY_EXTRACT)
         terms = parse_term_extraction_response(response)
         return terms
         
@@ -354,12 +545,12 @@ def _fallback_line_parse(response: str) -> List[str]:
 
 def parse_term_extraction_response(response: str) -> List[str]:
     """解析术语提取响应（多层容错兜底）"""
-    logger.debug(f"原始响应内容（前1000字符）: {response[:1000]}")
+    prompt_trace.debug(lambda: f"原始响应内容（前1000字符）: {response[:1000]}")
     
     try:
         # 第 1 层：剥除思考过程后提取 JSON
         cleaned = strip_thinking(response)
-        logger.debug(f"剥离思考过程后（前1000字符）: {cleaned[:1000]}")
+        prompt_trace.debug(lambda: f"剥离思考过程后（前1000字符）: {cleaned[:1000]}")
         
         json_text = _extract_json_array(cleaned)
         if json_text:
@@ -406,12 +597,13 @@ def parse_term_extraction_response(response: str) -> List[str]:
         logger.error(f"原始响应内容（前2000字符）: {response[:2000]}")
         return []
 
-def extract_term_context(text: str, term: str, context_window: int = 50) -> str:
-    """提取术语的上下文"""
+def extract_term_context(text: str, term: str, context_window: int = 50,
+                         search_start: int = 0, search_end: Optional[int] = None) -> str:
+    """提取术语的上下文（只在 [search_start, search_end) 范围内查找术语，上下文可超出该范围）"""
     try:
         # 查找术语位置（忽略大小写）
         pattern = re.compile(re.escape(term), re.IGNORECASE)
-        match = pattern.search(text)
+        match = pattern.search(text, search_start, len(text) if search_end is None else search_end)
         
         if not match:
             return ""
@@ -467,28 +659,7 @@ def is_quality_term(term: str) -> bool:
     """判断是否为高质量术语"""
     term = term.lower().strip()
     
-    # 常见词汇黑名单
-    common_words = {
-        'the', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with',
-        'by', 'from', 'up', 'about', 'into', 'through', 'during', 'before',
-        'after', 'above', 'below', 'between', 'among', 'around', 'over',
-        'is', 'are', 'was', 'were', 'be', 'been', 'being', 'have', 'has', 'had',
-        'do', 'does', 'did', 'will', 'would', 'could', 'should', 'may', 'might',
-        'can', 'must', 'shall', 'this', 'that', 'these', 'those', 'i', 'you',
-        'he', 'she', 'it', 'we', 'they', 'me', 'him', 'her', 'us', 'them',
-        'my', 'your', 'his', 'her', 'its', 'our', 'their', 'very', 'so', 'too',
-        'just', 'now', 'then', 'here', 'there', 'when', 'where', 'how', 'what',
-        'who', 'which', 'why', 'if', 'because', 'since', 'until', 'while',
-        'also', 'only', 'even', 'still', 'again', 'more', 'most', 'much',
-        'many', 'some', 'any', 'all', 'both', 'each', 'every', 'other',
-        'another', 'such', 'no', 'not', 'yes', 'get', 'make', 'take', 'come',
-        'go', 'see', 'know', 'think', 'say', 'tell', 'feel', 'look', 'want',
-        'use', 'find', 'give', 'work', 'call', 'try', 'ask', 'need', 'seem',
-        'help', 'show', 'play', 'run', 'move', 'live', 'believe', 'hold',
-        'bring', 'happen', 'write', 'provide', 'sit', 'stand', 'lose', 'pay'
-    }
-    
-    if term in common_words:
+    if term in COMMON_WORDS:
         return False
     
     # 长度检查
@@ -533,32 +704,90 @@ def is_quality_term(term: str) -> bool:
     # 默认：中等长度的词汇有可能是术语
     return 4 <= len(term) <= 20
 
+def select_best_context(contexts: List[str], max_length: int = 150) -> str:
+    """选择最有代表性的上下文"""
+    if not contexts:
+        return ""
+    # 选择最长的上下文（通常包含更多信息）
+    best_context = max(contexts, key=len)
+    # 截断过长的上下文
+    if len(best_context) > max_length:
+        best_context = best_context[:max_length] + "..."
+    return best_context
+
+def build_term_batches(
+    terms: List[str],
+    term_contexts: Dict[str, List[str]],
+    token_budget: int
+) -> List[List[str]]:
+    """按 token 预算（术语 + 最佳上下文）划分术语批次
+
+    短术语可以在一两次调用中完成，长上下文术语不会让单次请求溢出。
+    """
+    batches: List[List[str]] = []
+    current: List[str] = []
+    current_tokens = 0
+    for term in terms:
+        # 每条术语在提示词中的额外格式开销约 10 token
+        cost = estimate_tokens(term) + estimate_tokens(select_best_context(term_contexts.get(term, []))) + 10
+        if current and current_tokens + cost > token_budget:
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append(term)
+        current_tokens += cost
+    if current:
+        batches.append(current)
+    return batches
+
+def _estimate_output_tokens(batch_terms: List[str]) -> int:
+    """估算一批术语翻译 JSON 输出所需的 token 数（术语原文 + 译文 + JSON 格式）"""
+    return min(4096, 64 + sum(2 * estimate_tokens(term) + 16 for term in batch_terms))
+
 def translate_terms_with_context(
     terms: List[str], 
     term_contexts: Dict[str, List[str]], 
     target_language: str,
     llm: Llama,
     stop_event: threading.Event,
-    add_progress: Callable
+    add_progress: Callable,
+    config: Optional[ExtractionConfig] = None,
+    term_cache: Optional[glossary_cache.TermTranslationCache] = None
 ) -> Dict[str, str]:
-    """🔥 带上下文的术语翻译（使用内部翻译函数）"""
+    """🔥 带上下文的术语翻译（使用内部翻译函数）
+
+    之前任务中已翻译过的术语直接从 term_cache 复用，其余术语按 token 预算分批翻译。
+    """
     global _progress_var
+    if not config:
+        config = ExtractionConfig()
     glossary = {}
-    batch_size = 10  
-    progress_step = 0.3 / math.ceil(len(terms) / batch_size)
-    batch_count = len(terms) // batch_size + 1
+
+    # 复用缓存的术语译文
+    pending_terms = []
+    for term in terms:
+        cached = term_cache.get(term) if term_cache is not None else None
+        if cached:
+            glossary[term] = cached
+        else:
+            pending_terms.append(term)
+    if glossary:
+        logger.info(f"复用 {len(glossary)} 个已缓存的术语译文")
+
+    batches = build_term_batches(pending_terms, term_contexts, config.term_batch_token_budget)
+    batch_count = len(batches)
+    if batch_count == 0:
+        add_progress("", 0.3)
+        return glossary
+    progress_step = 0.3 / batch_count
     
-    for i in range(0, len(terms), batch_size):
+    for batch_index, batch_terms in enumerate(batches, 1):
         if stop_event.is_set():
             logger.info("术语翻译已被取消")
             return {}
         
-        batch_terms = terms[i:i + batch_size]
-        batch_index = i // batch_size + 1
-        
         try:
            
-            logger.info(f"正在翻译第 {batch_index} 批术语（{len(batch_terms)} 个）target_language={target_language}...")
+            logger.info(f"正在翻译第 {batch_index}/{batch_count} 批术语（{len(batch_terms)} 个）target_language={target_language}...")
 
             # 构建带上下文的翻译提示
             prompt = build_context_aware_translation_prompt(
@@ -566,15 +795,22 @@ def translate_terms_with_context(
             )
             
             # 🔥 使用内部翻译函数，传入 Grammar 强制 JSON 对象输出
-            response = _create_chat_completion(prompt, llm, system_prompt=JSON_ONLY_SYSTEM_PROMPT, grammar=LlamaGrammar.from_string(JSON_STRING_OBJECT))
+            with timing.span("glossary.translate", batch=batch_index, terms=len(batch_terms)):
+                response = _create_chat_completion(prompt, llm, system_prompt=JSON_ONLY_SYSTEM_PROMPT,
+                                                   grammar=LlamaGrammar.from_string(JSON_STRING_OBJECT),
+                                                   max_tokens=_estimate_output_tokens(batch_terms),
+                                                   call_type=usage.GLOSSARY_TRANSLATE)
             batch_glossary = parse_translation_response(response, batch_terms)
             
             # 去重：以第一次翻译为准
+            new_translations = {}
             for source, target in batch_glossary.items():
                 if source not in glossary and target.strip():
-                    glossary[source] = target.strip()
+                    glossary[source] = new_translations[source] = target.strip()
+            if term_cache is not None:
+                term_cache.update(new_translations)
 
-            add_progress(localization.get("log_glossary_batch_complete").format(batch_index=batch_index,batch_count=batch_count, chunk_count=batch_count), progress_step)
+            add_progress(localization.get("log_glossary_batch_complete").format(batch_index=batch_index,batch_count=batch_count), progress_step)
 
         except Exception as e:
             logger.error(f"第 {batch_index} 批术语翻译失败: {e}")
@@ -592,16 +828,8 @@ def build_context_aware_translation_prompt(
     terms_with_context = []
     
     for i, term in enumerate(terms):
-        contexts = term_contexts.get(term, [])
-        
         # 选择最有代表性的上下文
-        best_context = ""
-        if contexts:
-            # 选择最长的上下文（通常包含更多信息）
-            best_context = max(contexts, key=len)
-            # 截断过长的上下文
-            if len(best_context) > 150:
-                best_context = best_context[:150] + "..."
+        best_context = select_best_context(term_contexts.get(term, []))
         
         term_info = f"{i+1}. **{term}**"
         if best_context:
@@ -642,11 +870,11 @@ def build_context_aware_translation_prompt(
 
 def parse_translation_response(response: str, original_terms: List[str]) -> Dict[str, str]:
     """解析翻译响应（集成思考过程剥离）"""
-    logger.debug(f"翻译原始响应（前1000字符）: {response[:1000]}")
+    prompt_trace.debug(lambda: f"翻译原始响应（前1000字符）: {response[:1000]}")
     
     # 先剥离可能的思考过程
     cleaned = strip_thinking(response)
-    logger.debug(f"翻译剥离后（前1000字符）: {cleaned[:1000]}")
+    prompt_trace.debug(lambda: f"翻译剥离后（前1000字符）: {cleaned[:1000]}")
     
     try:
         # 提取JSON部分
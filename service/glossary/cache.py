@@ -0,0 +1,164 @@
+# lightVT/service/glossary/cache.py - 按内容哈希缓存生成的术语表
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from service import log
+
+logger = log.get_logger("Glossary")
+
+CACHE_DIR = Path("cache/glossary")
+
+# 每个模型的片段提取结果最多保留的条数，超出时淘汰最久未使用的
+CHUNK_CACHE_MAX_ENTRIES = 2000
+
+# 文件指纹读取开头与结尾的字节数
+_FINGERPRINT_BLOCK = 1 << 20
+
+
+def content_key(*parts: str) -> str:
+    """由若干文本片段计算内容哈希"""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def model_fingerprint(model_path: str) -> str:
+    """模型标识：文件名 + 文件大小，避免对数 GB 的模型文件计算哈希"""
+    try:
+        size = os.path.getsize(model_path)
+    except OSError:
+        size = -1
+    return f"{os.path.basename(model_path)}:{size}"
+
+
+def file_fingerprint(path: str) -> str:
+    """文件内容指纹：文件大小 + 开头与结尾各 1 MiB 的哈希，避免对数 GB 的视频文件整体计算哈希
+
+    文件不可读时退化为路径的哈希
+    """
+    try:
+        size = os.path.getsize(path)
+        with open(path, "rb") as f:
+            head = f.read(_FINGERPRINT_BLOCK)
+            if size > 2 * _FINGERPRINT_BLOCK:
+                f.seek(-_FINGERPRINT_BLOCK, os.SEEK_END)
+            tail = f.read()
+    except OSError:
+        return content_key(os.path.abspath(path))
+    digest = hashlib.sha256(str(size).encode("ascii"))
+    digest.update(head)
+    digest.update(tail)
+    return digest.hexdigest()
+
+
+def _read_json(path: Path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"读取术语表缓存失败 {path}: {e}")
+        return None
+
+
+def _write_json(path: Path, data) -> None:
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        logger.warning(f"写入术语表缓存失败 {path}: {e}")
+
+
+def load_glossary(key: str) -> Optional[Dict[str, str]]:
+    """按内容哈希加载已生成的术语表"""
+    data = _read_json(CACHE_DIR / f"{key}.json")
+    return data if isinstance(data, dict) else None
+
+
+def save_glossary(key: str, glossary: Dict[str, str]) -> None:
+    """按内容哈希保存生成的术语表"""
+    _write_json(CACHE_DIR / f"{key}.json", glossary)
+
+
+class ChunkResultCache:
+    """单个片段的术语提取结果缓存（线程安全）
+
+    文本只有部分改动时，未改动片段直接复用之前的提取结果。
+    同一模型的片段结果保存在一个文件中，按最近使用顺序最多保留 CHUNK_CACHE_MAX_ENTRIES 条，
+    文件大小与每次读写的开销有上限。
+    """
+
+    def __init__(self, model_path: str, config_fingerprint: str):
+        self._namespace = content_key(model_fingerprint(model_path), config_fingerprint)
+        self._path = CACHE_DIR / f"chunks-{self._namespace[:16]}.json"
+        self._lock = threading.Lock()
+        self._dirty = False
+        data = _read_json(self._path)
+        self._results: Dict[str, List[str]] = data if isinstance(data, dict) else {}
+        # 旧版本写入的文件没有上限，只保留最近的部分
+        for key in list(self._results)[:-CHUNK_CACHE_MAX_ENTRIES]:
+            del self._results[key]
+        self.hits = 0
+
+    def _key(self, chunk: str, candidates: Optional[List[str]]) -> str:
+        return content_key(chunk, ",".join(candidates or []))
+
+    def get(self, chunk: str, candidates: Optional[List[str]] = None) -> Optional[List[str]]:
+        with self._lock:
+            key = self._key(chunk, candidates)
+            terms = self._results.pop(key, None)
+            if terms is not None:
+                # 移到末尾（最近使用）；只有命中时不重写文件，顺序随下次写入保存
+                self._results[key] = terms
+                self.hits += 1
+            return terms
+
+    def put(self, chunk: str, candidates: Optional[List[str]], terms: List[str]) -> None:
+        with self._lock:
+            key = self._key(chunk, candidates)
+            self._results.pop(key, None)
+            self._results[key] = terms
+            while len(self._results) > CHUNK_CACHE_MAX_ENTRIES:
+                del self._results[next(iter(self._results))]
+            self._dirty = True
+
+    def save(self) -> None:
+        with self._lock:
+            if self._dirty:
+                _write_json(self._path, self._results)
+                self._dirty = False
+
+
+class TermTranslationCache:
+    """术语译文缓存，按目标语言和模型区分，跨任务复用已翻译的术语"""
+
+    def __init__(self, target_language: str, model_path: str):
+        namespace = content_key(target_language, model_fingerprint(model_path))
+        self._path = CACHE_DIR / f"terms-{namespace[:16]}.json"
+        self._dirty = False
+        data = _read_json(self._path)
+        self._translations: Dict[str, str] = data if isinstance(data, dict) else {}
+
+    def get(self, term: str) -> Optional[str]:
+        return self._translations.get(term)
+
+    def update(self, translations: Dict[str, str]) -> None:
+        if translations:
+            self._translations.update(translations)
+            self._dirty = True
+
+    def save(self) -> None:
+        if self._dirty:
+            _write_json(self._path, self._translations)
+            self._dirty = False
@@ -0,0 +1,120 @@
+# lightVT/service/glossary/candidates.py - 术语候选词的统计预筛选
+
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+# 常见词汇黑名单（大小写不敏感）
+COMMON_WORDS = frozenset({
+    'the', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with',
+    'by', 'from', 'up', 'about', 'into', 'through', 'during', 'before',
+    'after', 'above', 'below', 'between', 'among', 'around', 'over',
+    'is', 'are', 'was', 'were', 'be', 'been', 'being', 'have', 'has', 'had',
+    'do', 'does', 'did', 'will', 'would', 'could', 'should', 'may', 'might',
+    'can', 'must', 'shall', 'this', 'that', 'these', 'those', 'i', 'you',
+    'he', 'she', 'it', 'we', 'they', 'me', 'him', 'her', 'us', 'them',
+    'my', 'your', 'his', 'its', 'our', 'their', 'very', 'so', 'too',
+    'just', 'now', 'then', 'here', 'there', 'when', 'where', 'how', 'what',
+    'who', 'which', 'why', 'if', 'because', 'since', 'until', 'while',
+    'also', 'only', 'even', 'still', 'again', 'more', 'most', 'much',
+    'many', 'some', 'any', 'all', 'both', 'each', 'every', 'other',
+    'another', 'such', 'no', 'not', 'yes', 'get', 'make', 'take', 'come',
+    'go', 'see', 'know', 'think', 'say', 'tell', 'feel', 'look', 'want',
+    'use', 'find', 'give', 'work', 'call', 'try', 'ask', 'need', 'seem',
+    'help', 'show', 'play', 'run', 'move', 'live', 'believe', 'hold',
+    'bring', 'happen', 'write', 'provide', 'sit', 'stand', 'lose', 'pay',
+    'oh', 'ok', 'okay', 'hey', 'hi', 'hello', 'well', 'yeah', 'yep', 'nope',
+    'please', 'sorry', 'thanks', 'thank', 'let', 'let\'s', 'don\'t', 'i\'m',
+    'it\'s', 'that\'s', 'you\'re', 'we\'re', 'they\'re', 'i\'ll', 'mr', 'mrs',
+    'ms', 'dr', 'sir', 'madam', 'god', 'man', 'wait', 'stop', 'good', 'right',
+    'one', 'two',
+})
+
+# 连续的首字母大写单词（如 "New York", "Captain Jack Sparrow"）
+_CAPITALIZED_RUN = re.compile(r"\b[A-Z][\w'\-]*(?:[ \t]+[A-Z][\w'\-]*)*")
+_WORD = re.compile(r"[A-Za-z][\w'\-]*")
+# 句首位置：文本开头、换行或句末标点之后
+_SENTENCE_START = re.compile(r"(?:^|[\n.!?。！？♪\-]\s*)$")
+
+
+def is_caseless_text(text: str, sample_size: int = 5000) -> bool:
+    """判断文本是否以无大小写区分的文字为主（如中日韩文字），此时大写特征不可用"""
+    cased = 0
+    letters = 0
+    for ch in text[:sample_size]:
+        if ch.isalpha():
+            letters += 1
+            if ch.lower() != ch.upper():
+                cased += 1
+    return letters == 0 or cased / letters < 0.5
+
+
+@dataclass
+class CandidateIndex:
+    """全文候选词统计
+
+    - capitalized: 候选词以首字母大写形式出现的次数
+    - mid_sentence: 候选词出现在句中（非句首）的次数，句中大写是专有名词的强信号
+    - lowercase: 候选词中的单词以小写形式出现的次数，常出现小写说明是普通词汇
+    """
+    capitalized: Counter = field(default_factory=Counter)
+    mid_sentence: Counter = field(default_factory=Counter)
+    lowercase: Counter = field(default_factory=Counter)
+
+    @classmethod
+    def build(cls, text: str) -> "CandidateIndex":
+        index = cls()
+        for match in _CAPITALIZED_RUN.finditer(text):
+            run = _strip_common_words(match.group())
+            if not run:
+                continue
+            key = run.lower()
+            index.capitalized[key] += 1
+            if not _SENTENCE_START.search(text[max(0, match.start() - 3):match.start()]):
+                index.mid_sentence[key] += 1
+        for word in _WORD.findall(text):
+            if word[0].islower():
+                index.lowercase[word] += 1
+        return index
+
+    def score(self, candidate: str) -> float:
+        """候选词为专有名词的可能性评分，0 表示不是候选词"""
+        capitalized = self.capitalized.get(candidate, 0)
+        if capitalized == 0:
+            return 0.0
+        # 多词候选（如 "New York"）只要有一个词很少小写出现即可
+        lowercase = min((self.lowercase.get(word, 0) for word in candidate.split()), default=0)
+        proper_ratio = capitalized / (capitalized + lowercase)
+        if proper_ratio < 0.6:
+            return 0.0
+        mid_sentence = self.mid_sentence.get(candidate, 0)
+        # 仅在句首出现过一次的单词证据不足
+        if mid_sentence == 0 and capitalized < 2:
+            return 0.0
+        return proper_ratio * (capitalized + 2 * mid_sentence)
+
+
+def _strip_common_words(run: str) -> str:
+    """去除大写连续词首尾的常见词（如句首的 "The"、"Then"）"""
+    words = run.split()
+    while words and words[0].lower() in COMMON_WORDS:
+        words.pop(0)
+    while words and words[-1].lower() in COMMON_WORDS:
+        words.pop()
+    return " ".join(words)
+
+
+def find_chunk_candidates(chunk: str, index: CandidateIndex, min_length: int = 2,
+                          max_length: int = 50, limit: int = 30) -> List[str]:
+    """找出片段中的候选术语，按评分从高到低排序"""
+    scores: Dict[str, float] = {}
+    for match in _CAPITALIZED_RUN.finditer(chunk):
+        candidate = _strip_common_words(match.group()).lower()
+        if not (min_length <= len(candidate) <= max_length) or candidate in scores:
+            continue
+        score = index.score(candidate)
+        if score > 0:
+            scores[candidate] = score
+    ranked = sorted(scores, key=lambda c: scores[c], reverse=True)
+    return ranked[:limit]
@@ -1,11 +1,14 @@
+import glob
 import json
-from typing import Dict, Any
+import os
+from typing import Dict, Any, Optional
 from utils import get_resource_path
 
 _lang = "en"
 _config_dir = get_resource_path("assets/localization")
 _translations: Dict[str,Any] = None
 _default_translations: Dict[str, Any] = None
+_lang_to_iso: Dict[str, str] = None
 
 def init(lang: str = "en", config_dir: str = get_resource_path("assets/localization")) -> None:
     """初始化本地化模块"""
@@ -59,9 +62,26 @@ def get(key: str) -> str:
     global _translations, _default_translations
     return _translations.get(key, _default_translations.get(key, key))
 
+def to_iso(language: str) -> Optional[str]:
+    """将语言名称（任意界面语言下的显示名称）或 ISO 代码转换为 ISO 代码，无法识别时返回 None"""
+    global _lang_to_iso
+    if _lang_to_iso is None:
+        mapping = {}
+        for file_path in sorted(glob.glob(os.path.join(_config_dir, "*.json"))):
+            try:
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    lang_to_iso = json.load(f).get("lang_to_iso", {})
+            except (OSError, json.JSONDecodeError):
+                continue
+            mapping.update(lang_to_iso)
+            mapping.update({iso: iso for iso in lang_to_iso.values()})
+        _lang_to_iso = mapping
+    return _lang_to_iso.get(language.strip()) if language else None
+
 __all__ = [
     "init",
     "set_language",
     "get_current_language",
+    "to_iso",
     "localize"
 ]
\ No newline at end of file
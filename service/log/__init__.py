@@ -1,8 +1,10 @@
+import atexit
 import logging
 import logging.handlers
+import queue
 import sys
 from pathlib import Path
-from typing import Dict
+from typing import Callable, Dict, List, Optional
 import os
 import threading
 
@@ -15,32 +17,72 @@ except ImportError:
 lock = threading.Lock()
 loggerDict: Dict[str,logging.Logger] = {}
 
-def setup_logger(name: str = "LightVT", log_file: str = "app.log", level: int = logging.DEBUG):
-    """设置同时输出到控制台和文件的日志器"""
+# 提示词通道：完整的提示词、原文与译文写入单独的文件，可抽样或关闭
+PROMPT_CHANNEL = "prompt"
+PROMPT_LOG_FILE = "prompts.log"
+
+# 后台写日志的监听线程
+_listeners: List[logging.handlers.QueueListener] = []
+
+
+class Sampler:
+    """按比例均匀抽样：rate 为 0.25 时每 4 次保留 1 次"""
+
+    def __init__(self, rate: float = 1.0):
+        self.rate = rate
+        self._credit = 0.0
+        self._lock = threading.Lock()
+
+    def accept(self) -> bool:
+        if self.rate >= 1.0:
+            return True
+        with self._lock:
+            self._credit += self.rate
+            if self._credit >= 1.0:
+                self._credit -= 1.0
+                return True
+            return False
+
+
+class TraceChannel:
+    """惰性、按级别守卫的日志通道
+
+    消息以无参函数给出，只有日志器对该级别启用且通过抽样时才调用它生成文本；
+    通道关闭时每次调用的开销只有一次级别判断，不会拼接提示词或截取响应。
+    """
+
+    def __init__(self, logger: logging.Logger, sampler: Optional[Sampler] = None):
+        self.logger = logger
+        self.sampler = sampler
+
+    def is_enabled(self, level: int = logging.DEBUG) -> bool:
+        return self.logger.isEnabledFor(level)
+
+    def log(self, level: int, build: Callable[[], str]) -> None:
+        if not self.logger.isEnabledFor(level):
+            return
+        if self.sampler is not None and not self.sampler.accept():
+            return
+        self.logger.log(level, build())
+
+    def debug(self, build: Callable[[], str]) -> None:
+        self.log(logging.DEBUG, build)
+
+    def info(self, build: Callable[[], str]) -> None:
+        self.log(logging.INFO, build)
+
+
+_prompt_sampler = Sampler()
+
+
+def _get_log_dir() -> str:
     log_dir = os.path.join(os.getcwd(), "logs")
     os.makedirs(log_dir, exist_ok=True)  # 确保目录存在
-    
-    # 创建日志器
-    logger = logging.getLogger(name)
-    logger.setLevel(level)
-    
-    # 避免重复添加处理器
-    if logger.handlers:
-        return logger
-    
-    # 创建格式器
-    formatter = logging.Formatter(
-        fmt='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
-    
-    # 控制台处理器
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(level)
-    console_handler.setFormatter(formatter)
-    
-    # 按时间轮转的文件处理器
-    log_path = f"{log_dir}/{log_file}"
+    return log_dir
+
+
+def _create_file_handler(log_path: str, formatter: logging.Formatter) -> logging.Handler:
+    """按时间轮转的文件处理器"""
     file_handler = logging.handlers.TimedRotatingFileHandler(
         filename=str(log_path),
         when='midnight',        # 轮转时机
@@ -65,13 +107,63 @@ def setup_logger(name: str = "LightVT", log_file: str = "app.log", level: int =
             pass
 
     file_handler.rotator = safe_rotator
-    
-    # 添加处理器
-    logger.addHandler(console_handler)
-    logger.addHandler(file_handler)
-    
+    return file_handler
+
+
+def _attach_queue(logger: logging.Logger, *handlers: logging.Handler) -> None:
+    """日志器只把记录放入队列，由后台线程交给实际的处理器写入控制台与文件"""
+    log_queue = queue.SimpleQueue()
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    _listeners.append(listener)
+
+
+def setup_logger(name: str = "LightVT", log_file: str = "app.log", level: int = logging.DEBUG):
+    """设置同时输出到控制台和文件的日志器
+
+    写入在后台线程中进行，调用方只需把记录放入队列。
+    """
+    log_dir = _get_log_dir()
+
+    # 创建日志器
+    logger = logging.getLogger(name)
+    logger.setLevel(level)
+
+    # 避免重复添加处理器
+    if logger.handlers:
+        return logger
+
+    # 创建格式器
+    formatter = logging.Formatter(
+        fmt='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    )
+
+    # 控制台处理器
+    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler.setLevel(level)
+    console_handler.setFormatter(formatter)
+
+    _attach_queue(logger, console_handler, _create_file_handler(f"{log_dir}/{log_file}", formatter))
+
     return logger
 
+def setup_prompt_logger(name: str = "LightVT", log_file: str = PROMPT_LOG_FILE) -> logging.Logger:
+    """设置提示词通道的日志器：不向上传递，只写入单独的文件"""
+    prompt_logger = logging.getLogger(f"{name}.{PROMPT_CHANNEL}")
+    if prompt_logger.handlers:
+        return prompt_logger
+
+    formatter = logging.Formatter(
+        fmt='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    )
+    prompt_logger.setLevel(logging.DEBUG)
+    prompt_logger.propagate = False
+    _attach_queue(prompt_logger, _create_file_handler(f"{_get_log_dir()}/{log_file}", formatter))
+    return prompt_logger
+
 def get_logger(name: str = "LightVT") -> logging.Logger:
     """获取已设置的日志器"""
     with lock:
@@ -80,6 +172,36 @@ def get_logger(name: str = "LightVT") -> logging.Logger:
             logger = loggerDict[name] = setup_logger(name)
         return logger
 
+def get_prompt_logger(name: str = "LightVT") -> logging.Logger:
+    """获取提示词通道的日志器（完整提示词与模型输出），一般通过 get_prompt_channel 使用"""
+    key = f"{name}.{PROMPT_CHANNEL}"
+    with lock:
+        logger = loggerDict.get(key)
+        if logger is None:
+            logger = loggerDict[key] = setup_prompt_logger(name)
+        return logger
+
+def get_prompt_channel(name: str = "LightVT") -> TraceChannel:
+    """获取提示词通道：惰性生成消息，受 set_prompt_logging 的开关与抽样控制"""
+    return TraceChannel(get_prompt_logger(name), _prompt_sampler)
+
+def set_prompt_logging(enabled: bool = True, sample_rate: float = 1.0, name: str = "LightVT") -> None:
+    """开启/关闭提示词通道并设置抽样比例（0~1）
+
+    关闭时通道的级别高于 CRITICAL，isEnabledFor 对任何级别都返回 False。
+    """
+    prompt_logger = get_prompt_logger(name)
+    prompt_logger.setLevel(logging.DEBUG if enabled else logging.CRITICAL + 1)
+    _prompt_sampler.rate = max(0.0, min(1.0, sample_rate))
+
+def shutdown() -> None:
+    """停止后台写日志线程，写完队列中剩余的记录"""
+    while _listeners:
+        _listeners.pop().stop()
+
+atexit.register(shutdown)
+
 logging.getLogger("llama_cpp").setLevel(logging.ERROR)
 
-__all__ = ["get_logger"]
+__all__ = ["get_logger", "get_prompt_logger", "get_prompt_channel", "set_prompt_logging", "shutdown",
+           "TraceChannel", "Sampler"]
@@ -0,0 +1,140 @@
+# lightVT/service/subtitle/__init__.py
+"""
+字幕记录类型与各字幕格式的公共接口
+"""
+
+import re
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import List, Pattern, Tuple
+
+_TIME_CODE = re.compile(
+    r'(\d+):(\d{1,2}):(\d{1,2})[,.](\d{1,3})\s*-->\s*(\d+):(\d{1,2}):(\d{1,2})[,.](\d{1,3})'
+)
+
+
+@dataclass
+class Subtitle:
+    """单条字幕
+
+    使用 __slots__ 避免每条字幕一个 __dict__，长字幕文件（如数小时的转录稿）可显著减少内存占用。
+    time_code 保留原始时间轴文本用于原样输出，start_ms/end_ms 为解析后的毫秒数。
+    """
+    __slots__ = ("id", "time_code", "text", "start_ms", "end_ms")
+
+    id: str
+    time_code: str
+    text: str
+    start_ms: int
+    end_ms: int
+
+    def with_text(self, text: str) -> "Subtitle":
+        """返回替换文本后的新字幕，其余字段不变"""
+        return Subtitle(self.id, self.time_code, text, self.start_ms, self.end_ms)
+
+
+def _to_ms(hours: str, minutes: str, seconds: str, millis: str) -> int:
+    # 毫秒位数不足 3 位时按小数处理（如 "1,5" 表示 500 毫秒）
+    return ((int(hours) * 60 + int(minutes)) * 60 + int(seconds)) * 1000 + int(millis.ljust(3, "0"))
+
+
+def parse_time_code(time_code: str) -> Tuple[int, int]:
+    """解析 "00:00:01,000 --> 00:00:02,500" 格式的时间轴，返回 (开始毫秒, 结束毫秒)，无法解析时返回 (-1, -1)"""
+    match = _TIME_CODE.search(time_code)
+    if not match:
+        return -1, -1
+    groups = match.groups()
+    return _to_ms(*groups[:4]), _to_ms(*groups[4:])
+
+
+def format_timestamp(ms: int, separator: str = ",") -> str:
+    """将毫秒数格式化为 "HH:MM:SS,mmm" 时间戳"""
+    seconds, millis = divmod(max(ms, 0), 1000)
+    minutes, seconds = divmod(seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}{separator}{millis:03d}"
+
+
+def split_markup(text: str, tag_pattern: Pattern[str], strip_inline: bool = True) -> Tuple[str, str, str]:
+    """拆分字幕文本首尾的格式标签，返回 (前缀标签, 正文, 后缀标签)
+
+    首尾标签（如 ASS 的 {\\an8}、WebVTT 的 <i>…</i>）原样保留；
+    strip_inline 为 True 时去除正文中间的标签，为 False 时正文中的标签原样保留，由调用方处理。
+    """
+    pos = 0
+    while True:
+        match = tag_pattern.match(text, pos)
+        if match is None or match.end() == pos:
+            break
+        pos = match.end()
+    prefix, rest = text[:pos], text[pos:]
+
+    end = len(rest)
+    for match in reversed(list(tag_pattern.finditer(rest))):
+        if match.end() != end:
+            break
+        end = match.start()
+    body = tag_pattern.sub("", rest[:end]) if strip_inline else rest[:end]
+    return prefix, body, rest[end:]
+
+
+# 正文中间的格式标签在翻译时替换为 {1}、{2}… 占位符
+_PLACEHOLDER = re.compile(r'\{(\d+)\}')
+
+
+def protect_inline_tags(body: str, tag_pattern: Pattern[str]) -> Tuple[str, Tuple[str, ...]]:
+    """将正文中间的格式标签替换为编号占位符，返回 (替换后的正文, 原标签)"""
+    tags: List[str] = []
+
+    def placeholder(match: "re.Match[str]") -> str:
+        tags.append(match.group(0))
+        return f"{{{len(tags)}}}"
+
+    return tag_pattern.sub(placeholder, body), tuple(tags)
+
+
+def restore_inline_tags(text: str, tags: Tuple[str, ...]) -> str:
+    """将译文中的占位符还原为原标签；译文中丢失的占位符对应的标签不再输出，重复或无效的占位符被删除"""
+    if not tags:
+        return text
+    restored = set()
+
+    def restore(match: "re.Match[str]") -> str:
+        index = int(match.group(1)) - 1
+        if index >= len(tags) or index < 0 or index in restored:
+            return ""
+        restored.add(index)
+        return tags[index]
+
+    return _PLACEHOLDER.sub(restore, text)
+
+
+class SubtitleDocument(ABC):
+    """已解析的字幕文件
+
+    subtitles 为需要翻译的字幕（仅含文本内容），render 按原格式输出，
+    除字幕文本外的内容（文件头、样式、格式标签等）保持原样。
+    """
+    format = ".srt"
+
+    def __init__(self, subtitles: List[Subtitle]):
+        self.subtitles = subtitles
+
+    @abstractmethod
+    def render(self, subtitles: List[Subtitle]) -> str:
+        """用翻译后的字幕（与 self.subtitles 一一对应）生成文件内容"""
+
+    def _check_count(self, subtitles: List[Subtitle]) -> None:
+        if len(subtitles) != len(self.subtitles):
+            raise ValueError(f"字幕条数不匹配: 原文 {len(self.subtitles)} 条，译文 {len(subtitles)} 条")
+
+
+__all__ = [
+    "Subtitle",
+    "SubtitleDocument",
+    "parse_time_code",
+    "format_timestamp",
+    "split_markup",
+    "protect_inline_tags",
+    "restore_inline_tags",
+]
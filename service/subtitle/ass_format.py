@@ -0,0 +1,116 @@
+# lightVT/service/subtitle/ass_format.py - ASS/SSA 解析与输出
+
+import re
+from typing import List, NamedTuple, Tuple
+
+from . import (Subtitle, SubtitleDocument, _to_ms, format_timestamp, protect_inline_tags,
+               restore_inline_tags, split_markup)
+
+# 覆盖标签块，如 {\an8\pos(320,50)}
+_OVERRIDE_TAG = re.compile(r'\{[^}]*\}')
+# 绘图模式（\p1 等）的内容是矢量指令，不需要翻译
+_DRAWING_MODE = re.compile(r'\\p[1-9]')
+_ASS_TIME = re.compile(r'(\d+):(\d{1,2}):(\d{1,2})[.,](\d{1,3})')
+
+# [Events] 中没有 Format 行时使用的默认字段（ASS 标准）
+_DEFAULT_EVENT_FORMAT = ["Layer", "Start", "End", "Style", "Name",
+                         "MarginL", "MarginR", "MarginV", "Effect", "Text"]
+
+
+class _DialogueLine(NamedTuple):
+    line_index: int   # 在原文件中的行号
+    head: str         # Text 字段之前的内容（含 "Dialogue: " 与其它字段）
+    prefix: str       # 文本开头的覆盖标签
+    suffix: str       # 文本末尾的覆盖标签
+    inline_tags: Tuple[str, ...]  # 正文中间的覆盖标签，依次对应占位符 {1}、{2}…
+
+
+def _parse_ass_time(value: str) -> int:
+    match = _ASS_TIME.match(value.strip())
+    return _to_ms(*match.groups()) if match else -1
+
+
+def _to_plain_text(text: str) -> str:
+    return text.replace("\\N", "\n").replace("\\n", "\n").replace("\\h", " ")
+
+
+def _to_ass_text(text: str) -> str:
+    return text.replace("\r", "").replace("\n", "\\N")
+
+
+class AssDocument(SubtitleDocument):
+    """ASS/SSA 字幕文件
+
+    只翻译 Dialogue 行的 Text 字段，文件头、样式以及文本首尾的覆盖标签原样保留。
+    正文中间的覆盖标签（如 {\\i1}…{\\i0}）以 {1}、{2}… 占位符参与翻译，输出时还原到占位符所在位置。
+    Comment 行、空文本与绘图模式的 Dialogue 行不参与翻译。
+    """
+    format = ".ass"
+
+    def __init__(self, lines: List[str], dialogues: List[_DialogueLine], subtitles: List[Subtitle],
+                 trailing_newline: bool):
+        super().__init__(subtitles)
+        self._lines = lines
+        self._dialogues = dialogues
+        self._trailing_newline = trailing_newline
+
+    @classmethod
+    def parse(cls, content: str) -> "AssDocument":
+        content = content.lstrip("\ufeff").replace("\r\n", "\n").replace("\r", "\n")
+        trailing_newline = content.endswith("\n")
+        lines = content.split("\n")
+        if trailing_newline:
+            lines.pop()
+
+        dialogues: List[_DialogueLine] = []
+        subtitles: List[Subtitle] = []
+        in_events = False
+        fields = _DEFAULT_EVENT_FORMAT
+
+        for i, line in enumerate(lines):
+            stripped = line.strip()
+            if stripped.startswith("[") and stripped.endswith("]"):
+                in_events = stripped.lower() == "[events]"
+                continue
+            if not in_events:
+                continue
+
+            kind, sep, rest = line.partition(":")
+            kind = kind.strip().lower()
+            if not sep:
+                continue
+            if kind == "format":
+                fields = [name.strip() for name in rest.split(",")]
+                continue
+            if kind != "dialogue":
+                continue
+
+            # Text 是最后一个字段，其中可能包含逗号
+            values = rest.split(",", len(fields) - 1)
+            if len(values) < len(fields):
+                continue
+            text = values[-1]
+            prefix, body, suffix = split_markup(text, _OVERRIDE_TAG, strip_inline=False)
+            if not _OVERRIDE_TAG.sub("", body).strip() or _DRAWING_MODE.search(prefix):
+                continue
+            body, inline_tags = protect_inline_tags(body, _OVERRIDE_TAG)
+
+            head = line[:len(line) - len(text)]
+            by_name = {name.lower(): value for name, value in zip(fields, values)}
+            start_ms = _parse_ass_time(by_name.get("start", ""))
+            end_ms = _parse_ass_time(by_name.get("end", ""))
+            time_code = f"{format_timestamp(start_ms)} --> {format_timestamp(end_ms)}"
+
+            dialogues.append(_DialogueLine(i, head, prefix, suffix, inline_tags))
+            subtitles.append(Subtitle(str(len(subtitles) + 1), time_code, _to_plain_text(body), start_ms, end_ms))
+
+        return cls(lines, dialogues, subtitles, trailing_newline)
+
+    def render(self, subtitles: List[Subtitle]) -> str:
+        self._check_count(subtitles)
+        lines = list(self._lines)
+        for dialogue, subtitle in zip(self._dialogues, subtitles):
+            text = restore_inline_tags(_to_ass_text(subtitle.text), dialogue.inline_tags)
+            lines[dialogue.line_index] = f"{dialogue.head}{dialogue.prefix}{text}{dialogue.suffix}"
+        content = "\n".join(lines)
+        return content + "\n" if self._trailing_newline else content
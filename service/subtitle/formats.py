@@ -0,0 +1,51 @@
+# lightVT/service/subtitle/formats.py - 按扩展名选择字幕格式
+
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from service.log import get_logger
+
+from . import Subtitle, SubtitleDocument
+from .ass_format import AssDocument
+from .srt_format import SrtDocument, format_srt
+from .sub_format import MicroDvdDocument
+from .vtt_format import VttDocument
+
+logger = get_logger("LightVT")
+
+_PARSERS: Dict[str, Callable[[str], SubtitleDocument]] = {
+    ".srt": SrtDocument.parse,
+    ".ass": AssDocument.parse,
+    ".ssa": AssDocument.parse,
+    ".vtt": VttDocument.parse,
+    ".sub": MicroDvdDocument.parse,
+}
+
+SUBTITLE_FORMATS = tuple(_PARSERS)
+
+
+def format_of(path: str) -> str:
+    """根据文件扩展名判断字幕格式，无法识别时按 SRT 处理"""
+    suffix = Path(path).suffix.lower()
+    return suffix if suffix in _PARSERS else ".srt"
+
+
+def parse_document(content: str, subtitle_format: str = ".srt") -> SubtitleDocument:
+    """按指定格式解析字幕文件内容"""
+    parse = _PARSERS.get(subtitle_format.lower(), SrtDocument.parse)
+    return parse(content)
+
+
+def render_document(document: SubtitleDocument, subtitles: List[Subtitle], output_path: str) -> str:
+    """生成输出文件内容
+
+    输出扩展名与原文件格式一致时保留原格式（样式、标签等）；
+    输出为 .srt 时转换为 SRT；其它情况仍按原格式输出。
+    """
+    output_format = format_of(output_path)
+    if _PARSERS[output_format] == _PARSERS.get(document.format):
+        return document.render(subtitles)
+    if output_format == ".srt":
+        return format_srt(subtitles)
+    logger.warning(f"无法将 {document.format} 字幕转换为 {output_format}，按原格式输出")
+    return document.render(subtitles)
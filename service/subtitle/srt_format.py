@@ -0,0 +1,153 @@
+# lightVT/service/subtitle/srt_format.py - SRT 解析与输出
+
+from typing import Iterable, Iterator, List, Optional
+
+from . import Subtitle, SubtitleDocument, _TIME_CODE, _to_ms
+
+# 解析状态
+_IDLE = 0         # 等待新字幕块（序号或时间轴）
+_EXPECT_TIME = 1  # 已读到序号，等待时间轴
+_TEXT = 2         # 读取字幕文本
+
+
+def iter_srt(lines: Iterable[str]) -> Iterator[Subtitle]:
+    """单遍逐行解析 SRT，返回字幕迭代器
+
+    - lines 可以是任意行迭代器（文件对象、ffmpeg 管道输出等），行尾的 \\r\\n / \\r 会被统一去除
+    - 块之间允许多个空行或只含空白字符的行
+    - 容忍缺失序号、缺失空行分隔的块；无法识别的孤立行并入上一条字幕
+    - 持有一条待输出字幕，以便把空行之后的续行并回上一条
+    """
+    state = _IDLE
+    pending: Optional[Subtitle] = None   # 已完成、等待输出的字幕
+    subtitle_id = ""
+    time_code = ""
+    text_lines: List[str] = []
+    maybe_id: Optional[str] = None       # 文本中出现的纯数字行，可能是缺少空行分隔的下一条序号
+    auto_id = 0
+    start_ms = end_ms = -1
+    first = True
+
+    def finish() -> Subtitle:
+        return Subtitle(subtitle_id, time_code, "\n".join(text_lines), start_ms, end_ms)
+
+    def match_time(line: str):
+        # 先用 "-->" 做廉价判断，绝大多数文本行无需进入正则
+        if "-->" not in line:
+            return None
+        match = _TIME_CODE.match(line)
+        if match is None:
+            return None
+        groups = match.groups()
+        return _to_ms(*groups[:4]), _to_ms(*groups[4:])
+
+    def append_to_pending(extra: str) -> None:
+        nonlocal pending
+        if pending is not None:
+            pending = pending.with_text(f"{pending.text}\n{extra}" if pending.text else extra)
+
+    for raw_line in lines:
+        line = raw_line.rstrip("\r\n")
+        if first:
+            line = line.lstrip("\ufeff")
+            first = False
+        stripped = line.strip()
+
+        if state == _TEXT:
+            if not stripped:
+                if maybe_id is not None:
+                    text_lines.append(maybe_id)
+                    maybe_id = None
+                if pending is not None:
+                    yield pending
+                pending = finish()
+                state = _IDLE
+            elif maybe_id is not None and (times := match_time(stripped)) is not None:
+                # 缺少空行分隔：上一行的数字是下一条字幕的序号
+                if pending is not None:
+                    yield pending
+                pending = finish()
+                subtitle_id, time_code, text_lines = maybe_id, stripped, []
+                start_ms, end_ms = times
+                maybe_id = None
+            else:
+                if maybe_id is not None:
+                    text_lines.append(maybe_id)
+                    maybe_id = None
+                if stripped.isdecimal():
+                    maybe_id = stripped
+                else:
+                    text_lines.append(line)
+            continue
+
+        if state == _EXPECT_TIME:
+            times = match_time(stripped)
+            if times is not None:
+                time_code = stripped
+                start_ms, end_ms = times
+                text_lines = []
+                state = _TEXT
+            elif not stripped:
+                # 孤立的数字行，视为上一条字幕的文本
+                append_to_pending(subtitle_id)
+                state = _IDLE
+            else:
+                append_to_pending(subtitle_id)
+                append_to_pending(line)
+                state = _IDLE
+            continue
+
+        # _IDLE
+        if not stripped:
+            continue
+        if stripped.isdecimal():
+            subtitle_id = stripped
+            state = _EXPECT_TIME
+        elif (times := match_time(stripped)) is not None:
+            # 缺失序号的字幕块
+            auto_id = int(pending.id) + 1 if pending is not None and pending.id.isdecimal() else auto_id + 1
+            subtitle_id = str(auto_id)
+            time_code = stripped
+            start_ms, end_ms = times
+            text_lines = []
+            state = _TEXT
+        else:
+            # 空行之后的续行
+            append_to_pending(line)
+
+    if state == _TEXT:
+        if maybe_id is not None:
+            text_lines.append(maybe_id)
+        if pending is not None:
+            yield pending
+        pending = finish()
+    elif state == _EXPECT_TIME:
+        append_to_pending(subtitle_id)
+
+    if pending is not None:
+        yield pending
+
+
+def parse_srt(content: str) -> List[Subtitle]:
+    """解析SRT文件内容为字幕列表"""
+    return list(iter_srt(content.replace("\r\n", "\n").replace("\r", "\n").split("\n")))
+
+
+def format_srt(subtitles: Iterable[Subtitle]) -> str:
+    """将字幕列表格式化为SRT内容"""
+    return "\n\n".join([
+        f"{subtitle.id}\n{subtitle.time_code}\n{subtitle.text}"
+        for subtitle in subtitles
+    ])
+
+
+class SrtDocument(SubtitleDocument):
+    """SRT 字幕文件"""
+    format = ".srt"
+
+    @classmethod
+    def parse(cls, content: str) -> "SrtDocument":
+        return cls(parse_srt(content))
+
+    def render(self, subtitles: List[Subtitle]) -> str:
+        return format_srt(subtitles)
@@ -0,0 +1,81 @@
+# lightVT/service/subtitle/sub_format.py - MicroDVD (.sub) 解析与输出
+
+import re
+from typing import List, NamedTuple
+
+from . import Subtitle, SubtitleDocument, format_timestamp, split_markup
+
+# {开始帧}{结束帧}文本
+_FRAME_LINE = re.compile(r'^\{(\d+)\}\{(\d*)\}(.*)$')
+# 格式控制码，如 {y:i}、{C:$0000FF}
+_CONTROL_CODE = re.compile(r'\{[a-zA-Z]:[^}]*\}')
+# 未声明帧率时使用的默认值
+DEFAULT_FPS = 23.976
+
+
+class _FrameLine(NamedTuple):
+    line_index: int   # 在原文件中的行号
+    head: str         # 帧号部分
+    prefix: str       # 文本开头的控制码
+    suffix: str       # 文本末尾的控制码
+
+
+def _parse_fps(text: str) -> float:
+    try:
+        fps = float(text.strip())
+    except ValueError:
+        return 0.0
+    return fps if 1 <= fps <= 240 else 0.0
+
+
+class MicroDvdDocument(SubtitleDocument):
+    """MicroDVD 字幕文件
+
+    时间以帧号表示，帧率取自文件首行的 {1}{1}23.976 声明，没有声明时按 DEFAULT_FPS 换算。
+    """
+    format = ".sub"
+
+    def __init__(self, lines: List[str], frame_lines: List[_FrameLine], subtitles: List[Subtitle]):
+        super().__init__(subtitles)
+        self._lines = lines
+        self._frame_lines = frame_lines
+
+    @classmethod
+    def parse(cls, content: str) -> "MicroDvdDocument":
+        content = content.lstrip("\ufeff").replace("\r\n", "\n").replace("\r", "\n")
+        lines = content.rstrip("\n").split("\n")
+
+        fps = DEFAULT_FPS
+        frame_lines: List[_FrameLine] = []
+        subtitles: List[Subtitle] = []
+        for i, line in enumerate(lines):
+            match = _FRAME_LINE.match(line.strip())
+            if not match:
+                continue
+            start_frame, end_frame, text = match.groups()
+            if not frame_lines and start_frame in ("0", "1") and end_frame in ("0", "1"):
+                declared_fps = _parse_fps(text)
+                if declared_fps:
+                    fps = declared_fps
+                    continue
+
+            prefix, body, suffix = split_markup(text, _CONTROL_CODE)
+            if not body.strip():
+                continue
+
+            start_ms = round(int(start_frame) * 1000 / fps)
+            end_ms = round(int(end_frame) * 1000 / fps) if end_frame else start_ms
+            time_code = f"{format_timestamp(start_ms)} --> {format_timestamp(end_ms)}"
+
+            frame_lines.append(_FrameLine(i, f"{{{start_frame}}}{{{end_frame}}}", prefix, suffix))
+            subtitles.append(Subtitle(str(len(subtitles) + 1), time_code, body.replace("|", "\n"), start_ms, end_ms))
+
+        return cls(lines, frame_lines, subtitles)
+
+    def render(self, subtitles: List[Subtitle]) -> str:
+        self._check_count(subtitles)
+        lines = list(self._lines)
+        for frame_line, subtitle in zip(self._frame_lines, subtitles):
+            text = subtitle.text.replace("\r", "").replace("\n", "|")
+            lines[frame_line.line_index] = f"{frame_line.head}{frame_line.prefix}{text}{frame_line.suffix}"
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,97 @@
+# lightVT/service/subtitle/vtt_format.py - WebVTT 解析与输出
+
+import html
+import re
+from typing import List, NamedTuple, Tuple
+
+from . import (Subtitle, SubtitleDocument, _to_ms, format_timestamp, protect_inline_tags,
+               restore_inline_tags, split_markup)
+
+# 文本标签，如 <i>、</b>、<v Speaker>、<00:00:01.000>
+_CUE_TAG = re.compile(r'<[^>]*>')
+_VTT_TIME = re.compile(r'(?:(\d+):)?(\d{1,2}):(\d{1,2})\.(\d{1,3})')
+# 不含字幕文本的块
+_NON_CUE_BLOCKS = ("NOTE", "STYLE", "REGION")
+
+
+class _Cue(NamedTuple):
+    block_index: int  # 在原文件中的块序号
+    head: str         # 标识符与时间轴行
+    prefix: str       # 文本开头的标签
+    suffix: str       # 文本末尾的标签
+    inline_tags: Tuple[str, ...]  # 正文中间的标签，依次对应占位符 {1}、{2}…
+
+
+def _parse_vtt_time(value: str) -> int:
+    match = _VTT_TIME.match(value.strip())
+    if not match:
+        return -1
+    hours, minutes, seconds, millis = match.groups()
+    return _to_ms(hours or "0", minutes, seconds, millis)
+
+
+def _escape(text: str) -> str:
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+class VttDocument(SubtitleDocument):
+    """WebVTT 字幕文件
+
+    只翻译字幕块的文本，文件头、NOTE/STYLE/REGION 块、时间轴上的位置设置以及文本首尾的标签原样保留。
+    正文中间的标签（如 <i>…</i>、<c.x>、<v Speaker>）以 {1}、{2}… 占位符参与翻译，输出时还原。
+    """
+    format = ".vtt"
+
+    def __init__(self, blocks: List[str], cues: List[_Cue], subtitles: List[Subtitle]):
+        super().__init__(subtitles)
+        self._blocks = blocks
+        self._cues = cues
+
+    @classmethod
+    def parse(cls, content: str) -> "VttDocument":
+        content = content.lstrip("\ufeff").replace("\r\n", "\n").replace("\r", "\n")
+        # WebVTT 规定字幕块内不能有空行，因此可以直接按空行分块
+        blocks: List[str] = []
+        current: List[str] = []
+        for line in content.split("\n"):
+            if line.strip():
+                current.append(line)
+            elif current:
+                blocks.append("\n".join(current))
+                current = []
+        if current:
+            blocks.append("\n".join(current))
+
+        cues: List[_Cue] = []
+        subtitles: List[Subtitle] = []
+        for i, block in enumerate(blocks):
+            if (i == 0 and block.startswith("WEBVTT")) or block.startswith(_NON_CUE_BLOCKS):
+                continue
+            lines = block.split("\n")
+            timing_index = next((j for j, line in enumerate(lines[:2]) if "-->" in line), None)
+            if timing_index is None:
+                continue
+            payload = "\n".join(lines[timing_index + 1:])
+            prefix, body, suffix = split_markup(payload, _CUE_TAG, strip_inline=False)
+            if not _CUE_TAG.sub("", body).strip():
+                continue
+            body, inline_tags = protect_inline_tags(body, _CUE_TAG)
+
+            timing = lines[timing_index]
+            start, _, end = timing.partition("-->")
+            start_ms = _parse_vtt_time(start)
+            end_ms = _parse_vtt_time(end)
+            time_code = f"{format_timestamp(start_ms)} --> {format_timestamp(end_ms)}"
+
+            cues.append(_Cue(i, "\n".join(lines[:timing_index + 1]), prefix, suffix, inline_tags))
+            subtitles.append(Subtitle(str(len(subtitles) + 1), time_code, html.unescape(body), start_ms, end_ms))
+
+        return cls(blocks, cues, subtitles)
+
+    def render(self, subtitles: List[Subtitle]) -> str:
+        self._check_count(subtitles)
+        blocks = list(self._blocks)
+        for cue, subtitle in zip(self._cues, subtitles):
+            text = restore_inline_tags(_escape(subtitle.text), cue.inline_tags)
+            blocks[cue.block_index] = f"{cue.head}\n{cue.prefix}{text}{cue.suffix}"
+        return "\n\n".join(blocks) + "\n"
@@ -4,50 +4,33 @@ from pathlib import Path
 from typing import Dict, List, Callable, Any, Optional, Tuple, Any
 import traceback
 import utils
+from utils import timing
 from service.log import get_logger
 from . import prompt
 from . import llm_helper
+from . import dedup
+from . import classifier
+from . import langid
+from . import confidence
+from .progress import ProgressEvent, ProgressTracker
 import re
 from service import localization
 from service import glossary
+from service.subtitle import Subtitle
+from service.subtitle.srt_format import format_srt
+from service.subtitle import formats
 
 logger = get_logger("LightVT")
 
-
-def parse_srt(content: str) -> List[Dict[str, str]]:
-    """解析SRT文件内容为字幕列表"""
-    subtitles = []
-    blocks = content.strip().split("\n\n")
-
-    for block in blocks:
-        lines = block.split("\n")
-        if len(lines) >= 3:
-            subtitle_id = lines[0]
-            time_code = lines[1]
-            text = "\n".join(lines[2:])
-
-            subtitles.append({
-                "id": subtitle_id,
-                "time_code": time_code,
-                "text": text
-            })
-
-    return subtitles
-
-
-def format_srt(subtitles: List[Dict[str, str]]) -> str:
-    """将字幕列表格式化为SRT内容"""
-    return "\n\n".join([
-        f"{subtitle['id']}\n{subtitle['time_code']}\n{subtitle['text']}"
-        for subtitle in subtitles
-    ])
+# 逐块翻译之间的默认等待秒数（防止 API 速率限制）
+CHUNK_PAUSE_SECONDS = 0.5
 
 
 def chunk_subtitles_with_context(
-    subtitles: List[Dict[str, str]],
+    subtitles: List[Subtitle],
     max_chunk_size: int = 10,
     context_size: int = 2  # 前后各保留2条作为上下文
-) -> List[List[Dict[str, str]]]:
+) -> List[Dict[str, Any]]:
     """分块时保留上下文信息"""
     chunks = []
 
@@ -88,7 +71,7 @@ def apply_translation_to_chunk(
     chunk: Dict[str, Any],
     translated_text: str,
     log_fn: Callable[[str], None] = print
-) -> List[Dict[str, str]]:
+) -> List[Subtitle]:
     """将翻译结果应用到字幕块"""
     # 分割翻译结果
     translated_lines = llm_helper.subtitle.parse_translation_text(
@@ -106,12 +89,20 @@ def apply_translation_to_chunk(
 
     # 将翻译应用到字幕
     return [
-        {**subtitle, "text": translated_lines[i] if i <
-            len(translated_lines) else subtitle["text"]}
+        subtitle.with_text(translated_lines[i] if i <
+                           len(translated_lines) else subtitle.text)
         for i, subtitle in enumerate(main_chunk)
     ]
 
 
+def _save_output(output_path: str, content: str) -> None:
+    os.makedirs(os.path.dirname(
+        os.path.abspath(output_path)), exist_ok=True)
+
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+
+
 def translate_srt_file(
     input_path: str,
     output_path: str,
@@ -123,7 +114,11 @@ def translate_srt_file(
     context_size: int = 2,
     reflection_enabled: bool = False,
     log_fn: Callable[[str], None] = print,
-    stop_event: Optional[Any] = None
+    stop_event: Optional[Any] = None,
+    reflection_mode: str = "full",
+    reflection_threshold: Optional[float] = None,
+    progress_fn: Optional[Callable[[ProgressEvent], None]] = None,
+    reflection_logprobs: bool = False
 ) -> bool:
     # 检查停止信号
     if stop_event and stop_event.is_set():
@@ -145,7 +140,12 @@ def translate_srt_file(
         context_size=context_size,
         reflection_enabled=reflection_enabled,
         log_fn=log_fn,
-        stop_event=stop_event
+        stop_event=stop_event,
+        subtitle_format=formats.format_of(input_path),
+        reflection_mode=reflection_mode,
+        reflection_threshold=reflection_threshold,
+        progress_fn=progress_fn,
+        reflection_logprobs=reflection_logprobs
     )
 
 
@@ -160,44 +160,109 @@ def translate_srt_text(
     context_size: int = 2,
     reflection_enabled: bool = True,
     log_fn: Callable[[str], None] = print,
-    stop_event: Optional[Any] = None
+    stop_event: Optional[Any] = None,
+    subtitle_format: str = ".srt",
+    reflection_mode: str = "full",
+    reflection_threshold: Optional[float] = None,
+    progress_fn: Optional[Callable[[ProgressEvent], None]] = None,
+    reflection_logprobs: bool = False,
+    llm: Optional[Any] = None,
+    generate_glossary: bool = True,
+    chunk_pause: float = CHUNK_PAUSE_SECONDS
 ) -> bool:
-    """翻译SRT文件的主函数"""
+    """翻译字幕文件的主函数
+
+    subtitle_format 为字幕格式（扩展名，如 ".srt"、".ass"、".vtt"），只翻译字幕文本，
+    输出时保留原格式的样式与标签。
+    reflection_mode 为启用反思时的模式："single" 一次调用完成评估与改进，
+    "full" 先生成改进建议再改进翻译（两次调用）。
+    reflection_threshold 不为 None 时只对置信度（见 confidence.score_chunk）低于该值的块进行反思，
+    为 None 时所有块都进行反思。
+    reflection_logprobs 为 True 且启用置信度筛选时，模型以 logits_all=True 创建，置信度中加入 token 概率。
+    progress_fn 不为 None 时以 ProgressEvent 报告进度（块序号、已完成字幕数、生成速度、剩余时间），
+    取代逐块的进度日志。
+    llm 为已创建的模型实例，为 None 时按 model_path 与 n_gpu_layers 创建；
+    generate_glossary 为 False 时术语表为空也不生成；chunk_pause 为块与块之间的等待秒数。
+    """
     try:
-        # 解析SRT
-        subtitles = parse_srt(input_text)
+        # 解析字幕
+        with timing.span("parse"):
+            document = formats.parse_document(input_text, subtitle_format)
+        subtitles = document.subtitles
         log_fn(localization.get("log_parsed_subtitles").format(
             subtitles_length=len(subtitles)))
+        target_iso = localization.to_iso(target_lang)
+        source_iso = localization.to_iso(source_lang)
+
+        # 相同的字幕只翻译一次
+        dedup_plan = dedup.deduplicate(subtitles)
+        if dedup_plan.skipped:
+            log_fn(localization.get("log_dedup_skipped").format(
+                skipped_count=dedup_plan.skipped, unique_count=len(dedup_plan.unique)))
+
+        # 本地语言识别
+        languages = langid.detect_file((s.text for s in dedup_plan.unique), source_iso)
+        language_summary = langid.summarize(languages)
+        if language_summary:
+            log_fn(localization.get("log_detected_languages").format(languages=", ".join(
+                f"{lang}: {count}" for lang, count in language_summary.most_common())))
+
+        # 自动检测源语言时，整个文件已是目标语言则无需翻译
+        if source_iso == "auto" and langid.is_file_in_language(languages, target_iso):
+            log_fn(localization.get("log_already_target_language"))
+            _save_output(output_path, formats.render_document(document, subtitles, output_path))
+            log_fn(localization.get("log_translation_completed").format(
+                output_path=output_path))
+            return True
 
         # 检测术语表
-        if glossary.is_empty():
-            log_fn(localization.get("log_no_glossary"))
-            glossary.load_generated_glossary(
-                subtitle_text=input_text,
-                target_language=target_lang,
-                model_path=model_path,
-                n_gpu_layers=n_gpu_layers,
-                stop_event=stop_event,
-                update_progress=log_fn
-            )
-        else:
+        if not glossary.is_empty():
             log_fn(localization.get("log_glossary_found"))
+        elif generate_glossary:
+            log_fn(localization.get("log_no_glossary"))
+            with timing.span("glossary"):
+                glossary.load_generated_glossary(
+                    subtitle_text=input_text if document.format == ".srt" else format_srt(subtitles),
+                    target_language=target_lang,
+                    model_path=model_path,
+                    n_gpu_layers=n_gpu_layers,
+                    stop_event=stop_event,
+                    update_progress=log_fn
+                )
 
         # 初始化LLM
-        log_fn(localization.get("log_initializing_translation_model").format(
-            n_gpu_layers=n_gpu_layers))
-        llm = llm_helper.create_llm(model_path, n_gpu_layers)
+        if llm is None:
+            log_fn(localization.get("log_initializing_translation_model").format(
+                n_gpu_layers=n_gpu_layers))
+            llm = llm_helper.create_llm(
+                model_path, n_gpu_layers,
+                logits_all=reflection_logprobs and reflection_enabled and reflection_threshold is not None)
 
         # 生成系统提示
         system_prompt = prompt.subtitle.generate_system_prompt(
             source_lang, target_lang)
 
+        # 音乐、声音标注、数字及已是目标语言的字幕不送入模型
+        classified = classifier.classify_subtitles(
+            dedup_plan.unique, target_iso, languages)
+        if classified.skipped:
+            log_fn(localization.get("log_classifier_skipped").format(
+                skipped_count=classified.skipped,
+                **{kind: classified.counts[kind] for kind in classifier.SKIPPED_KINDS}))
+
         # 分块处理
         chunks = chunk_subtitles_with_context(
-            subtitles, chunk_size, context_size)
+            classified.pending, chunk_size, context_size)
         log_fn(localization.get("log_chunking_subtitles").format(
             chunks_length=len(chunks)))
 
+        # 按置信度决定是否反思时，模型支持的话一并取得 token 对数概率
+        gated_reflection = reflection_enabled and reflection_threshold is not None
+        request_logprobs = gated_reflection and llm_helper.supports_logprobs(llm)
+        terms = glossary.get_terms()
+        refined_chunks = 0
+        tracker = ProgressTracker(len(chunks), len(classified.pending), progress_fn) if progress_fn else None
+
         # 翻译每个块
         translated_subtitles = []
         for i, chunk in enumerate(chunks):
@@ -205,64 +270,105 @@ def translate_srt_text(
                 log_fn(localization.get("log_received_stop_signal"))
                 return False
 
-            log_fn(localization.get("log_translating_chunk").format(
-                chunk_index=i+1, total_chunks=len(chunks)))
+            if tracker:
+                tracker.start_chunk(i + 1)
+            else:
+                log_fn(localization.get("log_translating_chunk").format(
+                    chunk_index=i+1, total_chunks=len(chunks)))
 
             # 翻译
-            translated_text = llm_helper.subtitle.translate_text(
-                llm, chunk, system_prompt, log_fn=log_fn
-            )
+            with timing.span("translate", chunk=i+1, subtitles=len(chunk['main'])):
+                translated_text = llm_helper.subtitle.translate_text(
+                    llm, chunk, system_prompt, log_fn=log_fn, logprobs=request_logprobs,
+                    progress_fn=tracker.stream_progress if tracker else None
+                )
 
-            # 只有在启用反思时才进行改良
-            if reflection_enabled:
+            # 只有在启用反思且置信度不足时才进行改良
+            needs_reflection = reflection_enabled
+            if gated_reflection:
+                chunk_confidence = confidence.score_chunk(
+                    [s.text for s in chunk['main']],
+                    llm_helper.subtitle.parse_translation_text(translated_text),
+                    target_iso, terms, chunk.get('mean_logprob'))
+                needs_reflection = chunk_confidence.score < reflection_threshold
+                log_fn(localization.get("log_chunk_confidence").format(
+                    score=chunk_confidence.score, signals=chunk_confidence.describe()))
+            if needs_reflection:
+                refined_chunks += 1
+
+            if needs_reflection and reflection_mode == "single":
+                log_fn(localization.get("log_reflection_improvement"))
+
+                # 评估与改进在一次调用中完成
+                with timing.span("reflection", chunk=i+1):
+                    translated_text = llm_helper.subtitle.self_correct_translation(
+                        llm,
+                        chunk,
+                        translated_text,
+                        system_prompt,
+                        log_fn=log_fn
+                    )
+            elif needs_reflection:
                 log_fn(localization.get("log_reflection_improvement"))
 
                 # 改良意见
-                recommendation = llm_helper.subtitle.ask_for_recommendation(
-                    llm,
-                    chunk,
-                    translated_text,
-                    target_lang=target_lang,
-                    log_fn=log_fn
-                )
+                with timing.span("recommend", chunk=i+1):
+                    recommendation = llm_helper.subtitle.ask_for_recommendation(
+                        llm,
+                        chunk,
+                        translated_text,
+                        target_lang=target_lang,
+                        log_fn=log_fn
+                    )
+
+                # 改良翻译，没有问题时保留原译文
+                if recommendation:
+                    with timing.span("improve", chunk=i+1):
+                        translated_text = llm_helper.subtitle.improve_translation_with_recommendation(
+                            llm,
+                            chunk,
+                            translated_text,
+                            recommendation,
+                            system_prompt,
+                            log_fn=log_fn
+                        )
+                else:
+                    log_fn(localization.get("log_recommendation_no_issues"))
+            elif reflection_enabled:
+                log_fn(localization.get("log_reflection_skipped_confident"))
+            else:
+                log_fn(localization.get("log_reflection_disabled"))
 
-                # 改良翻译
-                translated_text = llm_helper.subtitle.improve_translation_with_recommendation(
+            # review翻译
+            with timing.span("review", chunk=i+1):
+                translated_text = llm_helper.subtitle.review_translation(
                     llm,
                     chunk,
                     translated_text,
-                    recommendation,
                     system_prompt,
                     log_fn=log_fn
                 )
-            else:
-                log_fn(localization.get("log_reflection_disabled"))
-
-            # review翻译
-            translated_text = llm_helper.subtitle.review_translation(
-                llm,
-                chunk,
-                translated_text,
-                system_prompt,
-                log_fn=log_fn
-            )
 
             # 应用翻译结果
             translated_chunk = apply_translation_to_chunk(
                 chunk, translated_text, log_fn)
             translated_subtitles.extend(translated_chunk)
+            if tracker:
+                tracker.finish_chunk(len(chunk['main']))
 
             # 可选休息以防止API速率限制
-            if i < len(chunks) - 1:
-                time.sleep(0.5)
+            if chunk_pause and i < len(chunks) - 1:
+                time.sleep(chunk_pause)
 
-        # 格式化并保存结果
-        output_content = format_srt(translated_subtitles)
-        os.makedirs(os.path.dirname(
-            os.path.abspath(output_path)), exist_ok=True)
+        if gated_reflection:
+            log_fn(localization.get("log_reflection_refined_chunks").format(
+                refined_count=refined_chunks, total_chunks=len(chunks)))
 
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(output_content)
+        # 展开重复字幕的译文，格式化并保存结果
+        with timing.span("render"):
+            translated_subtitles = dedup_plan.expand(classified.merge(translated_subtitles))
+            output_content = formats.render_document(document, translated_subtitles, output_path)
+            _save_output(output_path, output_content)
 
         log_fn(localization.get("log_translation_completed").format(
             output_path=output_path))
@@ -283,9 +389,15 @@ def translate_plain_text_file(
     n_gpu_layers: int = 0,
     reflection_enabled: bool = False,
     log_fn: Callable[[str], None] = print,
-    stop_event: Optional[Any] = None
+    stop_event: Optional[Any] = None,
+    llm: Optional[Any] = None,
+    generate_glossary: bool = True
 ) -> bool:
-    """翻译纯文本文件的主函数"""
+    """翻译纯文本文件的主函数
+
+    llm 为已创建的模型实例，为 None 时按 model_path 与 n_gpu_layers 创建；
+    generate_glossary 为 False 时术语表为空也不生成。
+    """
     try:
         # 检查停止信号
         if stop_event and stop_event.is_set():
@@ -297,7 +409,9 @@ def translate_plain_text_file(
         content = utils.safe_read_file(input_path)
 
         # 检测术语表
-        if glossary.is_empty():
+        if not glossary.is_empty():
+            log_fn(localization.get("log_glossary_found"))
+        elif generate_glossary:
             log_fn(localization.get("log_no_glossary"))
             glossary.load_generated_glossary(
                 subtitle_text=content,
@@ -307,13 +421,12 @@ def translate_plain_text_file(
                 stop_event=stop_event,
                 update_progress=log_fn
             )
-        else:
-            log_fn(localization.get("log_glossary_found"))
 
         # 初始化LLM
-        log_fn(localization.get("log_initializing_translation_model").format(
-            n_gpu_layers=n_gpu_layers))
-        llm = llm_helper.create_llm(model_path, n_gpu_layers)
+        if llm is None:
+            log_fn(localization.get("log_initializing_translation_model").format(
+                n_gpu_layers=n_gpu_layers))
+            llm = llm_helper.create_llm(model_path, n_gpu_layers)
 
         # 生成系统提示
         system_prompt = prompt.plain_text.generate_system_prompt(
@@ -340,32 +453,38 @@ def translate_plain_text_file(
                 chunk_index=i+1, total_chunks=len(chunks)))
 
             # 翻译文本
-            chunk_translated_text = llm_helper.plain_text.translate_text(
-                llm, chunk, system_prompt, log_fn=log_fn
-            )
+            with timing.span("translate", chunk=i+1):
+                chunk_translated_text = llm_helper.plain_text.translate_text(
+                    llm, chunk, system_prompt, log_fn=log_fn
+                )
 
             # 只有在启用反思时才进行改良
             if reflection_enabled:
                 log_fn(localization.get("log_reflection_improvement"))
 
                 # 改良意见
-                recommendation = llm_helper.plain_text.ask_for_recommendation(
-                    llm,
-                    chunk,
-                    chunk_translated_text,
-                    target_lang=target_lang,
-                    log_fn=log_fn
-                )
-
-                # 改良翻译
-                chunk_translated_text = llm_helper.plain_text.improve_translation_with_recommendation(
-                    llm,
-                    chunk,
-                    chunk_translated_text,
-                    recommendation,
-                    system_prompt,
-                    log_fn=log_fn
-                )
+                with timing.span("recommend", chunk=i+1):
+                    recommendation = llm_helper.plain_text.ask_for_recommendation(
+                        llm,
+                        chunk,
+                        chunk_translated_text,
+                        target_lang=target_lang,
+                        log_fn=log_fn
+                    )
+
+                # 改良翻译，没有问题时保留原译文
+                if recommendation:
+                    with timing.span("improve", chunk=i+1):
+                        chunk_translated_text = llm_helper.plain_text.improve_translation_with_recommendation(
+                            llm,
+                            chunk,
+                            chunk_translated_text,
+                            recommendation,
+                            system_prompt,
+                            log_fn=log_fn
+                        )
+                else:
+                    log_fn(localization.get("log_recommendation_no_issues"))
 
             else:
                 log_fn(localization.get("log_reflection_disabled"))
@@ -0,0 +1,144 @@
+# lightVT/service/translator/classifier.py - 识别无需送入模型翻译的字幕
+
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from service.subtitle import Subtitle
+
+from . import langid
+
+# 字幕类别
+DIALOGUE = "dialogue"              # 需要翻译的对白
+EMPTY = "empty"                    # 空行或仅有标点
+MUSIC = "music"                    # 仅有音符
+SOUND_TAG = "sound_tag"            # 声音标注，如 [applause]、(laughs)
+NUMERIC = "numeric"                # 数字、时间、金额等
+TARGET_LANGUAGE = "target_language"  # 已经是目标语言
+SKIPPED_KINDS = (EMPTY, MUSIC, SOUND_TAG, NUMERIC, TARGET_LANGUAGE)
+
+_MUSIC_ONLY = re.compile(r'^[\s♪♫♬♩#~\-–—.…*]*[♪♫♬♩#][\s♪♫♬♩#~\-–—.…*]*$')
+_SOUND_TAG = re.compile(r'^\s*[-–]?\s*([\[(（【])\s*([^\])）】]{1,40}?)\s*[\])）】]\s*$')
+_NUMERIC = re.compile(r'^[\s\d.,:;/%$€£¥+\-–—#()]*\d[\s\d.,:;/%$€£¥+\-–—#()]*$')
+_NO_WORD_CHARS = re.compile(r'^[\W_]*$')
+
+# 常见声音标注的译名，未收录的标注保持原样输出
+SOUND_TAG_TABLE: Dict[str, Dict[str, str]] = {
+    "applause": {"zh-CN": "掌声", "zh-TW": "掌聲", "ja": "拍手", "ko": "박수"},
+    "laughter": {"zh-CN": "笑声", "zh-TW": "笑聲", "ja": "笑い声", "ko": "웃음소리"},
+    "laughs": {"zh-CN": "笑", "zh-TW": "笑", "ja": "笑う", "ko": "웃음"},
+    "music": {"zh-CN": "音乐", "zh-TW": "音樂", "ja": "音楽", "ko": "음악"},
+    "music playing": {"zh-CN": "音乐响起", "zh-TW": "音樂響起", "ja": "音楽", "ko": "음악이 흐른다"},
+    "cheering": {"zh-CN": "欢呼声", "zh-TW": "歡呼聲", "ja": "歓声", "ko": "환호성"},
+    "sighs": {"zh-CN": "叹气", "zh-TW": "嘆氣", "ja": "ため息", "ko": "한숨"},
+    "gasps": {"zh-CN": "倒吸一口气", "zh-TW": "倒吸一口氣", "ja": "息をのむ", "ko": "헉"},
+    "screams": {"zh-CN": "尖叫", "zh-TW": "尖叫", "ja": "悲鳴", "ko": "비명"},
+    "silence": {"zh-CN": "寂静", "zh-TW": "寂靜", "ja": "静寂", "ko": "정적"},
+    "sobbing": {"zh-CN": "啜泣", "zh-TW": "啜泣", "ja": "すすり泣き", "ko": "흐느낌"},
+    "phone rings": {"zh-CN": "电话铃响", "zh-TW": "電話鈴響", "ja": "電話の着信音", "ko": "전화벨"},
+    "door closes": {"zh-CN": "关门声", "zh-TW": "關門聲", "ja": "ドアが閉まる音", "ko": "문 닫히는 소리"},
+    "knocking": {"zh-CN": "敲门声", "zh-TW": "敲門聲", "ja": "ノックの音", "ko": "노크 소리"},
+}
+
+
+def is_target_language(language: Optional[str], target_iso: Optional[str]) -> bool:
+    """根据语言识别结果判断字幕是否已是目标语言
+
+    只有识别结果明确为目标语言时才成立：只含汉字的行（可能是日文汉字）与无法区分简繁体的中文
+    都可能仍是源语言，照常送入模型翻译。language 应为文件级识别结果（见 langid.detect_file），
+    不含假名的中文文件中只含汉字的行在那里已确定为中文。
+    """
+    if not language or langid.is_ambiguous(language) or language == "zh":
+        return False
+    return language == target_iso
+
+
+def classify_line(text: str, target_iso: Optional[str] = None, language: Optional[str] = None) -> str:
+    """判断字幕类别，返回 DIALOGUE 时需要送入模型翻译
+
+    language 为该行的语言识别结果（见 langid.detect_file）
+    """
+    if _NO_WORD_CHARS.match(text):
+        return MUSIC if _MUSIC_ONLY.match(text) else EMPTY
+    if _NUMERIC.match(text):
+        return NUMERIC
+    if is_sound_tag(text):
+        return SOUND_TAG
+    if is_target_language(language, target_iso):
+        return TARGET_LANGUAGE
+    return DIALOGUE
+
+
+def is_sound_tag(text: str) -> bool:
+    """判断是否为声音标注
+
+    方括号内容总是视为标注；圆括号也常用于心声、旁白等需要翻译的对白，
+    只有全大写（SDH 字幕惯例）或收录在 SOUND_TAG_TABLE 中的才视为标注。
+    """
+    match = _SOUND_TAG.match(text)
+    if not match:
+        return False
+    bracket, content = match.groups()
+    return bracket in "[【" or content.isupper() or content.lower() in SOUND_TAG_TABLE
+
+
+def translate_sound_tag(text: str, target_iso: Optional[str]) -> str:
+    """查表翻译声音标注，保留原有括号，未收录时原样返回"""
+    match = _SOUND_TAG.match(text)
+    if not match or not target_iso:
+        return text
+    translation = SOUND_TAG_TABLE.get(match.group(2).lower(), {}).get(target_iso)
+    if not translation:
+        return text
+    start, end = match.span(2)
+    return f"{text[:start]}{translation}{text[end:]}"
+
+
+@dataclass
+class ClassifiedSubtitles:
+    """分类结果
+
+    - subtitles: 输入字幕
+    - resolved: 序号 -> 无需模型翻译的结果（原样或查表翻译）
+    - counts: 各类别的字幕条数
+    """
+    subtitles: List[Subtitle]
+    resolved: Dict[int, Subtitle] = field(default_factory=dict)
+    counts: Counter = field(default_factory=Counter)
+
+    @property
+    def pending(self) -> List[Subtitle]:
+        """需要送入模型翻译的字幕"""
+        return [s for i, s in enumerate(self.subtitles) if i not in self.resolved]
+
+    @property
+    def skipped(self) -> int:
+        return len(self.resolved)
+
+    def merge(self, translated: List[Subtitle]) -> List[Subtitle]:
+        """将模型译文（与 pending 一一对应）与无需翻译的字幕按原顺序合并"""
+        translated_iter = iter(translated)
+        return [
+            self.resolved[i] if i in self.resolved else next(translated_iter)
+            for i in range(len(self.subtitles))
+        ]
+
+
+def classify_subtitles(subtitles: List[Subtitle], target_iso: Optional[str] = None,
+                       languages: Optional[List[Optional[str]]] = None) -> ClassifiedSubtitles:
+    """对字幕分类，非对白字幕直接得到结果，不再送入模型
+
+    languages 为逐行语言识别结果（见 langid.detect_file），未提供时在此按文件识别
+    """
+    if languages is None:
+        languages = langid.detect_file(s.text for s in subtitles)
+    result = ClassifiedSubtitles(subtitles)
+    for i, (subtitle, language) in enumerate(zip(subtitles, languages)):
+        kind = classify_line(subtitle.text, target_iso, language)
+        result.counts[kind] += 1
+        if kind == DIALOGUE:
+            continue
+        text = translate_sound_tag(subtitle.text, target_iso) if kind == SOUND_TAG else subtitle.text
+        result.resolved[i] = subtitle.with_text(text)
+    return result
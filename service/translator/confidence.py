@@ -0,0 +1,127 @@
+# lightVT/service/translator/confidence.py - 译文块置信度评估（决定是否需要反思改进）
+
+import math
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+from . import langid
+
+# 汉字与假名按字计数，约 1.5 字对应一个英文单词
+_CJK = re.compile(r'[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff]')
+_WORD = re.compile(r"[^\W\d_]+")
+CJK_CHARS_PER_WORD = 1.5
+
+# 译文与原文长度（按词计）之比的正常范围，超出范围时按偏离程度降低置信度
+MIN_LENGTH_RATIO = 0.25
+MAX_LENGTH_RATIO = 4.0
+# 原文过短（如 "Oh."、"Yes!"）时长度比没有参考意义
+MIN_SOURCE_UNITS = 2
+
+# 原文含术语但译文未使用术语表译名时该行的置信度
+GLOSSARY_MISS_SCORE = 0.5
+
+# 启用置信度筛选而未指定阈值时（如基准测试的 gated 设置）使用的阈值
+DEFAULT_REFLECTION_THRESHOLD = 0.8
+
+
+@dataclass
+class ChunkConfidence:
+    """块置信度
+
+    - score: 0~1，取各行置信度与模型 token 概率中的最小值，块的质量以最差的一行为准
+    - signals: 各项信号的得分（lines / length / script / glossary / logprob），用于日志
+    """
+    score: float
+    signals: Dict[str, float] = field(default_factory=dict)
+
+    def describe(self) -> str:
+        return ", ".join(f"{name}={value:.2f}" for name, value in self.signals.items())
+
+
+def _units(text: str) -> float:
+    cjk = len(_CJK.findall(text))
+    words = len(_WORD.findall(_CJK.sub(" ", text)))
+    return words + cjk / CJK_CHARS_PER_WORD
+
+
+def length_score(source: str, translation: str) -> float:
+    """译文长度是否合理：漏译、截断会过短，重复生成、混入解释会过长"""
+    source_units = _units(source)
+    if source_units < MIN_SOURCE_UNITS:
+        return 1.0
+    ratio = _units(translation) / source_units
+    if ratio < MIN_LENGTH_RATIO:
+        return ratio / MIN_LENGTH_RATIO
+    if ratio > MAX_LENGTH_RATIO:
+        return MAX_LENGTH_RATIO / ratio
+    return 1.0
+
+
+def is_untranslated(source: str, translation: str, target_iso: Optional[str]) -> bool:
+    """译文与原文相同，或仍是原文的语言（且不是目标语言）"""
+    if translation.strip().casefold() == source.strip().casefold():
+        # 人名、感叹词等短句原样保留是正常的
+        return _units(source) >= MIN_SOURCE_UNITS
+    if not target_iso:
+        return False
+    detected = langid.detect_language(translation)
+    return bool(detected) and not langid.matches(detected, target_iso) \
+        and detected == langid.detect_language(source)
+
+
+@lru_cache(maxsize=1024)
+def _term_pattern(term: str):
+    return re.compile(r'\b' + re.escape(term) + r'\b', re.IGNORECASE)
+
+
+def glossary_score(source: str, translation: str, terms: Dict[str, str]) -> Optional[float]:
+    """原文出现的术语是否都使用了术语表译名；原文不含术语时返回 None"""
+    expected = [target for term, target in terms.items() if term and _term_pattern(term).search(source)]
+    if not expected:
+        return None
+    translation = translation.casefold()
+    if all(target.casefold() in translation for target in expected):
+        return 1.0
+    return GLOSSARY_MISS_SCORE
+
+
+def mean_logprob(response: Dict[str, Any]) -> Optional[float]:
+    """chat completion 响应中生成 token 的平均对数概率；未请求 logprobs 时返回 None"""
+    logprobs = response["choices"][0].get("logprobs") or {}
+    values = [token["logprob"] for token in logprobs.get("content") or []
+              if token.get("logprob") is not None]
+    if not values:
+        return None
+    return sum(values) / len(values)
+
+
+def score_chunk(
+    sources: List[str],
+    translations: List[str],
+    target_iso: Optional[str] = None,
+    terms: Optional[Dict[str, str]] = None,
+    logprob: Optional[float] = None
+) -> ChunkConfidence:
+    """评估一个块的译文置信度
+
+    sources / translations 为块内逐条原文与译文；logprob 为 mean_logprob 的结果，
+    只有模型以 logits_all=True 创建时才能取得。
+    """
+    signals: Dict[str, float] = {}
+    # 条数不足说明模型漏译或合并了字幕，直接判为最低
+    signals["lines"] = 1.0 if len(translations) >= len(sources) else 0.0
+    signals["length"] = min(
+        (length_score(s, t) for s, t in zip(sources, translations)), default=1.0)
+    untranslated = any(is_untranslated(s, t, target_iso) for s, t in zip(sources, translations))
+    signals["script"] = 0.0 if untranslated else 1.0
+    if terms:
+        scores = [score for s, t in zip(sources, translations)
+                  if (score := glossary_score(s, t, terms)) is not None]
+        if scores:
+            signals["glossary"] = min(scores)
+    if logprob is not None:
+        # 平均对数概率换算为几何平均概率
+        signals["logprob"] = math.exp(logprob)
+    return ChunkConfidence(min(signals.values()), signals)
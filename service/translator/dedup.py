@@ -0,0 +1,61 @@
+# lightVT/service/translator/dedup.py - 翻译前合并重复字幕
+
+import re
+from dataclasses import dataclass
+from typing import Dict, List
+
+from service.subtitle import Subtitle
+
+# 行内空白（不含换行）
+_WHITESPACE = re.compile(r'[^\S\n]+')
+
+
+def normalize_line(text: str) -> str:
+    """重复判定使用的规范化文本：逐行合并连续空白、去除首尾空白
+
+    换行保留在键中：分行不同的字幕各自翻译，重复字幕套用的译文分行与原文一致
+    """
+    return "\n".join(_WHITESPACE.sub(" ", line).strip() for line in text.splitlines()).strip()
+
+
+@dataclass
+class DedupPlan:
+    """去重结果
+
+    - subtitles: 原字幕列表
+    - unique: 每组相同字幕的代表（首次出现的那条），按出现顺序排列，作为翻译输入；
+      代表附近的字幕大多也是各自的首次出现，分块时仍能得到接近原文的上下文
+    - mapping: 原字幕序号 -> unique 中的序号
+    """
+    subtitles: List[Subtitle]
+    unique: List[Subtitle]
+    mapping: List[int]
+
+    @property
+    def skipped(self) -> int:
+        """无需翻译的重复字幕条数"""
+        return len(self.subtitles) - len(self.unique)
+
+    def expand(self, translated: List[Subtitle]) -> List[Subtitle]:
+        """将 unique 的译文展开回原字幕列表，重复字幕使用同一译文，序号与时间轴保持各自原值"""
+        if len(translated) != len(self.unique):
+            raise ValueError(f"译文条数 ({len(translated)}) 与去重后的字幕条数 ({len(self.unique)}) 不一致")
+        return [
+            subtitle.with_text(translated[unique_index].text)
+            for subtitle, unique_index in zip(self.subtitles, self.mapping)
+        ]
+
+
+def deduplicate(subtitles: List[Subtitle]) -> DedupPlan:
+    """按规范化文本对字幕分组，每组只保留首次出现的一条用于翻译"""
+    first_index: Dict[str, int] = {}
+    unique: List[Subtitle] = []
+    mapping: List[int] = []
+    for subtitle in subtitles:
+        key = normalize_line(subtitle.text)
+        index = first_index.get(key)
+        if index is None:
+            index = first_index[key] = len(unique)
+            unique.append(subtitle)
+        mapping.append(index)
+    return DedupPlan(subtitles, unique, mapping)
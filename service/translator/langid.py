@@ -0,0 +1,196 @@
+# lightVT/service/translator/langid.py - 本地语言识别（文字系统统计 + 常用词）
+
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
+
+# 常用词表（各语言出现频率最高的功能词），用于区分同一文字系统内的语言
+_STOPWORDS: Dict[str, frozenset] = {
+    "en": frozenset("the and you to of is it that in what i this we be for are have not on with do me my your was "
+                    "he she they know can just all so no don't i'm it's".split()),
+    "fr": frozenset("le la les de des et est un une que qui pas je tu vous nous il elle ce c'est en du au pour "
+                    "sur dans avec mais oui non suis".split()),
+    "de": frozenset("der die das und ist nicht ich du sie wir ein eine zu den mit es auf für was ja nein "
+                    "bin hast dich mich auch noch".split()),
+    "es": frozenset("el la los las de que y es en un una no por con para lo se mi tu qué está yo pero sí "
+                    "muy como".split()),
+    "it": frozenset("il lo la gli le di che e è un una non per con sono mi ti io tu ma sì cosa come questo "
+                    "perché della".split()),
+    "ru": frozenset("и в не на я что он она это с как а то все мы ты вы так его но да нет ну уже было "
+                    "меня тебя".split()),
+    "bg": frozenset("и в не на аз че той тя това с като а то всичко ние ти вие така но да ще е са съм "
+                    "си се ли".split()),
+}
+
+# 区分简繁体的常用字（只在一种字形中使用）
+_SIMPLIFIED = frozenset("这个们说来时为会过对没还么国让开里发现样经见话问长门间边觉爱东车认头听")
+_TRADITIONAL = frozenset("這個們說來時為會過對沒還麼國讓開裡發現樣經見話問長門間邊覺愛東車認頭聽")
+
+# 只含汉字（没有假名、谚文或其它文字）的文本：可能是中文，也可能是只用汉字书写的日文
+# （如「先生」「東京時間」），无法确定语言，也不据此区分简繁体
+HAN_ONLY = "han"
+
+# 带有明显语言特征的字母
+_LETTER_HINTS = {
+    "ñ": "es", "¿": "es", "¡": "es",
+    "ß": "de", "ä": "de", "ö": "de", "ü": "de",
+    "ç": "fr", "ê": "fr", "è": "fr", "œ": "fr", "û": "fr",
+    "ì": "it", "ò": "it",
+    "ы": "ru", "э": "ru", "ё": "ru",
+    "ѝ": "bg",
+}
+
+_WORD = re.compile(r"[^\W\d_]+(?:'[^\W\d_]+)?")
+
+# 判定语言所需的最少字母数，过短的文本（如 "OK"）不作判断
+MIN_LETTERS = 2
+
+
+def _script_counts(text: str) -> Counter:
+    counts: Counter = Counter()
+    for ch in text:
+        if not ch.isalpha():
+            continue
+        if "\u3040" <= ch <= "\u30ff":
+            counts["kana"] += 1
+        elif "\u4e00" <= ch <= "\u9fff" or "\u3400" <= ch <= "\u4dbf":
+            counts["han"] += 1
+        elif "\uac00" <= ch <= "\ud7af" or "\u1100" <= ch <= "\u11ff":
+            counts["hangul"] += 1
+        elif "\u0400" <= ch <= "\u04ff":
+            counts["cyrillic"] += 1
+        elif ch.isascii() or "\u00c0" <= ch <= "\u024f":
+            counts["latin"] += 1
+        else:
+            counts["other"] += 1
+    return counts
+
+
+def chinese_variant(text: str) -> str:
+    """按简繁体特有字判断中文字形，返回 "zh-CN"/"zh-TW"，无法区分时返回 "zh"
+
+    日文汉字同样会命中这些字（如「国」「時間」），只应在已知文本是中文时使用
+    """
+    simplified = sum(1 for ch in text if ch in _SIMPLIFIED)
+    traditional = sum(1 for ch in text if ch in _TRADITIONAL)
+    if simplified > traditional:
+        return "zh-CN"
+    if traditional > simplified:
+        return "zh-TW"
+    return "zh"
+
+
+def _detect_by_words(text: str, candidates: Iterable[str]) -> Optional[str]:
+    scores: Counter = Counter()
+    lowered = text.lower()
+    for word in _WORD.findall(lowered):
+        for lang in candidates:
+            if word in _STOPWORDS[lang]:
+                scores[lang] += 1
+    for ch, lang in _LETTER_HINTS.items():
+        if lang in candidates and ch in lowered:
+            scores[lang] += 1
+    if not scores:
+        return None
+    ranked = scores.most_common(2)
+    # 两种语言得分相同时不作判断
+    if len(ranked) > 1 and ranked[0][1] == ranked[1][1]:
+        return None
+    return ranked[0][0]
+
+
+def detect_language(text: str) -> Optional[str]:
+    """识别单条文本的语言，返回 ISO 代码；无法判断时返回 None
+
+    只含汉字的文本返回 HAN_ONLY（中文或日文汉字，无法判断）；汉字为主并夹杂其它文字时
+    按中文返回 "zh-CN"/"zh-TW"，无法区分简繁时返回 "zh"。
+    """
+    counts = _script_counts(text)
+    total = sum(counts.values())
+    if total < MIN_LETTERS:
+        return None
+    script, count = counts.most_common(1)[0]
+    if count / total < 0.6 and not counts["kana"]:
+        return None
+
+    if counts["kana"]:
+        return "ja"
+    if script == "hangul":
+        return "ko"
+    if script == "han":
+        return HAN_ONLY if count == total else chinese_variant(text)
+    if script == "cyrillic":
+        return _detect_by_words(text, ("ru", "bg"))
+    if script == "latin":
+        return _detect_by_words(text, ("en", "fr", "de", "es", "it"))
+    return None
+
+
+def detect_lines(texts: Iterable[str]) -> List[Optional[str]]:
+    """逐行识别语言"""
+    return [detect_language(text) for text in texts]
+
+
+def detect_file(texts: Iterable[str], source_iso: Optional[str] = None) -> List[Optional[str]]:
+    """逐行识别语言，并在文件级别确定只含汉字的行
+
+    单行只含汉字时无法区分中文与日文汉字（见 HAN_ONLY）。源语言不是日文且整个文件都没有假名时，
+    这些行与无法区分简繁的中文行（"zh"）都按中文处理，简繁体由全文的特有字决定；
+    否则保持逐行结果，只含汉字的行不会被当作目标语言跳过。
+    """
+    texts = list(texts)
+    languages = detect_lines(texts)
+    if source_iso == "ja" or not any(lang in (HAN_ONLY, "zh") for lang in languages):
+        return languages
+    if any(_script_counts(text)["kana"] for text in texts):
+        return languages
+    variant = chinese_variant("".join(texts))
+    return [variant if lang in (HAN_ONLY, "zh") else lang for lang in languages]
+
+
+def matches(detected: Optional[str], target_iso: Optional[str]) -> bool:
+    """识别结果是否可能为目标语言
+
+    无法区分简繁体的中文视为匹配任一中文目标；HAN_ONLY 视为匹配中文与日文目标。
+    需要确定是目标语言时（如跳过翻译）另须排除 is_ambiguous 的结果。
+    """
+    if not detected or not target_iso:
+        return False
+    if detected == target_iso:
+        return True
+    if detected == HAN_ONLY and target_iso == "ja":
+        return True
+    return detected in ("zh", HAN_ONLY) and target_iso.startswith("zh")
+
+
+def is_ambiguous(detected: Optional[str]) -> bool:
+    """识别结果是否无法确定具体语言（只含汉字的文本）"""
+    return detected == HAN_ONLY
+
+
+def summarize(languages: Iterable[Optional[str]]) -> Counter:
+    """统计各语言的行数，无法判断的行不计入"""
+    return Counter(lang for lang in languages if lang)
+
+
+def is_file_in_language(languages: Iterable[Optional[str]], target_iso: Optional[str],
+                        threshold: float = 0.95, min_detected: float = 0.3) -> bool:
+    """整个文件是否已是目标语言
+
+    可判断语言的行需占全部行的 min_detected 以上，避免仅凭少数几行下结论
+    """
+    languages = list(languages)
+    detected = sum(1 for lang in languages if lang)
+    if not detected or detected < len(languages) * min_detected:
+        return False
+    return target_language_ratio(languages, target_iso) >= threshold
+
+
+def target_language_ratio(languages: Iterable[Optional[str]], target_iso: Optional[str]) -> float:
+    """可判断语言的行中确定为目标语言的行所占比例（只含汉字的行不计为目标语言）"""
+    summary = summarize(languages)
+    total = sum(summary.values())
+    if not total:
+        return 0.0
+    return sum(count for lang, count in summary.items()
+               if matches(lang, target_iso) and not is_ambiguous(lang)) / total
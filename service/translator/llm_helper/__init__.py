@@ -2,12 +2,25 @@ from . import subtitle
 from . import plain_text
 from typing import Dict, List, Callable, Any, Optional, Tuple, Any
 from llama_cpp import Llama
+from utils import model_profile, timing
 
-def create_llm(model_path: str, n_gpu_layers: int = 0, n_ctx: int = 8192) -> Any:
-    """创建并返回LLM模型实例"""
-    return Llama(
-        model_path=model_path,
-        n_gpu_layers=n_gpu_layers,
-        n_ctx=n_ctx,
-        verbose=False
-    )
\ No newline at end of file
+def create_llm(model_path: str, n_gpu_layers: int = 0, n_ctx: int = 8192, logits_all: bool = False) -> Any:
+    """创建并返回LLM模型实例
+
+    logits_all 为 True 时才能返回 token 对数概率，但需额外分配 n_ctx * 词表大小 的 logits 缓冲区。
+    按模型能力关闭思考过程（见 utils.model_profile），避免生成随后被丢弃的思考 token。
+    """
+    with timing.span("model_load"):
+        llm = Llama(
+            model_path=model_path,
+            n_gpu_layers=n_gpu_layers,
+            n_ctx=n_ctx,
+            logits_all=logits_all,
+            verbose=False
+        )
+    model_profile.suppress_reasoning(llm)
+    return llm
+
+def supports_logprobs(llm: Any) -> bool:
+    """模型实例能否返回 token 对数概率（以 logits_all=True 创建）"""
+    return bool(getattr(llm, "_logits_all", False))
\ No newline at end of file
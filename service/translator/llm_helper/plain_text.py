@@ -1,11 +1,14 @@
 from typing import Dict, List, Callable, Any, Optional, Tuple
 from service.translator import prompt
 import re
-from service.log import get_logger
+from service.log import get_logger, get_prompt_channel
 from service import localization
-from utils import strip_thinking
+from llama_cpp import LlamaGrammar
+from utils import model_profile, usage, strip_thinking, parse_recommendation, RECOMMENDATION_LIST, RECOMMENDATION_STOP
 
 logger = get_logger("LightVT")
+# 完整的提示词与模型输出写入提示词通道（惰性生成，可抽样或关闭）
+prompt_trace = get_prompt_channel("LightVT")
 
 def translate_text(
     llm: Any,
@@ -22,7 +25,9 @@ def translate_text(
     
     user_prompt = prompt.plain_text.generate_translation_prompt(text)
     
-    response = llm.create_chat_completion(
+    response = model_profile.create_chat_completion(
+        llm,
+        call_type=usage.TRANSLATE,
         messages=[
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": user_prompt}
@@ -35,7 +40,7 @@ def translate_text(
     
     log_fn(localization.get("msg_translation_complete")
         .format(result_length=len(translated_text)))
-    logger.info(f"纯文本翻译结果：\n{translated_text}")
+    prompt_trace.info(lambda: f"纯文本翻译结果：\n{translated_text}")
     
     return translated_text
 
@@ -44,30 +49,36 @@ def ask_for_recommendation(
         source_text:str,
         translated_text: str,
         target_lang: str, 
-        max_tokens: int = 8192, 
+        max_tokens: int = 384, 
         temperature: float = 0.1, 
         log_fn: Callable[[str], None] = print) -> str:
-    """改进翻译结果"""
+    """生成改进建议
+
+    输出受 RECOMMENDATION_LIST Grammar 约束，返回以 "- " 开头的问题列表文本；
+    译文没有问题（模型输出 OK）时返回空字符串，调用方据此跳过改进翻译
+    """
     
     review_system_prompt = prompt.plain_text.generate_recommendation_system_prompt(target_lang)
     user_prompt = prompt.plain_text.generate_recommendation_prompt(source_text, translated_text)
-    response = llm.create_chat_completion(
+    response = model_profile.create_chat_completion(
+        llm,
+        call_type=usage.RECOMMEND,
         messages=[
             {"role": "system", "content": review_system_prompt},
             {"role": "user", "content": user_prompt}
         ],
         max_tokens=max_tokens,
-        temperature=temperature
+        temperature=temperature,
+        grammar=LlamaGrammar.from_string(RECOMMENDATION_LIST),
+        stop=RECOMMENDATION_STOP
     )
-    # 目前仅返回原翻译结果
-    recommendation = response["choices"][0]["message"]["content"].strip()
-    
-    # 剥除可能的思考过程
-    recommendation = strip_thinking(recommendation)
+    issues = parse_recommendation(response["choices"][0]["message"]["content"])
+    recommendation = "\n".join(f"- {issue}" for issue in issues)
     
     log_fn(localization.get("msg_improvement_prompt_generated"))
-    logger.info(f"改进建议提示词：{user_prompt}")
-    logger.info(f"改进建议: {recommendation}")
+    prompt_trace.info(lambda: (
+        f"改进建议提示词：{user_prompt}\n"
+        f"改进建议: {recommendation}"))
     return recommendation
 
 def improve_translation_with_recommendation(
@@ -81,7 +92,9 @@ def improve_translation_with_recommendation(
         log_fn: Callable[[str], None] = print) -> str:
     """根据改进意见改进翻译"""
     user_prompt = prompt.plain_text.generate_improved_translation_prompt_with_recommendation(source_text, translated_text, recommendation)
-    response = llm.create_chat_completion(
+    response = model_profile.create_chat_completion(
+        llm,
+        call_type=usage.IMPROVE,
         messages=[
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": user_prompt}
@@ -97,8 +110,9 @@ def improve_translation_with_recommendation(
     improved_translation = strip_thinking(improved_translation)
     
     log_fn(localization.get("msg_translated_text_improved"))
-    logger.info(f"改进翻译提示词：{user_prompt}")
-    logger.info(f"原文:{source_text}")
-    logger.info(f"原翻译: {translated_text}")
-    logger.info(f"改进后的翻译: {improved_translation}")
+    prompt_trace.info(lambda: (
+        f"改进翻译提示词：{user_prompt}\n"
+        f"原文:{source_text}\n"
+        f"原翻译: {translated_text}\n"
+        f"改进后的翻译: {improved_translation}"))
     return improved_translation
\ No newline at end of file
@@ -1,15 +1,20 @@
+import json
 from typing import Dict, List, Callable, Any, Optional, Tuple, Any
 from service.translator import prompt
-from service.log import get_logger
+from service.translator import confidence
+from service.log import get_logger, get_prompt_channel
 from service import localization
 from llama_cpp import Llama, LlamaGrammar
-from utils import strip_thinking, JSON_STRING_ARRAY, json_array_to_subtitle_format
+from utils import model_profile, usage, stream_json_completion, strip_thinking, parse_recommendation, JSON_STRING_ARRAY, JSON_CRITIQUE_TRANSLATION, RECOMMENDATION_LIST, RECOMMENDATION_STOP, json_array_to_subtitle_format
+from service.subtitle import Subtitle
 
 logger = get_logger("LightVT")
+# 完整的提示词与模型输出写入提示词通道（惰性生成，可抽样或关闭）
+prompt_trace = get_prompt_channel("LightVT")
 
-def prepare_text_for_translation(chunk: List[Dict[str, str]]) -> str:
+def prepare_text_for_translation(chunk: List[Subtitle]) -> str:
     """准备要翻译的字幕块文本"""
-    return "\n".join([f"{i+1}. {s['text']}" for i, s in enumerate(chunk)])
+    return "\n".join([f"{i+1}. {s.text}" for i, s in enumerate(chunk)])
 
 def parse_translation_text(translated_text: str) -> List[str]:
     """解析翻译文本，提取每条内容（支持 [[编号]] 格式）"""
@@ -43,9 +48,17 @@ def translate_text(
     system_prompt: str, 
     max_tokens: int = 8192, 
     temperature: float = 0.2, 
-    log_fn: Callable[[str], None] = print
+    log_fn: Callable[[str], None] = print,
+    logprobs: bool = False,
+    progress_fn: Optional[Callable[[int, int], None]] = None
 ) -> str:
-    """使用LLM翻译文本"""
+    """使用LLM翻译文本
+
+    logprobs 为 True 时请求 token 对数概率，平均值记入 chunk['mean_logprob']（见 confidence.mean_logprob），
+    模型须以 logits_all=True 创建。
+    模型输出的条数多于字幕条数时多出部分被丢弃，chunk['extra_items'] 记为 True，review_translation 据此重新翻译。
+    progress_fn(已完成字幕条数, 已生成 token 数) 在流式生成中每完成一条字幕调用一次。
+    """
     main_chunk = chunk['main']
     full_context = chunk['context']
 
@@ -53,14 +66,19 @@ def translate_text(
     main_indices = chunk['main_indices']
 
     # 要翻译的文本长度
-    main_chunk_text_length = sum(len(s['text']) for s in main_chunk)
+    main_chunk_text_length = sum(len(s.text) for s in main_chunk)
 
     log_fn(localization.get("msg_translating_text").format(characters_count=main_chunk_text_length))
     
     # 生成上下文感知的提示
     user_prompt =prompt.subtitle.generate_translation_prompt(full_context, main_indices)
     
-    response = llm.create_chat_completion(
+    # 流式生成，数组元素数达到字幕条数即停止，并实时报告进度
+    response = stream_json_completion(
+        llm,
+        call_type=usage.TRANSLATE,
+        expected_items=len(main_indices),
+        on_progress=progress_fn,
         messages=[
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": user_prompt}
@@ -68,7 +86,11 @@ def translate_text(
         max_tokens=max_tokens,
         temperature=temperature,
         grammar=LlamaGrammar.from_string(JSON_STRING_ARRAY),
+        **({"logprobs": True, "top_logprobs": 1} if logprobs else {}),
     )
+    if logprobs:
+        chunk['mean_logprob'] = confidence.mean_logprob(response)
+    chunk['extra_items'] = response["extra_items"]
     
     translated_json = response["choices"][0]["message"]["content"].strip()
     # Grammar 保证 JSON 输出，转换为 [[N]] 格式
@@ -76,8 +98,9 @@ def translate_text(
     
     log_fn(localization.get("msg_translation_complete")
         .format(result_length=len(translated_text)))
-    logger.info(f"翻译提示词:\n{user_prompt}") 
-    logger.info(f"翻译结果：\n{translated_text}")
+    prompt_trace.info(lambda: (
+        f"翻译提示词:\n{user_prompt}\n"
+        f"翻译结果：\n{translated_text}"))
     
     return translated_text
 
@@ -86,10 +109,14 @@ def ask_for_recommendation(
         chunk: Dict[str, Any],
         translated_text: str,
         target_lang: str, 
-        max_tokens: int = 8192, 
+        max_tokens: int = 384, 
         temperature: float = 0.1, 
         log_fn: Callable[[str], None] = print) -> str:
-    """改进翻译结果"""
+    """生成改进建议
+
+    输出受 RECOMMENDATION_LIST Grammar 约束，返回以 "- " 开头的问题列表文本；
+    译文没有问题（模型输出 OK）时返回空字符串，调用方据此跳过改进翻译
+    """
     # 这里可以添加更复杂的改良逻辑
     full_context = chunk['context']
 
@@ -98,23 +125,25 @@ def ask_for_recommendation(
     
     review_system_prompt = prompt.subtitle.generate_recommendation_system_prompt(target_lang)
     user_prompt = prompt.subtitle.generate_recommendation_prompt(full_context,main_indices,translated_text)
-    response = llm.create_chat_completion(
+    response = model_profile.create_chat_completion(
+        llm,
+        call_type=usage.RECOMMEND,
         messages=[
             {"role": "system", "content": review_system_prompt},
             {"role": "user", "content": user_prompt}
         ],
         max_tokens=max_tokens,
-        temperature=temperature
+        temperature=temperature,
+        grammar=LlamaGrammar.from_string(RECOMMENDATION_LIST),
+        stop=RECOMMENDATION_STOP
     )
-    # 目前仅返回原翻译结果
-    recommendation = response["choices"][0]["message"]["content"].strip()
-    
-    # 剥除可能的思考过程
-    recommendation = strip_thinking(recommendation)
+    issues = parse_recommendation(response["choices"][0]["message"]["content"])
+    recommendation = "\n".join(f"- {issue}" for issue in issues)
     
     log_fn(localization.get("msg_improvement_prompt_generated"))
-    logger.info(f"改进建议提示词：{user_prompt}")
-    logger.info(f"改进建议: {recommendation}")
+    prompt_trace.info(lambda: (
+        f"改进建议提示词：{user_prompt}\n"
+        f"改进建议: {recommendation}"))
     return recommendation
 
 def improve_translation_with_recommendation(
@@ -132,7 +161,10 @@ def improve_translation_with_recommendation(
     main_indices = chunk['main_indices']
     
     user_prompt = prompt.subtitle.generate_improved_translation_prompt_with_recommendation(full_context,main_indices,translated_text,recommendation)
-    response = llm.create_chat_completion(
+    response = stream_json_completion(
+        llm,
+        call_type=usage.IMPROVE,
+        expected_items=len(main_indices),
         messages=[
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": user_prompt}
@@ -142,16 +174,65 @@ def improve_translation_with_recommendation(
         grammar=LlamaGrammar.from_string(JSON_STRING_ARRAY),
     )
     
+    chunk['extra_items'] = response["extra_items"]
     improved_json = response["choices"][0]["message"]["content"].strip()
     improved_translation = json_array_to_subtitle_format(improved_json, full_context, main_indices)
     
-    src_text = "\n".join([f"{i+1}. {s['text']}" for i, s in enumerate(chunk["main"])])
-    
     log_fn(localization.get("msg_translated_text_improved"))
-    logger.info(f"改进翻译提示词：{user_prompt}")
-    logger.info(f"原文:{src_text}")
-    logger.info(f"原翻译: {translated_text}")
-    logger.info(f"改进后的翻译: {improved_translation}")
+    prompt_trace.info(lambda: (
+        f"改进翻译提示词：{user_prompt}\n"
+        f"原文:{prepare_text_for_translation(chunk['main'])}\n"
+        f"原翻译: {translated_text}\n"
+        f"改进后的翻译: {improved_translation}"))
+    return improved_translation
+
+def self_correct_translation(
+        llm: Any,
+        chunk: Dict[str, Any],
+        translated_text: str,
+        system_prompt: str,
+        max_tokens: int = 4096,
+        temperature: float = 0.2,
+        log_fn: Callable[[str], None] = print) -> str:
+    """自我修正：一次 grammar 约束调用同时给出评估与最终译文，代替“改进建议 + 改进翻译”两次调用"""
+    full_context = chunk['context']
+
+    main_indices = chunk['main_indices']
+
+    user_prompt = prompt.subtitle.generate_self_correction_prompt(full_context, main_indices, translated_text)
+    response = stream_json_completion(
+        llm,
+        call_type=usage.REFLECT,
+        messages=[
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt}
+        ],
+        max_tokens=max_tokens,
+        temperature=temperature,
+        grammar=LlamaGrammar.from_string(JSON_CRITIQUE_TRANSLATION),
+    )
+
+    content = response["choices"][0]["message"]["content"].strip()
+    try:
+        result = json.loads(content)
+        critique = str(result.get("critique", ""))
+        translations = result.get("translation")
+        if not isinstance(translations, list) or not translations:
+            raise ValueError("translation 不是非空数组")
+    except (json.JSONDecodeError, ValueError, AttributeError) as e:
+        logger.warning(f"自我修正结果解析失败: {e}，保留初译")
+        return translated_text
+
+    chunk['extra_items'] = len(translations) > len(main_indices)
+    improved_translation = json_array_to_subtitle_format(
+        json.dumps(translations, ensure_ascii=False), full_context, main_indices)
+
+    log_fn(localization.get("msg_translated_text_improved"))
+    prompt_trace.info(lambda: (
+        f"自我修正提示词：{user_prompt}\n"
+        f"评估: {critique}\n"
+        f"原翻译: {translated_text}\n"
+        f"修正后的翻译: {improved_translation}"))
     return improved_translation
 
 def review_translation(
@@ -162,18 +243,25 @@ def review_translation(
         max_tokens: int = 8192,
         temperature: float = 0.2,
         log_fn: Callable[[str], None] = print) -> str:
-    """改进翻译结果"""
+    """改进翻译结果
+
+    译文条数与原文不一致，或生成译文时模型输出了多余的条目（chunk['extra_items']）时重新翻译。
+    """
     full_context = chunk['context']
     
     main_indices = chunk['main_indices']
     
     # 解析译文，根据序号提取条数，并与main_indices条数相比对
     translated_lines = parse_translation_text(translated_text)
+    extra_items = chunk.get('extra_items', False)
     
-    if len(translated_lines) != len(main_indices):
+    if len(translated_lines) != len(main_indices) or extra_items:
         user_prompt = prompt.subtitle.generate_review_translation_prompt(full_context,main_indices,translated_text)
         # user_prompt =prompt.generate_translation_prompt(full_context, main_indices)
-        response = llm.create_chat_completion(
+        response = stream_json_completion(
+            llm,
+            call_type=usage.REVIEW,
+            expected_items=len(main_indices),
             messages=[
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_prompt}
@@ -186,12 +274,15 @@ def review_translation(
         improved_json = response["choices"][0]["message"]["content"].strip()
         improved_translation = json_array_to_subtitle_format(improved_json, full_context, main_indices)
         
-        src_text = "\n".join([f"{i+1}. {s['text']}" for i, s in enumerate(chunk["main"])])
-        logger.info("原文与译文条数不匹配")
-        logger.info(f"review改进翻译提示词：{user_prompt}")
-        logger.info(f"原文:{src_text}")
-        logger.info(f"原翻译: {translated_text}")
-        logger.info(f"改进后的翻译: {improved_translation}")
+        logger.info("模型输出的译文条数多于原文" if extra_items else "原文与译文条数不匹配")
+        chunk['extra_items'] = response["extra_items"]
+        if response["extra_items"]:
+            logger.warning("review 后译文条数仍多于原文，多出的条目已丢弃")
+        prompt_trace.info(lambda: (
+            f"review改进翻译提示词：{user_prompt}\n"
+            f"原文:{prepare_text_for_translation(chunk['main'])}\n"
+            f"原翻译: {translated_text}\n"
+            f"改进后的翻译: {improved_translation}"))
         return improved_translation
     else:
         logger.info("原文与译文条数匹配，无需改进")
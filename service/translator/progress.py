@@ -0,0 +1,98 @@
+# lightVT/service/translator/progress.py - 翻译进度事件（块序号、已完成字幕数、生成速度、剩余时间）
+
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from service import localization
+
+
+@dataclass(frozen=True)
+class ProgressEvent:
+    """翻译进度
+
+    - chunk_index / total_chunks: 当前块序号（从 1 开始）与总块数
+    - subtitles_done / total_subtitles: 已翻译与需要模型翻译的字幕条数
+    - tokens_per_second: 当前模型调用的生成速度
+    - eta_seconds: 按已用时间估算的剩余秒数，尚无完成的字幕时为 None
+    """
+    chunk_index: int
+    total_chunks: int
+    subtitles_done: int
+    total_subtitles: int
+    tokens_per_second: float
+    eta_seconds: Optional[float]
+
+    @property
+    def fraction(self) -> float:
+        return self.subtitles_done / self.total_subtitles if self.total_subtitles else 1.0
+
+
+def format_duration(seconds: Optional[float]) -> str:
+    if seconds is None:
+        return "--:--"
+    minutes, seconds = divmod(int(seconds + 0.5), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes:02d}:{seconds:02d}"
+
+
+def format_progress(event: ProgressEvent) -> str:
+    """进度的单行文本，用于 GUI 状态栏与命令行"""
+    return localization.get("progress_status").format(
+        chunk_index=event.chunk_index,
+        total_chunks=event.total_chunks,
+        subtitles_done=event.subtitles_done,
+        total_subtitles=event.total_subtitles,
+        tokens_per_second=event.tokens_per_second,
+        eta=format_duration(event.eta_seconds))
+
+
+class ProgressTracker:
+    """跟踪块与流式生成的进度，计算生成速度与剩余时间并发出 ProgressEvent"""
+
+    def __init__(self, total_chunks: int, total_subtitles: int,
+                 emit: Callable[[ProgressEvent], None],
+                 clock: Callable[[], float] = time.perf_counter):
+        self.total_chunks = total_chunks
+        self.total_subtitles = total_subtitles
+        self._emit = emit
+        self._clock = clock
+        self._start = clock()
+        self._subtitles_done = 0
+        self._chunk_index = 0
+        self._chunk_done = 0
+        self._call_start = self._start
+        self._tokens_per_second = 0.0
+
+    def start_chunk(self, chunk_index: int) -> None:
+        """开始翻译第 chunk_index 块（从 1 开始）"""
+        self._chunk_index = chunk_index
+        self._chunk_done = 0
+        self._call_start = self._clock()
+        self._emit_event()
+
+    def stream_progress(self, items_done: int, completion_tokens: int) -> None:
+        """流式生成中当前块已完成 items_done 条，共生成 completion_tokens 个 token"""
+        elapsed = self._clock() - self._call_start
+        if elapsed > 0:
+            self._tokens_per_second = completion_tokens / elapsed
+        self._chunk_done = items_done
+        self._emit_event()
+
+    def finish_chunk(self, subtitles_count: int) -> None:
+        """当前块（含反思与检查）完成"""
+        self._subtitles_done += subtitles_count
+        self._chunk_done = 0
+        self._emit_event()
+
+    def _emit_event(self) -> None:
+        done = min(self._subtitles_done + self._chunk_done, self.total_subtitles)
+        elapsed = self._clock() - self._start
+        eta = elapsed / done * (self.total_subtitles - done) if done else None
+        self._emit(ProgressEvent(
+            chunk_index=self._chunk_index,
+            total_chunks=self.total_chunks,
+            subtitles_done=done,
+            total_subtitles=self.total_subtitles,
+            tokens_per_second=self._tokens_per_second,
+            eta_seconds=eta))
@@ -50,13 +50,15 @@ def generate_recommendation_prompt(source_text:str,translated_text:str):
 译文：
 {translated_text}
 
+输出格式：
+没有明显错误时只输出 OK；
+否则每行一条，以 "- " 开头，写明问题与建议，最多 5 条，不要输出其他内容。
 """
 
 def generate_improved_translation_prompt_with_recommendation(source_text: str, translated_text:str,recommendation:str) -> str:
     """生成包含上下文的翻译提示"""
     # 计算需要输出的字幕条数
-    return f"""/nothink
-请根据建议改进翻译。
+    return f"""请根据建议改进翻译。
 
 原文：
 {source_text}
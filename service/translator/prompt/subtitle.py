@@ -1,6 +1,7 @@
 from typing import Dict, List, Callable, Any, Optional, Tuple, Any
 from service import localization
 from service import glossary
+from service.subtitle import Subtitle
 
 def generate_system_prompt(source_lang: str, target_lang: str) -> str:
     """生成系统提示"""
@@ -20,6 +21,7 @@ def generate_system_prompt(source_lang: str, target_lang: str) -> str:
 3. 如果遇到歌词，请直接翻译，不要用星号或其他符号替代
 4. 保持歌词的音乐符号 ♪
 5. 每个条目都以序号开头，一个条目可能有多行，不应该将一个条目的多行视为多条字幕
+6. 原文中的 {1}、{2} 等占位符代表格式标签，必须原样保留在译文中对应的词语两侧
 
 比如：
 [[1]]
@@ -109,11 +111,11 @@ def generate_recommendation_system_prompt(target_lang: str) -> str:
     好的翻译不需要强行改进。
 """
 
-def parse_chunk(chunk: List[Dict]) -> str:
+def parse_chunk(chunk: List[Subtitle]) -> str:
     """将字幕块转换为字符串"""
-    return "\n".join([f"[[{s['id']}]]\n{s['text']}" for i, s in enumerate(chunk)])
+    return "\n".join([f"[[{s.id}]]\n{s.text}" for i, s in enumerate(chunk)])
 
-def generate_translation_prompt(context_chunk: List[Dict], main_indices: List[int]) -> str:
+def generate_translation_prompt(context_chunk: List[Subtitle], main_indices: List[int]) -> str:
     """生成翻译提示 - 分离上下文和目标内容"""
     
     # 分离上下文和目标翻译内容
@@ -139,14 +141,13 @@ def generate_translation_prompt(context_chunk: List[Dict], main_indices: List[in
     
     # 计算信息
     expected_count = len(main_indices)
-    start_num = context_chunk[main_indices[0]]['id']
-    end_num = context_chunk[main_indices[-1]]['id']
+    start_num = context_chunk[main_indices[0]].id
+    end_num = context_chunk[main_indices[-1]].id
     
     # 术语表
     glossary_prompt = glossary.generate_glossary_prompt(target_text)
     
-    return f"""/nothink
-请翻译指定的字幕内容。
+    return f"""请翻译指定的字幕内容。
 
 【上下文参考】（仅供理解语境，不要翻译）：
 {context_text}
@@ -174,7 +175,7 @@ def generate_translation_prompt(context_chunk: List[Dict], main_indices: List[in
 
 请开始翻译："""
 
-def generate_recommendation_prompt(context_chunk: List[Dict], main_indices: List[int],translated_text:str):
+def generate_recommendation_prompt(context_chunk: List[Subtitle], main_indices: List[int],translated_text:str):
     """生成改进建议提示"""
     
     # 构建上下文文本
@@ -201,9 +202,14 @@ def generate_recommendation_prompt(context_chunk: List[Dict], main_indices: List
 - 语法错误
 - 表达不自然
 - 词句未翻译
+
+输出格式：
+没有明显错误时只输出 OK；
+否则每行一条，以 "- " 开头，写明编号、问题与建议，最多 5 条，不要输出其他内容，如：
+- [[3]] 漏译了 "right now"，应译为“马上”
 """
 
-def generate_review_translation_prompt(context_chunk: List[Dict], main_indices: List[int],translated_text:str) -> str:
+def generate_review_translation_prompt(context_chunk: List[Subtitle], main_indices: List[int],translated_text:str) -> str:
     """生成包含上下文的翻译提示"""
     
     main_text = parse_chunk([context_chunk[i] for i in main_indices])
@@ -211,8 +217,7 @@ def generate_review_translation_prompt(context_chunk: List[Dict], main_indices:
     # 计算需要输出的字幕条数
     expected_count = len(main_indices)
     
-    return f"""/nothink
-译文与原文的序号内容不匹配，请重新翻译原文 ，新译文严格保持与原文序号内容一致。
+    return f"""译文与原文的序号内容不匹配，请重新翻译原文 ，新译文严格保持与原文序号内容一致。
 
 原文：
 {main_text}
@@ -271,7 +276,7 @@ def generate_review_translation_prompt(context_chunk: List[Dict], main_indices:
     ["不会从", "大地上消失", "[掌声]"]
 """
 
-def generate_improved_translation_prompt_with_recommendation(context_chunk: List[Dict], main_indices: List[int],translated_text:str,recommendation:str) -> str:
+def generate_improved_translation_prompt_with_recommendation(context_chunk: List[Subtitle], main_indices: List[int],translated_text:str,recommendation:str) -> str:
     """生成包含上下文的翻译提示"""
     
     # 构建上下文文本，明确标记翻译目标
@@ -285,8 +290,7 @@ def generate_improved_translation_prompt_with_recommendation(context_chunk: List
     # 计算需要输出的字幕条数
     expected_count = len(main_indices)
     
-    return f"""/nothink
-请根据建议改进翻译，严格保持字幕条数不变。
+    return f"""请根据建议改进翻译，严格保持字幕条数不变。
 
 上下文参考（仅供理解语境，不是要翻译的原文）：
 {context_text}
@@ -313,4 +317,42 @@ def generate_improved_translation_prompt_with_recommendation(context_chunk: List
 输出格式（严格的 JSON 字符串数组）：
 ["第1条翻译", "第2条翻译"]
 如果某条字幕需要多行显示，使用 \\n 分隔，如："第一行\\n第二行"
-"""
\ No newline at end of file
+"""
+
+def generate_self_correction_prompt(context_chunk: List[Subtitle], main_indices: List[int], translated_text: str) -> str:
+    """生成自我修正提示：一次调用完成评估与改进"""
+
+    # 构建上下文文本
+    context_text = parse_chunk([v for i,v in enumerate(context_chunk) if i not in main_indices])
+
+    main_text = parse_chunk([context_chunk[i] for i in main_indices])
+
+    # 计算需要输出的字幕条数
+    expected_count = len(main_indices)
+
+    return f"""请检查初译并输出最终译文，严格保持字幕条数不变。
+
+上下文参考（仅供理解语境，不是要翻译的原文）：
+{context_text}
+
+原文：
+{main_text}
+
+初译：
+{translated_text}
+
+【步骤】
+1. 对照原文检查初译，只关注明显错误：误译、漏译、语法错误、表达不自然、词句未翻译
+2. 在 critique 中用一两句话简要列出发现的问题；没有问题时写 "OK"
+3. 在 translation 中给出最终译文：有问题的条目按问题修改，没有问题的条目保持初译不变
+
+【重要】格式要求：
+1. translation 必须包含 {expected_count} 条字幕
+2. 绝对不能丢失、合并或跳过任何条目
+3. 歌词部分请直接翻译，不要用星号或其他符号替代
+4. 只翻译原文，上下文只作为参考，绝对不要翻译
+
+输出格式（严格的 JSON 对象）：
+{{"critique": "问题说明或 OK", "translation": ["第1条翻译", "第2条翻译"]}}
+如果某条字幕需要多行显示，使用 \\n 分隔，如："第一行\\n第二行"
+"""
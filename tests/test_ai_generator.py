@@ -0,0 +1,61 @@
+# tests/test_ai_generator.py - 术语表生成中不调用模型的步骤
+
+from service.glossary import ai_generator
+from utils import estimate_tokens
+
+
+def _cost(term, contexts):
+    """build_term_batches 中每条术语的 token 开销"""
+    return estimate_tokens(term) + estimate_tokens(ai_generator.select_best_context(contexts.get(term, []))) + 10
+
+
+def test_term_batches_respect_token_budget():
+    terms = [f"Term{i}" for i in range(20)]
+    contexts = {term: [f"{term} appears in this line of dialogue."] for term in terms}
+    budget = 3 * _cost(terms[0], contexts)
+    batches = ai_generator.build_term_batches(terms, contexts, budget)
+    assert [term for batch in batches for term in batch] == terms
+    assert all(sum(_cost(term, contexts) for term in batch) <= budget for batch in batches)
+    assert [len(batch) for batch in batches] == [3] * 6 + [2]
+
+
+def test_term_batches_short_terms_fit_one_call_and_oversized_term_gets_own_batch():
+    assert ai_generator.build_term_batches(["Alpha", "Beta", "Gamma"], {}, 1500) == [["Alpha", "Beta", "Gamma"]]
+    # 上下文超出预算的术语单独成批，不会被丢弃，也不会带上其它术语
+    contexts = {"Long": ["word " * 200]}
+    assert ai_generator.build_term_batches(["Alpha", "Long", "Beta"], contexts, 60) == [["Alpha"], ["Long"], ["Beta"]]
+    assert ai_generator.build_term_batches([], {}, 100) == []
+
+
+def test_chunks_end_on_line_boundaries():
+    lines = ["line one is here", "line two is here", "line three", "four"]
+    config = ai_generator.ExtractionConfig(chunk_size=30)
+    chunks = ai_generator.split_text_into_chunks("\n".join(lines[:2]) + "\n\n" + "\n".join(lines[2:]), config)
+    assert chunks == ["line one is here", "line two is here\nline three", "four"]
+    # 每个片段都由完整的行组成，空行被跳过，行不重复也不丢失
+    assert [line for chunk in chunks for line in chunk.split("\n")] == lines
+    assert all(len(chunk) <= config.chunk_size for chunk in chunks)
+
+
+def test_overlong_line_and_overlap():
+    config = ai_generator.ExtractionConfig(chunk_size=30)
+    # 超过片段大小的单行不会被截断
+    assert ai_generator.split_text_into_chunks("x" * 50 + "\nshort", config) == ["x" * 50, "short"]
+    assert ai_generator.split_text_into_chunks("short text", config) == ["short text"]
+
+    config = ai_generator.ExtractionConfig(chunk_size=30, chunk_overlap=12)
+    chunks = ai_generator.split_text_into_chunks("line one is here\nline two is here\nline three\nfour", config)
+    # 下一片段以上一片段末尾的整行开头
+    assert chunks == ["line one is here", "line two is here\nline three", "line three\nfour"]
+
+
+def test_workers_capped_by_free_vram(tmp_path, monkeypatch):
+    model = tmp_path / "model.gguf"
+    model.write_bytes(b"\0" * 1024 ** 2)  # 1 MB，加上预留约 1.2 MB 一份
+    monkeypatch.setattr(ai_generator, "get_gpu_info", lambda: {"memory_free": 3})
+    assert ai_generator._affordable_workers(str(model), -1, 8) == 3
+    assert ai_generator._affordable_workers(str(model), -1, 2) == 2
+    # 纯 CPU 推理不受显存限制；无法获取显存信息时只保留一个 worker
+    assert ai_generator._affordable_workers(str(model), 0, 8) == 8
+    monkeypatch.setattr(ai_generator, "get_gpu_info", lambda: None)
+    assert ai_generator._affordable_workers(str(model), -1, 8) == 1
@@ -0,0 +1,30 @@
+# tests/test_ass_format.py - ASS 正文中间的覆盖标签以占位符参与翻译并在输出时还原
+
+from service.subtitle import formats
+
+ASS = """[Script Info]
+Title: test
+
+[Events]
+Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
+Dialogue: 0,0:00:01.00,0:00:02.00,Default,,0,0,0,,{\\an8}I {\\i1}really{\\i0} mean it
+Dialogue: 0,0:00:03.00,0:00:04.00,Default,,0,0,0,,No tags here
+"""
+
+
+def test_inline_override_tags_survive_translation():
+    document = formats.parse_document(ASS, ".ass")
+    assert [s.text for s in document.subtitles] == ["I {1}really{2} mean it", "No tags here"]
+
+    translated = [document.subtitles[0].with_text("我{1}真的{2}是认真的"),
+                  document.subtitles[1].with_text("这里没有标签")]
+    lines = formats.render_document(document, translated, "output.ass").splitlines()
+    assert lines[-2].endswith(",,{\\an8}我{\\i1}真的{\\i0}是认真的")
+    assert lines[-1].endswith(",,这里没有标签")
+
+
+def test_lost_or_repeated_placeholders_are_dropped():
+    document = formats.parse_document(ASS, ".ass")
+    translated = [document.subtitles[0].with_text("我{1}真的{1}是认真的{7}"), document.subtitles[1]]
+    lines = formats.render_document(document, translated, "output.ass").splitlines()
+    assert lines[-2].endswith(",,{\\an8}我{\\i1}真的是认真的")
@@ -0,0 +1,42 @@
+# tests/test_classifier.py - 字幕分类：只有明确为目标语言的行才跳过翻译
+
+from service.subtitle import Subtitle
+from service.translator import classifier, langid
+
+
+def _subtitles(texts):
+    return [Subtitle(str(i + 1), "00:00:01,000 --> 00:00:02,000", text, 1000, 2000)
+            for i, text in enumerate(texts)]
+
+
+def test_ja_to_zh_keeps_kanji_only_lines():
+    texts = ["先生", "東京時間", "外国人", "来週", "ありがとう"]
+    for target_iso in ("zh-CN", "zh-TW"):
+        result = classifier.classify_subtitles(_subtitles(texts), target_iso)
+        assert result.counts[classifier.TARGET_LANGUAGE] == 0
+        assert [s.text for s in result.pending] == texts
+
+
+def test_unambiguous_target_language_is_skipped():
+    texts = ["这个是我们的 OK", "Hello there, how are you?", "♪ ♪", "[applause]", "12:30"]
+    result = classifier.classify_subtitles(_subtitles(texts), "zh-CN")
+    assert result.counts[classifier.TARGET_LANGUAGE] == 1
+    assert [s.text for s in result.pending] == ["Hello there, how are you?"]
+    assert result.merge([s.with_text("你好") for s in result.pending])[3].text == "[掌声]"
+
+
+def test_undetermined_variant_is_not_target_language():
+    assert not classifier.is_target_language("zh", "zh-TW")
+    assert not classifier.is_target_language(langid.HAN_ONLY, "zh-CN")
+    assert classifier.is_target_language("zh-TW", "zh-TW")
+
+
+def test_chinese_lines_with_chinese_target_are_skipped():
+    texts = ["我们走吧", "这是什么", "Hello there, how are you?", "明天见"]
+    result = classifier.classify_subtitles(_subtitles(texts), "zh-CN")
+    assert result.counts[classifier.TARGET_LANGUAGE] == 3
+    assert [s.text for s in result.pending] == ["Hello there, how are you?"]
+    # 按行识别时只含汉字的行无法确定，按文件识别后才确定为中文
+    languages = langid.detect_file(texts)
+    assert classifier.classify_line("我们走吧", "zh-CN", languages[0]) == classifier.TARGET_LANGUAGE
+    assert classifier.classify_line("我们走吧", "zh-CN", langid.detect_language("我们走吧")) == classifier.DIALOGUE
@@ -0,0 +1,55 @@
+# tests/test_confidence.py - 译文块置信度：各项信号与阈值
+
+import math
+
+from service.translator import confidence
+
+
+def test_clean_chunk_scores_one():
+    result = confidence.score_chunk(
+        ["Where are you going tonight?", "I will meet my brother."],
+        ["你今晚要去哪里？", "我要去见我哥哥。"], "zh-CN")
+    assert result.score == 1.0
+    assert set(result.signals) == {"lines", "length", "script"}
+
+
+def test_missing_lines_score_zero():
+    result = confidence.score_chunk(["First line here.", "Second line here."], ["第一行"], "zh-CN")
+    assert result.signals["lines"] == 0.0
+    assert result.score == 0.0
+
+
+def test_length_ratio_outside_range_lowers_score():
+    source = "This is a fairly long sentence with many words here"
+    assert confidence.length_score(source, "好") < 1.0
+    assert confidence.length_score(source, "这是一个相当长的句子，里面有很多词") == 1.0
+    assert confidence.length_score(source, " ".join(["word"] * 100)) == confidence.MAX_LENGTH_RATIO / 10
+    # 原文过短时不按长度比判断
+    assert confidence.length_score("Oh.", "哦哦哦哦哦哦哦哦哦哦哦哦哦哦哦哦哦哦哦哦") == 1.0
+
+
+def test_untranslated_line_scores_zero():
+    sources = ["Where are you going tonight?"]
+    assert confidence.score_chunk(sources, ["Where are you going tonight?"], "zh-CN").signals["script"] == 0.0
+    assert confidence.score_chunk(sources, ["Where are you going now?"], "zh-CN").signals["script"] == 0.0
+    # 人名等短句原样保留是正常的
+    assert confidence.score_chunk(["John"], ["John"], "zh-CN").signals["script"] == 1.0
+
+
+def test_glossary_miss_and_logprob_signals():
+    terms = {"Hogwarts": "霍格沃茨"}
+    hit = confidence.score_chunk(["Welcome to Hogwarts, everyone."], ["欢迎来到霍格沃茨，各位。"], "zh-CN", terms)
+    miss = confidence.score_chunk(["Welcome to Hogwarts, everyone."], ["欢迎来到魔法学校，各位。"], "zh-CN", terms)
+    assert hit.signals["glossary"] == 1.0
+    assert miss.signals["glossary"] == confidence.GLOSSARY_MISS_SCORE
+    assert miss.score == confidence.GLOSSARY_MISS_SCORE
+
+    result = confidence.score_chunk(["Welcome, everyone."], ["欢迎各位。"], "zh-CN", logprob=math.log(0.5))
+    assert math.isclose(result.signals["logprob"], 0.5)
+    assert math.isclose(result.score, 0.5)
+
+
+def test_mean_logprob():
+    response = {"choices": [{"logprobs": {"content": [{"logprob": -1.0}, {"logprob": -3.0}]}}]}
+    assert confidence.mean_logprob(response) == -2.0
+    assert confidence.mean_logprob({"choices": [{"logprobs": None}]}) is None
@@ -0,0 +1,36 @@
+# tests/test_dedup.py - 翻译前合并重复字幕，翻译后按原顺序展开
+
+import pytest
+
+from service.subtitle import Subtitle
+from service.translator import dedup
+
+
+def _subtitles(texts):
+    return [Subtitle(str(i + 1), f"00:00:0{i},000 --> 00:00:0{i + 1},000", text, i * 1000, (i + 1) * 1000)
+            for i, text in enumerate(texts)]
+
+
+def test_duplicates_translate_once_and_expand_in_order():
+    subtitles = _subtitles(["Hello", "Bye", "  Hello ", "Hello\tthere", "Bye", "Hello  there"])
+    plan = dedup.deduplicate(subtitles)
+    assert [s.text for s in plan.unique] == ["Hello", "Bye", "Hello\tthere"]
+    assert plan.mapping == [0, 1, 0, 2, 1, 2]
+    assert plan.skipped == 3
+
+    expanded = plan.expand([s.with_text(f"译{i}") for i, s in enumerate(plan.unique)])
+    assert [s.text for s in expanded] == ["译0", "译1", "译0", "译2", "译1", "译2"]
+    # 序号与时间轴保持各自的原值
+    assert [(s.id, s.start_ms) for s in expanded] == [(s.id, s.start_ms) for s in subtitles]
+
+
+def test_line_breaks_are_part_of_the_key():
+    plan = dedup.deduplicate(_subtitles(["Hello\nworld", "Hello world", "Hello \nworld "]))
+    assert [s.text for s in plan.unique] == ["Hello\nworld", "Hello world"]
+    assert plan.mapping == [0, 1, 0]
+
+
+def test_expand_rejects_wrong_count():
+    plan = dedup.deduplicate(_subtitles(["A line", "Another line"]))
+    with pytest.raises(ValueError):
+        plan.expand(plan.unique[:1])
@@ -0,0 +1,51 @@
+# tests/test_glossary_cache.py - 术语表按内容区分，片段结果缓存有上限
+
+import json
+
+import utils
+from service import glossary
+from service.glossary import cache
+
+
+def test_same_name_different_content_gets_own_glossary(tmp_path):
+    first = tmp_path / "a" / "episode.srt"
+    second = tmp_path / "b" / "episode.srt"
+    first.parent.mkdir()
+    second.parent.mkdir()
+    first.write_text("1\n00:00:01,000 --> 00:00:02,000\nHello\n", encoding="utf-8")
+    second.write_text("1\n00:00:01,000 --> 00:00:02,000\nGoodbye\n", encoding="utf-8")
+    assert glossary.to_glossary_filename(str(first)) != glossary.to_glossary_filename(str(second))
+
+    second.write_text(first.read_text(encoding="utf-8"), encoding="utf-8")
+    assert glossary.to_glossary_filename(str(first)) == glossary.to_glossary_filename(str(second))
+
+
+def test_legacy_name_only_glossary_is_migrated(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(glossary, "glossary", {})
+    video = tmp_path / "episode.srt"
+    video.write_text("1\n00:00:01,000 --> 00:00:02,000\nHello\n", encoding="utf-8")
+    legacy = tmp_path / "cache" / utils.string_to_base64("episode.srt")
+    legacy.parent.mkdir()
+    legacy.write_text(json.dumps({"Hogwarts": "霍格沃茨"}), encoding="utf-8")
+
+    filename = glossary.to_glossary_filename(str(video))
+    glossary.load_glossary(filename)
+    assert glossary.get_terms() == {"Hogwarts": "霍格沃茨"}
+    assert not legacy.exists()
+    assert (tmp_path / "cache" / filename).exists()
+
+
+def test_chunk_cache_keeps_most_recently_used(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache, "CACHE_DIR", tmp_path)
+    monkeypatch.setattr(cache, "CHUNK_CACHE_MAX_ENTRIES", 3)
+    results = cache.ChunkResultCache("model.gguf", "config")
+    for i in range(3):
+        results.put(f"chunk {i}", None, [f"term {i}"])
+    assert results.get("chunk 0") == ["term 0"]
+    results.put("chunk 3", None, ["term 3"])
+    results.save()
+
+    reloaded = cache.ChunkResultCache("model.gguf", "config")
+    assert reloaded.get("chunk 1") is None
+    assert [reloaded.get(f"chunk {i}") for i in (0, 2, 3)] == [["term 0"], ["term 2"], ["term 3"]]
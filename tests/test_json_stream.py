@@ -0,0 +1,31 @@
+# tests/test_json_stream.py - 流式 JSON 解析：达到预期条数后多出的元素要被记录下来
+
+from utils.json_stream import JsonStreamParser
+
+
+def _feed(chunks, expected_items):
+    parser = JsonStreamParser(expected_items)
+    for chunk in chunks:
+        if parser.feed(chunk):
+            break
+    return parser
+
+
+def test_exact_count_completes_normally():
+    parser = _feed(['["a", ', '"b"', ']'], 2)
+    assert parser.done and not parser.extra_items
+    assert parser.text == '["a", "b"]'
+
+
+def test_extra_items_are_recorded():
+    for chunks in (['["a", "b"', ', "c"]'], ['[1, 2', ', 3]'], ['[[1], [2]', ', [3]]']):
+        parser = _feed(chunks, 2)
+        assert parser.done and parser.extra_items
+        assert parser.items == 2
+        assert parser.text.endswith("]") and parser.text.count(",") == 1
+
+
+def test_output_ending_at_expected_count_is_closed():
+    parser = _feed(['["a", "b"'], 2)
+    assert not parser.extra_items
+    assert parser.text == '["a", "b"]'
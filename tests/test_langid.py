@@ -0,0 +1,41 @@
+# tests/test_langid.py - 本地语言识别：只含汉字的日文不能判定为中文
+
+from service.translator import langid
+
+# 只用汉字书写的日文台词，其中含有简繁体特有字（国、来、東、時、間）
+KANJI_ONLY_JAPANESE = ["先生", "東京時間", "外国人", "来週", "本当"]
+
+# 纯简体中文文件：每一行都只含汉字
+SIMPLIFIED_CHINESE_FILE = ["我们走吧", "这是什么", "你说得对", "明天见", "谢谢你"]
+
+
+def test_han_only_text_is_undetermined():
+    for text in KANJI_ONLY_JAPANESE:
+        assert langid.detect_language(text) == langid.HAN_ONLY
+
+
+def test_kana_and_mixed_chinese_are_detected():
+    assert langid.detect_language("先生、ありがとう") == "ja"
+    assert langid.detect_language("这个是我们的 OK") == "zh-CN"
+    assert langid.detect_language("這個是我們的 OK") == "zh-TW"
+
+
+def test_han_only_lines_do_not_count_as_target_language():
+    languages = langid.detect_lines(KANJI_ONLY_JAPANESE)
+    assert langid.target_language_ratio(languages, "zh-CN") == 0.0
+    assert not langid.is_file_in_language(languages, "zh-TW")
+
+
+def test_chinese_file_without_kana_is_chinese():
+    assert set(langid.detect_lines(SIMPLIFIED_CHINESE_FILE)) == {langid.HAN_ONLY}
+    languages = langid.detect_file(SIMPLIFIED_CHINESE_FILE)
+    assert languages == ["zh-CN"] * len(SIMPLIFIED_CHINESE_FILE)
+    assert langid.is_file_in_language(languages, "zh-CN")
+    assert not langid.is_file_in_language(languages, "zh-TW")
+
+
+def test_han_only_lines_stay_undetermined_in_japanese_file():
+    texts = KANJI_ONLY_JAPANESE + ["ありがとう"]
+    assert langid.detect_file(texts)[:-1] == [langid.HAN_ONLY] * len(KANJI_ONLY_JAPANESE)
+    # 指定源语言为日文时，即使全文没有假名也不按中文处理
+    assert langid.detect_file(KANJI_ONLY_JAPANESE, "ja") == [langid.HAN_ONLY] * len(KANJI_ONLY_JAPANESE)
@@ -0,0 +1,28 @@
+# tests/test_llm_utils.py - 改进建议的解析：合规、格式错误与截断的输出
+
+from utils.llm_utils import parse_recommendation
+
+
+def test_ok_and_empty_mean_no_issues():
+    for response in ("OK", "ok.", " OK\n", "", "<think>looks fine</think>OK"):
+        assert parse_recommendation(response) == []
+
+
+def test_issue_list_is_parsed():
+    assert parse_recommendation("- 语气生硬\n- 漏译第二条\n") == ["语气生硬", "漏译第二条"]
+    # 未遵循 Grammar 的编号列表与空行
+    assert parse_recommendation("1. foo\n2) bar\n\n• baz") == ["foo", "bar", "baz"]
+
+
+def test_issue_count_is_capped():
+    response = "\n".join(f"- issue {i}" for i in range(8))
+    assert parse_recommendation(response) == [f"issue {i}" for i in range(5)]
+    assert parse_recommendation(response, max_issues=2) == ["issue 0", "issue 1"]
+
+
+def test_partial_and_malformed_output():
+    # 达到 max_tokens 被截断的最后一条仍保留
+    assert parse_recommendation("- 第一条\n- 第二条没写") == ["第一条", "第二条没写"]
+    # 思考标签未闭合、只有思考过程时没有可用的建议
+    assert parse_recommendation("<think>the second line seems") == []
+    assert parse_recommendation("Step 1: analyze the translation") == []
@@ -0,0 +1,47 @@
+# tests/test_progress.py - 翻译进度事件：块序号、完成条数、生成速度与剩余时间
+
+from service.translator.progress import ProgressTracker, format_duration
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_events_track_chunks_speed_and_eta():
+    events = []
+    clock = _Clock()
+    tracker = ProgressTracker(2, 10, events.append, clock=clock)
+
+    tracker.start_chunk(1)
+    clock.now = 2.0
+    tracker.stream_progress(3, 40)
+    tracker.stream_progress(5, 60)
+    tracker.finish_chunk(5)
+    tracker.start_chunk(2)
+    clock.now = 4.0
+    tracker.finish_chunk(5)
+
+    assert len(events) == 6
+    assert [e.chunk_index for e in events] == [1, 1, 1, 1, 2, 2]
+    assert [e.subtitles_done for e in events] == [0, 3, 5, 5, 5, 10]
+    assert events[0].eta_seconds is None
+    assert events[1].tokens_per_second == 20.0
+    assert events[3].eta_seconds == 2.0        # 5 条用时 2 秒，剩余 5 条
+    assert events[-1].fraction == 1.0 and events[-1].eta_seconds == 0.0
+
+
+def test_done_never_exceeds_total():
+    events = []
+    tracker = ProgressTracker(1, 3, events.append, clock=_Clock())
+    tracker.stream_progress(5, 10)
+    assert events[-1].subtitles_done == 3
+
+
+def test_format_duration():
+    assert format_duration(None) == "--:--"
+    assert format_duration(65) == "01:05"
+    assert format_duration(3725) == "1:02:05"
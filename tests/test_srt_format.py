@@ -0,0 +1,47 @@
+# tests/test_srt_format.py - 单遍 SRT 解析的边界情况
+
+from service.subtitle.srt_format import format_srt, iter_srt, parse_srt
+
+
+def _fields(content):
+    return [(s.id, s.time_code, s.text, s.start_ms, s.end_ms) for s in parse_srt(content)]
+
+
+def test_crlf_and_bom():
+    content = "﻿1\r\n00:00:01,000 --> 00:00:02,000\r\nHello\r\n\r\n2\r\n00:00:03,000 --> 00:00:04,500\r\nWorld\r\n"
+    assert _fields(content) == [
+        ("1", "00:00:01,000 --> 00:00:02,000", "Hello", 1000, 2000),
+        ("2", "00:00:03,000 --> 00:00:04,500", "World", 3000, 4500),
+    ]
+    # 行迭代器（如文件对象）保留行尾的 \r\n
+    lines = ["﻿1\r\n", "00:00:01,000 --> 00:00:02,000\r\n", "Hi\r\n"]
+    assert [s.text for s in iter_srt(lines)] == ["Hi"]
+
+
+def test_whitespace_only_separator_lines():
+    content = "1\n00:00:01,000 --> 00:00:02,000\nHello\n \t\n\n2\n00:00:03,000 --> 00:00:04,000\nWorld"
+    assert [s.text for s in parse_srt(content)] == ["Hello", "World"]
+
+
+def test_missing_blank_line_between_blocks():
+    content = "1\n00:00:01,000 --> 00:00:02,000\nHello\n2\n00:00:03,000 --> 00:00:04,000\nWorld"
+    assert [(s.id, s.text) for s in parse_srt(content)] == [("1", "Hello"), ("2", "World")]
+
+
+def test_numeric_text_lines_stay_text():
+    content = "1\n00:00:01,000 --> 00:00:02,000\n2024\nis the year\n\n2\n00:00:03,000 --> 00:00:04,000\n42"
+    assert [(s.id, s.text) for s in parse_srt(content)] == [("1", "2024\nis the year"), ("2", "42")]
+
+
+def test_empty_cue_and_missing_ids():
+    content = "1\n00:00:01,000 --> 00:00:02,000\n\n2\n00:00:03,000 --> 00:00:04,000\nWorld"
+    assert [(s.id, s.text) for s in parse_srt(content)] == [("1", ""), ("2", "World")]
+    content = "00:00:01,000 --> 00:00:02,000\nHello\n\n00:00:03,000 --> 00:00:04,000\nWorld"
+    assert [(s.id, s.text) for s in parse_srt(content)] == [("1", "Hello"), ("2", "World")]
+
+
+def test_coordinates_after_time_code_are_kept():
+    time_code = "00:00:01,000 --> 00:00:02,000 X1:100 X2:200 Y1:10 Y2:20"
+    subtitles = parse_srt(f"1\n{time_code}\nHello")
+    assert _fields(f"1\n{time_code}\nHello") == [("1", time_code, "Hello", 1000, 2000)]
+    assert format_srt(subtitles) == f"1\n{time_code}\nHello"
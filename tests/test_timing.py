@@ -0,0 +1,42 @@
+# tests/test_timing.py - 阶段计时：汇总、嵌套与 Chrome Trace JSON
+
+import json
+
+from utils import timing
+
+
+def test_spans_are_summarized_and_nested(tmp_path):
+    timeline = timing.start_timeline()
+    try:
+        with timing.span("translate", chunk=1):
+            timing.add_tokens(100, 20)
+            with timing.span("review", chunk=1) as inner:
+                timing.add_tokens(50, 10)
+                assert inner.parent.name == "translate"
+        with timing.span("translate", chunk=2):
+            timing.add_tokens(80, 15)
+    finally:
+        timing.finish_timeline()
+
+    translate = timeline.stages["translate"]
+    assert (translate.calls, translate.prompt_tokens, translate.completion_tokens) == (2, 180, 35)
+    assert timeline.stages["review"].completion_tokens == 10
+
+    path = tmp_path / "trace.json"
+    timeline.write_json(str(path), model="test.gguf")
+    trace = json.loads(path.read_text(encoding="utf-8"))
+    assert trace["model"] == "test.gguf"
+    events = trace["traceEvents"]
+    assert [(e["name"], e["args"]["chunk"]) for e in events] == [("translate", 1), ("review", 1), ("translate", 2)]
+    outer, inner, _ = events
+    # 嵌套的 span 在同一线程，时间范围落在外层之内
+    assert inner["tid"] == outer["tid"] and all(e["ph"] == "X" for e in events)
+    assert outer["ts"] <= inner["ts"] and inner["ts"] + inner["dur"] <= outer["ts"] + outer["dur"]
+    assert trace["stages"]["translate"]["calls"] == 2
+
+
+def test_span_without_timeline_is_noop():
+    assert timing.current_timeline() is None
+    with timing.span("translate") as current:
+        timing.add_tokens(10, 10)
+    assert current is None
@@ -0,0 +1,44 @@
+# tests/test_usage.py - 模型调用用量：按调用类型汇总 token 数
+
+from utils import usage
+
+
+class _FakeLlm:
+    """没有 llama.cpp 上下文的模型，n_tokens 为提示词与生成 token 之和"""
+    n_tokens = 0
+
+
+def _call(call_type, prompt_tokens, completion_tokens):
+    llm = _FakeLlm()
+    llm.n_tokens = prompt_tokens + completion_tokens
+    meter = usage.CallMeter(llm, call_type)
+    meter.first_token()
+    return meter.finish(completion_tokens)
+
+
+def test_tokens_are_totalled_per_call_type():
+    usage.reset_stats()
+    _call(usage.TRANSLATE, 100, 30)
+    _call(usage.TRANSLATE, 120, 40)
+    _call(usage.REVIEW, 200, 25)
+    _call(None, 5, 1)
+
+    stats = usage.get_stats()
+    translate = stats.calls[usage.TRANSLATE]
+    assert (translate.calls, translate.prompt_tokens, translate.completion_tokens) == (2, 220, 70)
+    assert stats.calls[usage.REVIEW].prompt_tokens == 200
+    assert stats.calls[usage.OTHER].calls == 1
+    total = stats.total()
+    assert (total.calls, total.prompt_tokens, total.completion_tokens) == (4, 425, 96)
+    assert set(stats.to_dict()) == {usage.TRANSLATE, usage.REVIEW, usage.OTHER}
+    usage.reset_stats()
+    assert not usage.get_stats().calls
+
+
+def test_explicit_prompt_tokens_override_context_count():
+    usage.reset_stats()
+    meter = usage.CallMeter(_FakeLlm(), usage.GLOSSARY_EXTRACT)
+    result = meter.finish(12, prompt_tokens=300)
+    assert (result.prompt_tokens, result.completion_tokens) == (300, 12)
+    assert result.generation_seconds >= 0 and result.wall_seconds >= result.prompt_seconds
+    usage.reset_stats()
@@ -0,0 +1,24 @@
+# tests/test_vtt_format.py - WebVTT 正文中间的标签以占位符参与翻译并在输出时还原
+
+from service.subtitle import formats
+
+VTT = """WEBVTT
+
+00:00:01.000 --> 00:00:02.000 align:start
+<v Anna>I <i>really</i> mean <c.loud>it</c> &amp; more
+
+00:00:03.000 --> 00:00:04.000
+<b>Bold line</b>
+"""
+
+
+def test_inline_tags_survive_round_trip():
+    document = formats.parse_document(VTT, ".vtt")
+    assert [s.text for s in document.subtitles] == ["I {1}really{2} mean {3}it{4} & more", "Bold line"]
+    assert formats.render_document(document, document.subtitles, "output.vtt") == VTT
+
+    translated = [document.subtitles[0].with_text("我{1}真的{2}是认真的{3}这个{4}，还有"),
+                  document.subtitles[1].with_text("粗体")]
+    lines = formats.render_document(document, translated, "output.vtt").splitlines()
+    assert lines[3] == "<v Anna>我<i>真的</i>是认真的<c.loud>这个</c>，还有"
+    assert lines[6] == "<b>粗体</b>"
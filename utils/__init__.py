@@ -6,8 +6,12 @@ import base64
 from defs import FileType, get_supported_subtitle_types, get_supported_video_types
 import chardet
 from . import settings
-from .llm_utils import strip_thinking, extract_quoted_strings, extract_markdown_list_terms
-from .grammars import JSON_STRING_ARRAY, JSON_STRING_OBJECT, json_array_to_subtitle_format
+from . import model_profile
+from . import timing
+from . import usage
+from .json_stream import JsonStreamParser, stream_json_completion
+from .llm_utils import strip_thinking, extract_quoted_strings, extract_markdown_list_terms, estimate_tokens, parse_recommendation
+from .grammars import JSON_STRING_ARRAY, JSON_STRING_OBJECT, JSON_CRITIQUE_TRANSLATION, RECOMMENDATION_LIST, RECOMMENDATION_STOP, json_array_to_subtitle_format
 
 def get_gpu_info():
     """获取GPU信息"""
@@ -125,7 +129,7 @@ def get_file_type(file_path):
 def safe_read_file(file_path) -> str:
     """自动检测编码并读取文件"""
     # 先检测编码
-    with open(file_path, 'rb') as f:
+    with open(file_path, 'rb') as f, timing.span("detect_encoding"):
         raw_data = f.read()
         result = chardet.detect(raw_data)
         encoding = result['encoding']
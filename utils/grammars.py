@@ -36,19 +36,52 @@ char ::= [^"\\\n] | "\\" (["\\/bfnrt] | "u" [0-9a-fA-F] [0-9a-fA-F] [0-9a-fA-F]
 ws ::= [ \n\t]*
 """
 
+# ── 自我修正 Grammar ─────────────────────────────────────────────────
+# 输出格式: {"critique": "问题说明", "translation": ["译1", "译2"]}
+#
+# 先写出对初译的评估，再给出最终译文，一次调用完成“评估 + 改进”
+#
+# 用于:
+#   - 字幕自我修正 (self_correct_translation)
+#
+JSON_CRITIQUE_TRANSLATION = r"""
+root ::= "{" ws "\"critique\"" ws ":" ws string ws "," ws "\"translation\"" ws ":" ws arr ws "}"
+arr  ::= "[" ws (string (ws "," ws string)*)? ws "]"
+string ::= "\"" char* "\""
+char ::= [^"\\\n] | "\\" (["\\/bfnrt] | "u" [0-9a-fA-F] [0-9a-fA-F] [0-9a-fA-F] [0-9a-fA-F])
+ws ::= [ \n\t]*
+"""
+
+# ── 改进建议 Grammar ─────────────────────────────────────────────────
+# 输出格式: OK
+#       或: - 问题1\n- 问题2\n（最多 5 条，每条一行）
+#
+# 没有问题时只输出 OK，调用方据此跳过改进翻译；问题条数有上限，配合较小的 max_tokens 限制反思耗时
+#
+# 用于:
+#   - 改进建议 (ask_for_recommendation)
+#
+RECOMMENDATION_LIST = r"""
+root  ::= "OK" | issue issue? issue? issue? issue?
+issue ::= "- " [^\n]+ "\n"
+"""
+
+# 模型未遵循 Grammar 时的兜底：合规输出中不会出现空行
+RECOMMENDATION_STOP = ["\n\n"]
+
 
 # ── JSON 数组 → 字幕 [[N]] 格式转换 ──────────────────────────────────
 
 def json_array_to_subtitle_format(
     json_str: str,
-    full_context: List[Dict[str, Any]],
+    full_context: List[Any],
     main_indices: List[int]
 ) -> str:
     """将 JSON 字符串数组转换为 [[N]] 格式的字幕文本。
 
     Args:
         json_str:   LLM 输出的 JSON 字符串数组，如 '["译1","译2\\n多行"]'
-        full_context: 完整的上下文字幕列表
+        full_context: 完整的上下文字幕列表（Subtitle 记录）
         main_indices: 需要翻译的字幕在 full_context 中的索引
 
     Returns:
@@ -67,7 +100,7 @@ def json_array_to_subtitle_format(
     for i, translation in enumerate(translations):
         if i >= len(main_indices):
             break
-        subtitle_id = full_context[main_indices[i]]['id']
+        subtitle_id = full_context[main_indices[i]].id
         result.append(f"[[{subtitle_id}]]")
         result.append(str(translation))
 
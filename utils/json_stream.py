@@ -0,0 +1,173 @@
+# utils/json_stream.py - 流式生成 + 增量 JSON 解析，JSON 完整后立即停止生成
+
+from typing import Any, Callable, Dict, List, Optional
+
+from . import model_profile, usage
+
+
+class JsonStreamParser:
+    """增量 JSON 解析器
+
+    逐段喂入模型输出，跟踪括号深度与字符串状态：
+    - 顶层数组/对象闭合时 done 为 True
+    - 顶层为数组且已完成 expected_items 个元素后，下一个非空白字符为 "]" 时正常完成；
+      为其它字符（即模型还在输出更多元素）时立即停止，extra_items 为 True，text 自动补上 "]"
+    顶层值之前的文本（如残留的思考过程）会被跳过，之后的文本会被丢弃。
+    """
+
+    def __init__(self, expected_items: Optional[int] = None):
+        self.expected_items = expected_items
+        self.items = 0              # 顶层数组中已完成的元素个数
+        self.done = False
+        self.extra_items = False    # 模型输出的元素多于 expected_items（多出的元素已被丢弃）
+        self._buffer: List[str] = []
+        self._length = 0
+        self._start = -1            # 顶层值的起始位置
+        self._end = -1              # 顶层值的结束位置（不含）
+        self._top = ""
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._scalar = False        # 顶层数组中是否有未结束的数字/true/false/null 元素
+        self._truncated = False     # 因多出元素而提前结束
+        self._awaiting_end = False  # 已完成 expected_items 个元素，等待数组闭合
+
+    def feed(self, text: str) -> bool:
+        """喂入一段输出，返回是否已完成"""
+        if self.done:
+            return True
+        offset = self._length
+        self._buffer.append(text)
+        self._length += len(text)
+        for i, ch in enumerate(text):
+            pos = offset + i
+            if self._start == -1:
+                if ch in "[{":
+                    self._start = pos
+                    self._top = ch
+                    self._depth = 1
+                continue
+            if self._awaiting_end and ch != "]" and not ch.isspace():
+                self._stop_extra()
+                break
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._top == "[":
+                        self._item_completed(pos + 1)
+            elif ch == '"':
+                self._in_string = True
+            elif ch in "[{":
+                self._depth += 1
+            elif ch in "]}":
+                self._finish_scalar(pos)
+                if self.done:
+                    break
+                self._depth -= 1
+                if self._depth == 0:
+                    self._end = pos + 1
+                    self.done = True
+                elif self._depth == 1 and self._top == "[":
+                    self._item_completed(pos + 1)
+            elif self._depth == 1 and self._top == "[":
+                if ch == ",":
+                    self._finish_scalar(pos)
+                    if self._awaiting_end:
+                        self._stop_extra()
+                elif not ch.isspace():
+                    self._scalar = True
+            if self.done:
+                break
+        return self.done
+
+    def _finish_scalar(self, end: int) -> None:
+        if self._scalar and self._depth == 1:
+            self._scalar = False
+            self._item_completed(end)
+
+    def _item_completed(self, end: int) -> None:
+        """顶层数组完成一个元素，end 为元素结束位置（不含）"""
+        self.items += 1
+        if self.expected_items and self.items >= self.expected_items:
+            self._end = end
+            self._awaiting_end = True
+
+    def _stop_extra(self) -> None:
+        """已达到 expected_items 而模型仍在输出元素：丢弃多出的部分并结束"""
+        self.extra_items = True
+        self._truncated = True
+        self.done = True
+
+    @property
+    def text(self) -> str:
+        """目前为止的 JSON 文本；未找到顶层值时返回原始输出"""
+        raw = "".join(self._buffer)
+        if self._start == -1:
+            return raw
+        if not self.done:
+            if self._awaiting_end:
+                # 输出在数组闭合前结束（如达到 max_tokens），补上 "]"
+                return raw[self._start:self._end] + "]"
+            return raw[self._start:]
+        return raw[self._start:self._end] + ("]" if self._truncated else "")
+
+
+def stream_json_completion(
+    llm: Any,
+    expected_items: Optional[int] = None,
+    on_progress: Optional[Callable[[int, int], None]] = None,
+    call_type: Optional[str] = None,
+    **kwargs
+) -> Dict[str, Any]:
+    """以流式方式调用 create_chat_completion，JSON 完整后立即停止生成
+
+    expected_items 为顶层数组的预期元素个数，达到后数组未闭合即停止，并在返回值的 extra_items 中
+    标记模型输出了多于预期的元素（多出的元素被丢弃，调用方应据此送去 review）；on_progress(已完成元素数, 已生成 token 数)
+    在元素数增加时调用。返回与非流式调用相同结构的响应，content 为解析出的 JSON 文本，
+    usage.completion_tokens 为收到的流式分片数（每个分片对应一个 token）。
+    用量与耗时按 call_type 记入 utils.usage。
+    """
+    parser = JsonStreamParser(expected_items)
+    logprobs: List[Dict[str, Any]] = []
+    finish_reason = None
+    completion_tokens = 0
+    meter = usage.CallMeter(llm, call_type)
+    stream = model_profile.create_chat_completion(llm, stream=True, **kwargs)
+    try:
+        for chunk in stream:
+            choice = chunk["choices"][0]
+            finish_reason = choice.get("finish_reason") or finish_reason
+            logprobs.extend((choice.get("logprobs") or {}).get("content") or [])
+            content = choice.get("delta", {}).get("content")
+            if not content:
+                continue
+            meter.first_token()
+            completion_tokens += 1
+            items = parser.items
+            parser.feed(content)
+            if on_progress and parser.items != items:
+                on_progress(parser.items, completion_tokens)
+            if parser.done:
+                finish_reason = "stop"
+                break
+    finally:
+        # 关闭生成器即中止模型继续生成
+        close = getattr(stream, "close", None)
+        if close:
+            close()
+        meter.finish(completion_tokens)
+
+    return {
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": parser.text},
+            "finish_reason": finish_reason,
+            "logprobs": {"content": logprobs} if logprobs else None,
+        }],
+        "usage": {"completion_tokens": completion_tokens},
+        "extra_items": parser.extra_items,
+    }
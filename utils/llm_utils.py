@@ -7,76 +7,141 @@ from typing import List
 logger = logging.getLogger(__name__)
 
 
+# ── strip_thinking 预编译正则 ────────────────────────────────────────
+_THINKING_TAGS = ('think', 'thinking', 'reasoning', 'thought')
+_TAG_OPEN = {tag: re.compile(rf'<{tag}>', re.IGNORECASE) for tag in _THINKING_TAGS}
+_TAG_CLOSE = {tag: re.compile(rf'</{tag}>', re.IGNORECASE) for tag in _THINKING_TAGS}
+_PROCESS_START = re.compile(r'(?:Thinking\s*Process|Reasoning|思考过程|分析过程)[:：]', re.IGNORECASE)
+_PROCESS_END = re.compile(
+    r'(?:Output[:：]|Final\s*Answer[:：]|答案[:：]|请开始提取：|请输出|JSON\s*输出|输出格式[:：])\s*',
+    re.IGNORECASE)
+# 每行第一个非空白字符（等价于 MULTILINE 下 ^\s* 能到达的位置）
+_LINE_CONTENT = re.compile(r'^[^\S\n]*(?=\S)', re.MULTILINE)
+_THINKING_INDICATOR = re.compile('|'.join([
+    r'\d+\.\s*\*\*Analyze.*\*\*',       # 1. **Analyze...**
+    r'\d+\.\s*Analyze',                    # 1. Analyze
+    r'\*\*Thinking\s*Process\*\*',        # **Thinking Process**
+    r'Thinking\s*Process[:：]',            # Thinking Process:
+    r'Reasoning[:：]',                     # Reasoning:
+    r'Step\s*\d+[:：\.]',                  # Step 1:
+    r'Task[:：]',                          # Task:
+    r'Categories[:：]',                    # Categories:
+    r'\d+\.\s*(?:Analyze|Task|Step|Categories|Avoid|Quality|Output)',  # 编号列表项
+]), re.IGNORECASE)
+_TRAILING_NOTE = re.compile(r'(?:Note|注意|Reminder|提醒)[:：]', re.IGNORECASE)
+
+
+def _remove_tag_blocks(response: str, tag: str) -> str:
+    """等价于 re.sub(<tag>.*?</tag>)：开标签与其后最近的闭标签配对，一次扫描完成"""
+    opens = _TAG_OPEN[tag].finditer(response)
+    closes = _TAG_CLOSE[tag].finditer(response)
+    parts = []
+    pos = 0
+    close = None
+    for open_match in opens:
+        if open_match.start() < pos:
+            continue
+        while close is None or close.start() < open_match.end():
+            close = next(closes, None)
+            if close is None:
+                parts.append(response[pos:])
+                return "".join(parts)
+        parts.append(response[pos:open_match.start()])
+        pos = close.end()
+    parts.append(response[pos:])
+    return "".join(parts)
+
+
+def _remove_thinking_process(response: str) -> str:
+    """移除“思考过程: ... 输出:”段落；某段之后找不到终止标记时，其后的段落也不会有"""
+    parts = []
+    pos = 0
+    while True:
+        start = _PROCESS_START.search(response, pos)
+        if not start:
+            break
+        end = _PROCESS_END.search(response, start.end())
+        if not end:
+            break
+        parts.append(response[pos:start.start()])
+        pos = end.end()
+    parts.append(response[pos:])
+    return "".join(parts)
+
+
+def _starts_with_thinking(prefix: str) -> bool:
+    return any(
+        _THINKING_INDICATOR.match(prefix, line.end())
+        for line in _LINE_CONTENT.finditer(prefix)
+    )
+
+
+def _remove_trailing_note(response: str) -> str:
+    """截掉位于行首（前面的空白中含换行）的 Note:/注意: 等附注及其后的全部内容"""
+    for note in _TRAILING_NOTE.finditer(response):
+        i = note.start()
+        newline = -1
+        while i > 0 and response[i - 1].isspace():
+            i -= 1
+            if response[i] == "\n":
+                newline = i
+        if newline != -1:
+            return response[:newline]
+    return response
+
+
 def strip_thinking(response: str) -> str:
     """剥除 LLM 思考过程（Reasoning/Thinking 标签及内容），保留最终答案。
 
-    针对 Qwen / DeepSeek-R1 等模型输出超长思考过程且无明确终止标记的情况，
-    采用多级强制策略：
+    与 strip_thinking_reference 行为一致，正则预编译且每一步都只线性扫描一遍：
     1. 移除所有已知思考标签（<think>, <thinking>, <reasoning>, <thought>）
-    2. 若文本以思考段落开头，强制截断到第一个 JSON 标记（[ 或 {）
-    3. 若不含 JSON 标记但明显是思考过程，返回空字符串
+    2. 移除带终止标记的思考段落（Thinking Process: ... Output:）
+    3. 若文本以思考段落开头，强制截断到第一个 JSON 标记（[ 或 {）；不含 JSON 标记时返回空字符串
+    4. 清理末尾的附注
     """
     if not response:
         return ""
 
-    # 1. 移除各种思考标签（支持多行，大小写不敏感）
-    for tag in ['think', 'thinking', 'reasoning', 'thought']:
-        response = re.sub(
-            rf'<{tag}>.*?</{tag}>',
-            '', response, flags=re.DOTALL | re.IGNORECASE
-        )
-
-    # 2. 尝试基于终止标记的精确剥离（DeepSeek / Qwen 部分情况）
-    response = re.sub(
-        r'(?:Thinking\s*Process|Reasoning|思考过程|分析过程)[:：]\s*.*?'
-        r'(?:Output[:：]|Final\s*Answer[:：]|答案[:：]|请开始提取：|请输出|JSON\s*输出|输出格式[:：])\s*',
-        '',
-        response,
-        flags=re.DOTALL | re.IGNORECASE
-    )
-
-    # 3. 核心修复：若响应开头明显是思考过程（无论是否有终止标记），强制截断到第一个 JSON 标记
-    thinking_indicators = [
-        r'^\s*\d+\.\s*\*\*Analyze.*\*\*',       # 1. **Analyze...**
-        r'^\s*\d+\.\s*Analyze',                    # 1. Analyze
-        r'^\s*\*\*Thinking\s*Process\*\*',        # **Thinking Process**
-        r'^\s*Thinking\s*Process[:：]',            # Thinking Process:
-        r'^\s*Reasoning[:：]',                     # Reasoning:
-        r'^\s*Step\s*\d+[:：\.]',                  # Step 1:
-        r'^\s*Task[:：]',                          # Task:
-        r'^\s*Categories[:：]',                    # Categories:
-        r'^\s*\d+\.\s*(?:Analyze|Task|Step|Categories|Avoid|Quality|Output)',  # 编号列表项
-    ]
-
-    # 找到第一个 JSON 标记的位置
-    first_json = -1
-    for marker in ['[', '{']:
-        pos = response.find(marker)
-        if pos != -1 and (first_json == -1 or pos < first_json):
-            first_json = pos
+    for tag in _THINKING_TAGS:
+        response = _remove_tag_blocks(response, tag)
+    response = _remove_thinking_process(response)
 
-    # 如果开头匹配思考过程特征，强制截断到第一个 JSON 标记之前的内容
+    json_positions = [pos for pos in (response.find('['), response.find('{')) if pos != -1]
+    first_json = min(json_positions) if json_positions else -1
     prefix = response[:first_json] if first_json != -1 else response
-    is_thinking_start = any(
-        re.search(pattern, prefix, re.IGNORECASE | re.MULTILINE)
-        for pattern in thinking_indicators
-    )
-
-    if is_thinking_start and first_json != -1:
+    if _starts_with_thinking(prefix):
+        if first_json == -1:
+            logger.debug("响应仅为思考过程，不含 JSON 标记，返回空字符串")
+            return ""
         logger.debug(f"检测到思考过程前缀（{len(prefix)} 字符），强制截断到第一个 JSON 标记")
         response = response[first_json:]
-    elif is_thinking_start and first_json == -1:
-        # 明显是思考过程但不含任何 JSON 标记，安全丢弃
-        logger.debug("响应仅为思考过程，不含 JSON 标记，返回空字符串")
-        return ""
 
-    # 4. 二次兜底：若截断后仍残留思考特征（如末尾的分析总结），清理常见污染
-    response = re.sub(
-        r'\n\s*(?:Note[:：]|注意[:：]|Reminder[:：]|提醒[:：]).*$',
-        '', response, flags=re.DOTALL | re.IGNORECASE
-    )
+    return _remove_trailing_note(response).strip()
+
+
+_UNCLOSED_THINKING = re.compile(r'\s*<(?:%s)>' % '|'.join(_THINKING_TAGS), re.IGNORECASE)
+
+
+def parse_recommendation(response: str, max_issues: int = 5) -> List[str]:
+    """解析改进建议（见 grammars.RECOMMENDATION_LIST），返回问题列表；"OK" 或空响应返回空列表"""
+    response = strip_thinking(response)
+    if not response or re.fullmatch(r'(?i)\W*ok\W*', response):
+        return []
+    # 思考标签未闭合（输出在思考过程中被截断），没有可用的建议
+    if _UNCLOSED_THINKING.match(response):
+        return []
+    issues = []
+    for line in response.splitlines():
+        line = re.sub(r'^\s*(?:[-*•]|\d+[.)、])\s*', '', line).strip()
+        if line:
+            issues.append(line)
+    return issues[:max_issues]
+
 
-    return response.strip()
+def estimate_tokens(text: str) -> int:
+    """粗略估算文本的 token 数量：中日韩字符约 1 字符/token，其他文字约 4 字符/token"""
+    cjk = sum(1 for ch in text if '\u2e80' <= ch <= '\u9fff' or '\uac00' <= ch <= '\ud7af' or '\uf900' <= ch <= '\ufaff')
+    return cjk + (len(text) - cjk + 3) // 4
 
 
 def extract_quoted_strings(response: str) -> List[str]:
@@ -0,0 +1,145 @@
+# utils/model_profile.py - 模型能力配置：在生成前关闭思考过程
+
+import logging
+import weakref
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from . import usage
+
+logger = logging.getLogger(__name__)
+
+# 常见的思考标签，只有在词表中是单个 token 时才能通过 logit bias 禁止
+THINKING_TAGS = ("<think>", "<thinking>", "<reasoning>")
+
+
+@dataclass(frozen=True)
+class ModelProfile:
+    """模型能力配置
+
+    - name: 配置名称
+    - template_switch: 聊天模板支持 enable_thinking 变量（Qwen3），渲染时传入 False 直接关闭思考
+    - soft_switch: 模板不支持时附加在用户消息开头的关闭思考指令（Qwen3 为 /no_think）
+    - banned_tokens: 以 logit bias 禁止生成的思考标签 token
+    """
+    name: str
+    template_switch: bool = False
+    soft_switch: str = ""
+    banned_tokens: Tuple[int, ...] = ()
+
+    @property
+    def logit_bias(self) -> Dict[int, float]:
+        return {token: float("-inf") for token in self.banned_tokens}
+
+
+DEFAULT_PROFILE = ModelProfile("default")
+
+# 已应用配置的模型实例 -> (配置, 原聊天处理器)
+_applied: "weakref.WeakKeyDictionary[Any, Tuple[ModelProfile, Any]]" = weakref.WeakKeyDictionary()
+
+
+def _single_token(llm: Any, text: str):
+    try:
+        tokens = llm.tokenize(text.encode("utf-8"), add_bos=False, special=True)
+    except Exception:
+        return None
+    return tokens[0] if len(tokens) == 1 else None
+
+
+def detect_profile(llm: Any) -> ModelProfile:
+    """根据 GGUF 元数据与词表识别模型的思考开关能力"""
+    metadata = getattr(llm, "metadata", None) or {}
+    architecture = metadata.get("general.architecture", "")
+    template = metadata.get("tokenizer.chat_template", "")
+
+    banned = tuple(token for token in (_single_token(llm, tag) for tag in THINKING_TAGS) if token is not None)
+    if "enable_thinking" in template:
+        return ModelProfile("qwen3", template_switch=True, banned_tokens=banned)
+    if architecture.startswith("qwen3"):
+        # 模板未声明 enable_thinking 的 Qwen3 量化版本，使用官方的软开关
+        return ModelProfile("qwen3", soft_switch="/no_think", banned_tokens=banned)
+    if banned or "<think>" in template:
+        return ModelProfile("reasoning", banned_tokens=banned)
+    return DEFAULT_PROFILE
+
+
+def _install_template_switch(llm: Any) -> bool:
+    """以渲染时固定 enable_thinking=False 的 Jinja 模板替换模型的聊天处理器"""
+    try:
+        from llama_cpp.llama_chat_format import Jinja2ChatFormatter
+
+        class NoThinkingFormatter(Jinja2ChatFormatter):
+            def __call__(self, **kwargs):
+                kwargs["enable_thinking"] = False
+                return super().__call__(**kwargs)
+
+        formatter = NoThinkingFormatter(
+            template=llm.metadata["tokenizer.chat_template"],
+            eos_token=llm.detokenize([llm.token_eos()], special=True).decode("utf-8", errors="ignore"),
+            bos_token=llm.detokenize([llm.token_bos()], special=True).decode("utf-8", errors="ignore"),
+            stop_token_ids=[llm.token_eos()],
+        )
+    except Exception as e:
+        logger.warning(f"无法通过聊天模板关闭思考: {e}")
+        return False
+    llm.chat_handler = formatter.to_chat_handler()
+    return True
+
+
+def suppress_reasoning(llm: Any, enabled: bool = True) -> ModelProfile:
+    """为模型实例应用能力配置，使其不生成思考过程；enabled 为 False 时恢复原始行为
+
+    返回应用的配置。之后经 create_chat_completion 发起的调用会自动带上对应的参数。
+    """
+    if llm in _applied:
+        profile, original_handler = _applied.pop(llm)
+        if profile.template_switch:
+            llm.chat_handler = original_handler
+    if not enabled:
+        return DEFAULT_PROFILE
+
+    profile = detect_profile(llm)
+    original_handler = getattr(llm, "chat_handler", None)
+    if profile.template_switch and not _install_template_switch(llm):
+        profile = ModelProfile(profile.name, soft_switch="/no_think", banned_tokens=profile.banned_tokens)
+    _applied[llm] = (profile, original_handler)
+    logger.info(f"模型配置: {profile.name}（模板开关: {profile.template_switch}，"
+                f"软开关: {profile.soft_switch or '无'}，禁止 token: {list(profile.banned_tokens)}）")
+    return profile
+
+
+def get_profile(llm: Any) -> ModelProfile:
+    """模型实例当前应用的配置，未应用时返回 DEFAULT_PROFILE"""
+    try:
+        return _applied.get(llm, (DEFAULT_PROFILE, None))[0]
+    except TypeError:
+        # 不支持弱引用的对象（如测试替身）
+        return DEFAULT_PROFILE
+
+
+def _with_soft_switch(messages: List[Dict[str, Any]], switch: str) -> List[Dict[str, Any]]:
+    messages = list(messages)
+    for i in range(len(messages) - 1, -1, -1):
+        if messages[i].get("role") == "user":
+            messages[i] = dict(messages[i], content=f"{switch}\n{messages[i]['content']}")
+            break
+    return messages
+
+
+def create_chat_completion(llm: Any, call_type: Optional[str] = None, **kwargs) -> Dict[str, Any]:
+    """调用 llm.create_chat_completion，并按模型配置附加关闭思考所需的参数
+
+    非流式调用的 token 用量与耗时按 call_type 记入 utils.usage；流式调用由调用方统计。
+    """
+    profile = get_profile(llm)
+    if profile.soft_switch:
+        kwargs["messages"] = _with_soft_switch(kwargs["messages"], profile.soft_switch)
+    if profile.banned_tokens:
+        kwargs["logit_bias"] = {**profile.logit_bias, **(kwargs.get("logit_bias") or {})}
+    if kwargs.get("stream"):
+        return llm.create_chat_completion(**kwargs)
+    meter = usage.CallMeter(llm, call_type)
+    response = llm.create_chat_completion(**kwargs)
+    response_usage = response.get("usage") or {}
+    meter.finish(response_usage.get("completion_tokens", 0), response_usage.get("prompt_tokens", 0))
+    return response
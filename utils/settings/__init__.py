@@ -4,6 +4,7 @@ import os
 from pathlib import Path
 from typing import Dict, Any, Optional, Callable
 from functools import partial
+from defs import get_supported_subtitle_types
 
 # 默认配置常量
 DEFAULT_CONFIG = {
@@ -17,8 +18,21 @@ DEFAULT_CONFIG = {
     "appearance_mode": "系统",
     "reflection_enabled": True,
     "processing_mode": "translate",
+    "glossary_workers": 1,
+    "reflection_mode": "full",
+    "reflection_threshold": None,
+    "reflection_logprobs": False,
+    "log_display_level": "INFO",
+    "prompt_log_enabled": True,
+    "prompt_log_sample_rate": 1.0,
 }
 
+# 反思模式：single 为一次调用完成评估与改进；full 为“改进建议 + 改进翻译”两次调用
+REFLECTION_MODES = ("single", "full")
+
+# 界面日志可选的显示级别
+LOG_DISPLAY_LEVELS = ("INFO", "WARNING", "ERROR")
+
 # 默认配置文件路径
 DEFAULT_CONFIG_FILE = "config.json"
 
@@ -61,7 +75,8 @@ def _validate_config(config: Dict[str, Any]) -> Dict[str, Any]:
     
     for key, default_value in DEFAULT_CONFIG.items():
         if key in config:
-            if type(config[key]) == type(default_value):
+            # 默认值为 None 的配置项（如 reflection_threshold）可为任意类型
+            if default_value is None or type(config[key]) == type(default_value):
                 validated[key] = config[key]
             else:
                 print(f"配置项 {key} 类型不匹配，使用默认值")
@@ -178,7 +193,11 @@ def auto_set_output_path(input_path: str, target_lang: str) -> str:
         return ""
     
     input_path_obj = Path(input_path)
-    suffix = f".{target_lang}.srt"
+    # 字幕文件保留原格式，其它文件（视频等）输出SRT
+    extension = input_path_obj.suffix.lower()
+    if extension not in get_supported_subtitle_types():
+        extension = ".srt"
+    suffix = f".{target_lang}{extension}"
     output_path = input_path_obj.parent / f"{input_path_obj.stem}{suffix}"
     
     return str(output_path)
@@ -284,6 +303,69 @@ def set_processing_mode(mode: str) -> bool:
     """设置处理模式"""
     return set_value("processing_mode", mode)
 
+def get_glossary_workers() -> int:
+    """获取术语提取并行数
+
+    每个 worker 加载一份完整模型，显存占用按模型大小成倍增长，默认 1；
+    实际并行数还会按剩余显存自动下调。
+    """
+    return max(1, get_value("glossary_workers", 1))
+
+def set_glossary_workers(workers: int) -> bool:
+    """设置术语提取并行数"""
+    return set_value("glossary_workers", workers)
+
+def get_reflection_mode() -> str:
+    """获取反思模式"""
+    mode = get_value("reflection_mode", "full")
+    return mode if mode in REFLECTION_MODES else "full"
+
+def set_reflection_mode(mode: str) -> bool:
+    """设置反思模式"""
+    return set_value("reflection_mode", mode)
+
+def get_reflection_threshold() -> Optional[float]:
+    """获取反思置信度阈值，置信度低于该值的块才进行反思改进；默认 None，所有块都进行反思"""
+    threshold = get_value("reflection_threshold", None)
+    return None if threshold is None else float(threshold)
+
+def set_reflection_threshold(threshold: Optional[float]) -> bool:
+    """设置反思置信度阈值（0~1，设为 None 时关闭置信度筛选，所有块都进行反思）"""
+    return set_value("reflection_threshold", threshold)
+
+def get_reflection_logprobs() -> bool:
+    """获取置信度筛选是否使用 token 对数概率"""
+    return bool(get_value("reflection_logprobs", False))
+
+def set_reflection_logprobs(enabled: bool) -> bool:
+    """设置置信度筛选是否使用 token 对数概率（模型以 logits_all=True 加载，占用更多内存）"""
+    return set_value("reflection_logprobs", enabled)
+
+def get_log_display_level() -> str:
+    """获取界面日志的显示级别"""
+    level = get_value("log_display_level", "INFO")
+    return level if level in LOG_DISPLAY_LEVELS else "INFO"
+
+def set_log_display_level(level: str) -> bool:
+    """设置界面日志的显示级别"""
+    return set_value("log_display_level", level)
+
+def get_prompt_log_enabled() -> bool:
+    """获取是否记录完整提示词与模型输出（logs/prompts.log）"""
+    return bool(get_value("prompt_log_enabled", True))
+
+def set_prompt_log_enabled(enabled: bool) -> bool:
+    """设置是否记录完整提示词与模型输出"""
+    return set_value("prompt_log_enabled", enabled)
+
+def get_prompt_log_sample_rate() -> float:
+    """获取提示词日志的抽样比例（0~1）"""
+    return float(get_value("prompt_log_sample_rate", 1.0))
+
+def set_prompt_log_sample_rate(rate: float) -> bool:
+    """设置提示词日志的抽样比例（0~1，如 0.1 表示每 10 次调用记录 1 次）"""
+    return set_value("prompt_log_sample_rate", rate)
+
 # 高级功能
 def create_backup(backup_file: str) -> bool:
     """创建配置备份"""
@@ -332,6 +414,13 @@ __all__ = [
     'get_gpu_layers', 'set_gpu_layers',
     'get_window_geometry', 'set_window_geometry',
     'get_appearance_mode', 'set_appearance_mode',
+    'get_glossary_workers', 'set_glossary_workers',
+    'get_reflection_mode', 'set_reflection_mode', 'REFLECTION_MODES',
+    'get_reflection_threshold', 'set_reflection_threshold',
+    'get_reflection_logprobs', 'set_reflection_logprobs',
+    'get_log_display_level', 'set_log_display_level', 'LOG_DISPLAY_LEVELS',
+    'get_prompt_log_enabled', 'set_prompt_log_enabled',
+    'get_prompt_log_sample_rate', 'set_prompt_log_sample_rate',
     'create_backup', 'restore_from_backup',
     'export_config', 'get_config_info'
 ]
\ No newline at end of file
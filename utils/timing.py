@@ -0,0 +1,198 @@
+# utils/timing.py - 阶段计时：记录各阶段的耗时、调用次数与 token 数，任务结束时输出汇总表与 JSON 轨迹
+#
+#   timeline = timing.start_timeline()
+#   with timing.span("translate", chunk=3):
+#       ...                         # LLM 调用通过 timing.add_tokens 记录到当前阶段
+#   timing.finish_timeline()
+#   print(timeline.format_summary()); timeline.write_json("logs/trace.json")
+#
+# 没有进行中的 timeline 时 span 与 add_tokens 什么都不做。JSON 轨迹为 Chrome Trace Event 格式，
+# 可在 chrome://tracing 或 Perfetto 中查看。
+
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+
+@dataclass
+class StageStats:
+    """同名阶段的累计数据"""
+    calls: int = 0
+    seconds: float = 0.0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+
+    @property
+    def tokens_per_second(self) -> float:
+        return self.completion_tokens / self.seconds if self.seconds else 0.0
+
+
+@dataclass
+class Span:
+    """一次阶段执行"""
+    name: str
+    start: float
+    thread: str
+    parent: Optional["Span"] = None
+    duration: float = 0.0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    attrs: Dict[str, Any] = field(default_factory=dict)
+
+    def add_tokens(self, prompt: int = 0, completion: int = 0) -> None:
+        self.prompt_tokens += prompt
+        self.completion_tokens += completion
+
+    def set(self, **attrs: Any) -> None:
+        self.attrs.update(attrs)
+
+
+class Timeline:
+    """一次任务的全部阶段记录，可跨线程使用"""
+
+    def __init__(self):
+        self.started_at = time.time()
+        self.start = time.perf_counter()
+        self.end: Optional[float] = None
+        self.spans: List[Span] = []
+        self.stages: Dict[str, StageStats] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def total_seconds(self) -> float:
+        return (self.end if self.end is not None else time.perf_counter()) - self.start
+
+    def record(self, span: Span) -> None:
+        with self._lock:
+            self.spans.append(span)
+            stats = self.stages.setdefault(span.name, StageStats())
+            stats.calls += 1
+            stats.seconds += span.duration
+            stats.prompt_tokens += span.prompt_tokens
+            stats.completion_tokens += span.completion_tokens
+
+    def format_summary(self) -> str:
+        """各阶段汇总表，按首次开始的时间排序；嵌套阶段的耗时包含其子阶段"""
+        total = self.total_seconds
+        first_start: Dict[str, float] = {}
+        for span in self.spans:
+            first_start[span.name] = min(first_start.get(span.name, span.start), span.start)
+        lines = [f"{'stage':<22}{'calls':>7}{'seconds':>11}{'%':>7}{'prompt_tok':>12}{'gen_tok':>10}{'gen_tok/s':>11}"]
+        for name in sorted(self.stages, key=lambda name: first_start[name]):
+            stats = self.stages[name]
+            share = stats.seconds / total if total else 0.0
+            lines.append(f"{name:<22}{stats.calls:>7}{stats.seconds:>11.2f}{share:>7.1%}"
+                         f"{stats.prompt_tokens:>12}{stats.completion_tokens:>10}{stats.tokens_per_second:>11.1f}")
+        lines.append(f"{'total':<22}{'':>7}{total:>11.2f}")
+        return "\n".join(lines)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Chrome Trace Event 格式，附带各阶段汇总"""
+        threads: Dict[str, int] = {}
+        events = []
+        for span in sorted(self.spans, key=lambda span: span.start):
+            events.append({
+                "name": span.name,
+                "ph": "X",
+                "ts": round((span.start - self.start) * 1e6),
+                "dur": round(span.duration * 1e6),
+                "pid": os.getpid(),
+                "tid": threads.setdefault(span.thread, len(threads) + 1),
+                "args": {
+                    **span.attrs,
+                    "prompt_tokens": span.prompt_tokens,
+                    "completion_tokens": span.completion_tokens,
+                },
+            })
+        return {
+            "traceEvents": events,
+            "displayTimeUnit": "ms",
+            "startedAt": self.started_at,
+            "totalSeconds": self.total_seconds,
+            "stages": {name: {**vars(stats), "tokens_per_second": stats.tokens_per_second}
+                       for name, stats in self.stages.items()},
+        }
+
+    def write_json(self, path: str, **extra: Any) -> None:
+        """写入 JSON 轨迹，extra 作为附加的顶层字段"""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({**self.to_dict(), **extra}, f, ensure_ascii=False, indent=1)
+
+
+_timeline: Optional[Timeline] = None
+_local = threading.local()
+
+
+def _stack() -> List[Span]:
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+def start_timeline() -> Timeline:
+    """开始记录新的任务，之后各线程中的 span 都记入该 timeline"""
+    global _timeline
+    _timeline = Timeline()
+    return _timeline
+
+
+def finish_timeline() -> Optional[Timeline]:
+    """结束当前任务的记录并返回 timeline"""
+    global _timeline
+    timeline, _timeline = _timeline, None
+    if timeline is not None:
+        timeline.end = time.perf_counter()
+    return timeline
+
+
+def current_timeline() -> Optional[Timeline]:
+    return _timeline
+
+
+@contextmanager
+def span(name: str, **attrs: Any) -> Iterator[Optional[Span]]:
+    """记录一个阶段；同一线程中嵌套的 span 以外层为父阶段。没有进行中的 timeline 时产出 None"""
+    timeline = _timeline
+    if timeline is None:
+        yield None
+        return
+    stack = _stack()
+    current = Span(name, time.perf_counter(), threading.current_thread().name,
+                   parent=stack[-1] if stack else None, attrs=attrs)
+    stack.append(current)
+    try:
+        yield current
+    finally:
+        current.duration = time.perf_counter() - current.start
+        stack.pop()
+        timeline.record(current)
+
+
+def timed(name: str) -> Callable[[Callable], Callable]:
+    """以 span 包裹整个函数调用的装饰器"""
+    def decorator(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def current_span() -> Optional[Span]:
+    stack = getattr(_local, "stack", None)
+    return stack[-1] if stack else None
+
+
+def add_tokens(prompt: int = 0, completion: int = 0) -> None:
+    """把一次模型调用的 token 数记到当前线程最内层的阶段"""
+    current = current_span()
+    if current is not None:
+        current.add_tokens(prompt, completion)
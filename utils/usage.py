@@ -0,0 +1,150 @@
+# utils/usage.py - 模型调用的 token 用量与吞吐：按调用类型汇总提示词/生成 token 数与 tokens/s
+#
+# 每次调用前重置 llama.cpp 的性能计数，结束后读取 prompt eval 与生成的耗时和 token 数
+# （llama_perf_context）；取不到时（如测试用的假模型）以首个 token 到达的时间划分两段。
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from . import timing
+
+try:
+    import llama_cpp
+except ImportError:
+    llama_cpp = None
+
+# 调用类型，未指定时记为 OTHER
+TRANSLATE = "translate"
+REFLECT = "reflect"
+RECOMMEND = "recommend"
+IMPROVE = "improve"
+REVIEW = "review"
+GLOSSARY_EXTRACT = "glossary_extract"
+GLOSSARY_TRANSLATE = "glossary_translate"
+OTHER = "other"
+
+
+@dataclass
+class CallUsage:
+    """同一类型调用的累计用量"""
+    calls: int = 0
+    prompt_tokens: int = 0          # 提示词 token 数（含命中缓存、无需重新计算的部分）
+    prompt_eval_tokens: int = 0     # 实际计算的提示词 token 数
+    completion_tokens: int = 0
+    prompt_seconds: float = 0.0
+    generation_seconds: float = 0.0
+    wall_seconds: float = 0.0
+
+    @property
+    def prompt_tokens_per_second(self) -> float:
+        return self.prompt_eval_tokens / self.prompt_seconds if self.prompt_seconds else 0.0
+
+    @property
+    def generation_tokens_per_second(self) -> float:
+        return self.completion_tokens / self.generation_seconds if self.generation_seconds else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            **vars(self),
+            "prompt_tokens_per_second": self.prompt_tokens_per_second,
+            "generation_tokens_per_second": self.generation_tokens_per_second,
+        }
+
+
+class UsageStats:
+    """按调用类型汇总的用量，可跨线程使用"""
+
+    def __init__(self):
+        self.calls: Dict[str, CallUsage] = {}
+        self._lock = threading.Lock()
+
+    def add(self, call_type: str, usage: CallUsage) -> None:
+        with self._lock:
+            total = self.calls.setdefault(call_type, CallUsage())
+            for name, value in vars(usage).items():
+                setattr(total, name, getattr(total, name) + value)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.calls.clear()
+
+    def total(self) -> CallUsage:
+        total = CallUsage()
+        with self._lock:
+            for usage in self.calls.values():
+                for name, value in vars(usage).items():
+                    setattr(total, name, getattr(total, name) + value)
+        return total
+
+    def format_table(self) -> str:
+        lines = [f"{'call':<20}{'calls':>7}{'prompt_tok':>12}{'gen_tok':>10}"
+                 f"{'prompt_tok/s':>14}{'gen_tok/s':>11}{'seconds':>10}"]
+        with self._lock:
+            rows = list(self.calls.items())
+        for call_type, usage in rows + [("total", self.total())]:
+            lines.append(f"{call_type:<20}{usage.calls:>7}{usage.prompt_tokens:>12}{usage.completion_tokens:>10}"
+                         f"{usage.prompt_tokens_per_second:>14.1f}{usage.generation_tokens_per_second:>11.1f}"
+                         f"{usage.wall_seconds:>10.2f}")
+        return "\n".join(lines)
+
+    def to_dict(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            rows = list(self.calls.items())
+        return {call_type: usage.to_dict() for call_type, usage in rows}
+
+
+_stats = UsageStats()
+
+
+def get_stats() -> UsageStats:
+    return _stats
+
+
+def reset_stats() -> None:
+    _stats.reset()
+
+
+def _perf_context(llm: Any):
+    ctx = getattr(llm, "ctx", None) if llama_cpp is not None else None
+    return ctx if ctx is not None and hasattr(llama_cpp, "llama_perf_context") else None
+
+
+class CallMeter:
+    """测量一次模型调用：创建时开始计时，流式调用在收到首个 token 时调用 first_token()，结束时调用 finish()"""
+
+    def __init__(self, llm: Any, call_type: Optional[str] = None):
+        self.llm = llm
+        self.call_type = call_type or OTHER
+        self._ctx = _perf_context(llm)
+        if self._ctx is not None:
+            llama_cpp.llama_perf_context_reset(self._ctx)
+        self._start = time.perf_counter()
+        self._first_token: Optional[float] = None
+
+    def first_token(self) -> None:
+        if self._first_token is None:
+            self._first_token = time.perf_counter()
+
+    def finish(self, completion_tokens: int, prompt_tokens: Optional[int] = None) -> CallUsage:
+        """记录本次调用；prompt_tokens 为 None 时（流式响应不含 usage）由模型上下文中的 token 数推算"""
+        wall = time.perf_counter() - self._start
+        if prompt_tokens is None:
+            n_tokens = getattr(self.llm, "n_tokens", None)
+            prompt_tokens = max(0, n_tokens - completion_tokens) if isinstance(n_tokens, int) else 0
+        usage = CallUsage(calls=1, prompt_tokens=prompt_tokens, completion_tokens=completion_tokens,
+                          wall_seconds=wall)
+        if self._ctx is not None:
+            perf = llama_cpp.llama_perf_context(self._ctx)
+            usage.prompt_eval_tokens = perf.n_p_eval
+            usage.prompt_seconds = perf.t_p_eval_ms / 1000
+            usage.generation_seconds = perf.t_eval_ms / 1000
+        else:
+            first = self._first_token if self._first_token is not None else self._start + wall
+            usage.prompt_eval_tokens = prompt_tokens
+            usage.prompt_seconds = first - self._start
+            usage.generation_seconds = wall - usage.prompt_seconds
+        _stats.add(self.call_type, usage)
+        timing.add_tokens(prompt_tokens, completion_tokens)
+        return usage